@@ -0,0 +1,69 @@
+from django.contrib.auth.models import User
+from django.utils.crypto import salted_hmac, constant_time_compare
+
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.authentication import BasicAuthentication, TokenAuthentication
+
+from core.cache import LocalCache
+from author.utils import resolve_token, principal_user
+
+
+VERIFIED_CREDENTIALS_TTL = 120
+VERIFIED_CREDENTIALS_SIZE = 1024
+
+verified_credentials = LocalCache(VERIFIED_CREDENTIALS_SIZE, VERIFIED_CREDENTIALS_TTL)
+
+
+def credentials_digest(salt: str, value: str) -> str:
+    return salted_hmac(f'author.authentication.{salt}', value).hexdigest()
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    """
+    BasicAuthentication remembering credentials it verified
+    for a short while so that clients sending them on every
+    request only pay for the password hasher once in a TTL.
+
+    Credentials are kept in process memory only, keyed by an
+    HMAC of username and password under the SECRET_KEY, along
+    with an HMAC of the password hash they were verified
+    against. A remembered login is only accepted while the
+    user is active and its password hash is unchanged, so
+    changing the password invalidates it in every process.
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        key = credentials_digest('credentials', f'{userid}\x00{password}')
+        verified = verified_credentials.get(key)
+
+        if verified is not None:
+            user_id, fingerprint = verified
+            user = User.objects.filter(pk=user_id, is_active=True).first()
+
+            if user is not None and constant_time_compare(credentials_digest('password', user.password), fingerprint):
+                return user, None
+
+            verified_credentials.discard(key)
+
+        user, auth = super(CachedBasicAuthentication, self).authenticate_credentials(userid, password, request)
+        verified_credentials.set(key, (user.pk, credentials_digest('password', user.password)))
+
+        return user, auth
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication resolving tokens through the cached
+    resolver in author.utils instead of a query per request.
+    request.user is a User with only its id and flags loaded
+    (and its author attached), request.auth the token key.
+    """
+
+    def authenticate_credentials(self, key):
+        try:
+            principal = resolve_token(key)
+        except Token.DoesNotExist as e:
+            raise AuthenticationFailed(str(e))
+
+        return principal_user(principal), key
@@ -0,0 +1,139 @@
+"""
+
+Everything an author wrote - posts, tutorials and series -
+merged into a single timeline, newest first. The timeline
+is materialized in TimelineEntry, which signals keep in
+step with the models, so that a page of it is read off a
+single index and only the rows on the page are hydrated
+afterwards, with one planned query per kind on the page.
+
+"""
+import itertools
+import collections
+
+from django.db import transaction
+
+from blog.models import Post
+from core.utils import eager_load
+from author.models import TimelineEntry
+from tutorial.models import Tutorial, Series
+from blog.serializers import PostListSerializer
+from tutorial.serializers import SeriesListSerializer, TutorialListSerializer
+
+
+Kind = collections.namedtuple('Kind', ('model', 'author_field', 'serializer_class', 'label'))
+
+KINDS = {
+    'post': Kind(Post, 'author_id', PostListSerializer, 'Post'),
+    'tutorial': Kind(Tutorial, 'author_id', TutorialListSerializer, 'Tutorial'),
+    'series': Kind(Series, 'creator_id', SeriesListSerializer, 'Series'),
+}
+
+MODEL_KINDS = {kind.model: name for name, kind in KINDS.items()}
+
+
+def timeline_entry(instance) -> TimelineEntry:
+    name = MODEL_KINDS[type(instance)]
+    return TimelineEntry(
+        kind=name,
+        object_id=instance.pk,
+        timestamp=instance.timestamp,
+        author_id=getattr(instance, KINDS[name].author_field),
+    )
+
+
+def record_content(instance, created: bool = False):
+    """
+    Puts a post, tutorial or series on its author's
+    timeline, or moves it there if it was saved with
+    another author or timestamp than it was loaded
+    with. Saves that change neither, such as votes,
+    don't write to the timeline at all.
+    """
+    entry = timeline_entry(instance)
+
+    if created:
+        entry.save()
+    elif instance.has_changed('timestamp', KINDS[entry.kind].author_field):
+        if not TimelineEntry.objects.filter(kind=entry.kind, object_id=entry.object_id).update(
+                author_id=entry.author_id, timestamp=entry.timestamp):
+            # saved before the timeline existed (or was backfilled)
+            entry.save()
+
+
+def record_new_content(instances, chunk_size: int = 500):
+    """
+    Puts content created without signals (bulk_create)
+    on the timelines of its authors in bulk.
+    """
+    TimelineEntry.objects.bulk_create((timeline_entry(instance) for instance in instances), batch_size=chunk_size)
+
+
+def remove_content(instance):
+    TimelineEntry.objects.filter(kind=MODEL_KINDS[type(instance)], object_id=instance.pk).delete()
+
+
+def rebuild_timeline(chunk_size: int = 500) -> dict:
+    """
+    Drops every timeline entry and records all posts,
+    tutorials and series again, chunk_size at a time.
+    Returns the number of entries recorded per kind.
+    """
+    counts = {}
+
+    with transaction.atomic():
+        TimelineEntry.objects.all().delete()
+
+        for name, kind in KINDS.items():
+            counts[name] = 0
+            rows = kind.model.objects.order_by('pk').values_list(
+                'pk', 'timestamp', kind.author_field
+            ).iterator(chunk_size=chunk_size)
+
+            while True:
+                chunk = [
+                    TimelineEntry(kind=name, object_id=pk, timestamp=timestamp, author_id=author_id)
+                    for pk, timestamp, author_id in itertools.islice(rows, chunk_size)
+                ]
+                if not chunk:
+                    break
+                counts[name] += len(TimelineEntry.objects.bulk_create(chunk))
+
+    return counts
+
+
+def content_index(author_id: int):
+    """
+    Returns a queryset of the (timestamp, id, kind) rows of
+    everything an author wrote, newest first.
+    """
+    return TimelineEntry.objects.filter(author_id=author_id).values_list('timestamp', 'object_id', 'kind')
+
+
+def content_window(author_id: int, offset: int, limit: int) -> list:
+    return list(content_index(author_id)[offset:offset + limit])
+
+
+def hydrate_content(rows, context: dict = None) -> list:
+    """
+    Serializes (timestamp, id, kind) rows with the list
+    serializer of their kind, labelled with a `type` the
+    way drf_multiple_model did. Rows whose object is gone
+    by now are left out.
+    """
+    ids = collections.defaultdict(list)
+    for timestamp, pk, name in rows:
+        ids[name].append(pk)
+
+    serialized = {}
+
+    for name, pks in ids.items():
+        kind = KINDS[name]
+        objects = list(eager_load(kind.model.objects.filter(pk__in=pks), kind.serializer_class))
+        data = kind.serializer_class(objects, many=True, context=context).data
+
+        for instance, datum in zip(objects, data):
+            datum['type'] = kind.label
+            serialized[name, instance.pk] = datum
+
+    return [serialized[name, pk] for timestamp, pk, name in rows if (name, pk) in serialized]
@@ -1,56 +1,20 @@
 from django.contrib.auth.models import User
-from django.core.management.base import BaseCommand, CommandError
 
-from rest_framework.authtoken.models import Token
+from core.management.commands._listing import ListCommand, Column
 
-from prettytable import PrettyTable
 
-
-table = PrettyTable()
-table.field_names = [
-    'id',
-    'username',
-    'first_name',
-    'last_name',
-    'bio',
-    'is_staff',
-    'authenticated',
-    'token',
-]
-
-
-class Command(BaseCommand):
+class Command(ListCommand):
 
     help = 'Lists django.contrib.auth.models.Users'
-
-    def get_version(self):
-        return '1.0.0'
-
-    def add_arguments(self, parser):
-        parser.add_argument('number', type=int, default=User.objects.count(), nargs='?')
-
-    def handle(self, *args, **options):
-
-        try:
-
-            users = User.objects.all()
-
-            for index in range(options['number']):
-
-                user = users[index]
-
-                table.add_row([
-                    user.id,
-                    user.username,
-                    user.first_name,
-                    user.last_name,
-                    user.author.bio,
-                    user.is_staff,
-                    user.author.authenticated,
-                    Token.objects.get(user_id__exact=user.id).key
-                ])
-
-            print(table)
-
-        except Exception as e:
-            raise CommandError(str(e))
+    queryset = User.objects.all()
+
+    columns = (
+        Column('id', 'id', 8),
+        Column('username', 'username', 15),
+        Column('first_name', 'first_name', 12),
+        Column('last_name', 'last_name', 12),
+        Column('bio', 'author__bio', 20),
+        Column('is_staff', 'is_staff', 8),
+        Column('authenticated', 'author__authenticated', 13),
+        Column('token', 'auth_token__key', 40),
+    )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from author.content import rebuild_timeline
+
+
+class Command(BaseCommand):
+
+    help = 'Rebuilds the timelines of all authors from their posts, tutorials and series'
+
+    def get_version(self):
+        return '1.0.0'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+
+        try:
+
+            counts = rebuild_timeline(options['chunk_size'])
+
+            for kind, count in counts.items():
+                print(f'Recorded {count} {kind} entries.')
+
+        except Exception as e:
+            raise CommandError(str(e))
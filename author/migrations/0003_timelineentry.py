@@ -0,0 +1,54 @@
+# Generated by Django 2.2.4 on 2026-10-18 13:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_timeline(apps, schema_editor):
+    TimelineEntry = apps.get_model('author', 'TimelineEntry')
+
+    sources = [
+        ('post', apps.get_model('blog', 'Post'), 'author_id'),
+        ('series', apps.get_model('tutorial', 'Series'), 'creator_id'),
+        ('tutorial', apps.get_model('tutorial', 'Tutorial'), 'author_id'),
+    ]
+
+    for kind, model, author_field in sources:
+        TimelineEntry.objects.bulk_create((
+            TimelineEntry(kind=kind, object_id=pk, timestamp=timestamp, author_id=author_id)
+            for pk, timestamp, author_id in model.objects.values_list('pk', 'timestamp', author_field).iterator()
+        ), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('author', '0002_bookmark'),
+        ('blog', '0004_post_updated'),
+        ('tutorial', '0011_tutorial_updated'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('timestamp', models.DateTimeField()),
+                ('kind', models.CharField(choices=[('post', 'Post'), ('series', 'Series'), ('tutorial', 'Tutorial')], max_length=10)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='author.Author')),
+            ],
+            options={
+                'ordering': ('-timestamp', '-object_id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['author', '-timestamp', '-object_id'], name='author_timeline_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='timelineentry',
+            unique_together={('kind', 'object_id')},
+        ),
+        migrations.RunPython(populate_timeline, migrations.RunPython.noop),
+    ]
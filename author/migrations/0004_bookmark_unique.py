@@ -0,0 +1,33 @@
+# Generated by Django 2.2.4 on 2026-10-18 14:37
+
+from django.db import migrations
+from django.db.models import Min, Count
+
+
+def delete_duplicate_bookmarks(apps, schema_editor):
+    Bookmark = apps.get_model('author', 'Bookmark')
+
+    # the first of every set of duplicates is kept
+    duplicates = Bookmark.objects.order_by().values('author', 'model_type', 'model_pk').annotate(
+        first=Min('pk'), count=Count('pk')
+    ).filter(count__gt=1)
+
+    for duplicate in duplicates:
+        Bookmark.objects.filter(
+            author=duplicate['author'], model_type=duplicate['model_type'], model_pk=duplicate['model_pk'],
+        ).exclude(pk=duplicate['first']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('author', '0003_timelineentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_bookmarks, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='bookmark',
+            unique_together={('author', 'model_type', 'model_pk')},
+        ),
+    ]
@@ -3,10 +3,12 @@ import uuid
 from django.db import models
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 
 from rest_framework.authtoken.models import Token
 
+from core.cache import invalidate_tags
+
 
 class Author(models.Model):
 
@@ -58,9 +60,110 @@ class Bookmark(models.Model):
     def __str__(self):
         return f'{self.author} - {self.model_type} : {self.model_pk}'
 
+    class Meta:
+        unique_together = ('author', 'model_type', 'model_pk')
+
+
+class TimelineEntry(models.Model):
+    """
+    One row for every post, tutorial and series an author
+    wrote, kept in step with them by signals, so that the
+    merged content of an author is a single range scan of
+    the (author, -timestamp, -object_id) index.
+    """
+
+    KINDS = [
+        ('post', 'Post'),
+        ('series', 'Series'),
+        ('tutorial', 'Tutorial'),
+    ]
+
+    object_id = models.PositiveIntegerField()
+    timestamp = models.DateTimeField()
+    kind = models.CharField(choices=KINDS, max_length=10)
+    author = models.ForeignKey(Author, on_delete=models.CASCADE)
+
+    def __str__(self):
+        return f'{self.author} - {self.kind} : {self.object_id}'
+
+    class Meta:
+        ordering = ('-timestamp', '-object_id')
+        unique_together = ('kind', 'object_id')
+        indexes = [
+            models.Index(fields=['author', '-timestamp', '-object_id'], name='author_timeline_idx'),
+        ]
+
 
 # noinspection PyUnusedLocal
 @receiver(post_save, sender=User)
 def author_generate_token(sender, instance: User = None, created=False, **kwargs):
     if created:
         Token.objects.create(user=instance)
+
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def token_invalidate_principal(sender, instance: Token = None, created=False, **kwargs):
+    from author.utils import invalidate_principals
+    if not created:
+        invalidate_principals(instance.key)
+
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def user_invalidate_principals(sender, instance=None, created=False, update_fields=None, **kwargs):
+    from author.utils import invalidate_principals
+    # new users can't have been resolved yet and logins
+    # only touch last_login which principals don't carry
+    if (created and sender is User) or (update_fields and set(update_fields) == {'last_login'}):
+        return
+    user_id = instance.pk if sender is User else instance.user_id
+    invalidate_principals(*Token.objects.filter(user_id=user_id).values_list('key', flat=True))
+
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=Bookmark)
+def bookmark_cache_add(sender, instance: Bookmark = None, created=False, **kwargs):
+    if created:
+        from author.utils import invalidate_bookmarked_ids
+        invalidate_bookmarked_ids(instance.author_id, instance.model_type)
+
+
+# noinspection PyUnusedLocal
+@receiver(post_delete, sender=Bookmark)
+def bookmark_cache_remove(sender, instance: Bookmark = None, **kwargs):
+    from author.utils import invalidate_bookmarked_ids
+    invalidate_bookmarked_ids(instance.author_id, instance.model_type)
+
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def author_invalidate_cache(sender, update_fields=None, **kwargs):
+    # logins only touch last_login which isn't served
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    invalidate_tags('authors')
+
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender='blog.Post')
+@receiver(post_save, sender='tutorial.Series')
+@receiver(post_save, sender='tutorial.Tutorial')
+def timeline_record(sender, instance=None, created=False, raw=False, **kwargs):
+    from author.content import record_content
+    if not raw:
+        record_content(instance, created)
+
+
+# noinspection PyUnusedLocal
+@receiver(post_delete, sender='blog.Post')
+@receiver(post_delete, sender='tutorial.Series')
+@receiver(post_delete, sender='tutorial.Tutorial')
+def timeline_remove(sender, instance=None, **kwargs):
+    from author.content import remove_content
+    remove_content(instance)
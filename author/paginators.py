@@ -0,0 +1,38 @@
+from collections import OrderedDict
+
+from rest_framework.response import Response
+from rest_framework.pagination import LimitOffsetPagination
+
+
+class AuthorContentPaginator(LimitOffsetPagination):
+    """
+    Limit / offset pagination over the merged content
+    of an author, answering with the same keys as the
+    drf_multiple_model pagination it replaces. Instead
+    of a queryset it takes the total and a function to
+    fetch a window of rows, so that the rows can come
+    from a query tailored to the window requested.
+    """
+
+    def paginate_window(self, count: int, window, request) -> list:
+        self.request = request
+        self.count = count
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if self.count == 0 or self.offset > self.count:
+            return []
+
+        return list(window(self.offset, self.limit))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('highest_count', self.count),
+            ('overall_total', self.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
@@ -27,6 +27,7 @@ class AuthorSerializer(ModelSerializer):
 
         model = Author
         fields = ('user', 'bio', 'authenticated')
+        select_related = ('user',)
 
 
 class AuthorListSerializer(ModelSerializer):
@@ -37,3 +38,4 @@ class AuthorListSerializer(ModelSerializer):
 
         model = Author
         fields = ('user', 'bio', 'authenticated')
+        select_related = ('user',)
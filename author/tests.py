@@ -1,21 +1,35 @@
 import uuid
 import json
+import base64
 import typing
 import random
+import datetime
 
+from django.conf import settings
+from django.utils import timezone
+from django.core.cache import cache
 from django.contrib.auth.models import User
-from django.test import TestCase, RequestFactory
+from unittest import mock
+
+from django.db import connection, transaction, IntegrityError
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, TransactionTestCase, RequestFactory
 
 from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.test import (
     APIRequestFactory,
     force_authenticate,
 )
 
 from blog.models import Post
-from author.models import Author
+from author.models import Author, Bookmark, TimelineEntry
+from author.content import rebuild_timeline
+from author.utils import resolve_token, local_principals, get_bookmarked_ids, bookmarks_cache_key
+from author.authentication import CachedTokenAuthentication, CachedBasicAuthentication, verified_credentials
 from tutorial.models import Tutorial, Series
 from blog.serializers import PostListSerializer
+from tutorial.views.series import SeriesBookmarkAPIView, SeriesBatchBookmarkAPIView
 from blog.management.commands._create_post import create_post
 from author.management.commands.new_author import create_author
 from tutorial.management.commands._create_series import create_one_series
@@ -29,15 +43,21 @@ from author.serializers import (
     AuthorListSerializer,
 )
 from author.views import (
+    AuthorStateAPIView,
     AuthorListAPIView,
     AuthorDetailAPIView,
+    AuthorContentAPIView,
     AuthorPostListAPIView,
     AuthenticateAuthorView,
     AuthorSeriesListAPIView,
     AuthorTutorialListAPIView,
-    GetTokenAndAuthorDetailsAPIView
+    AuthorLikedTutorialIdsAPIView,
+    GetTokenAndAuthorDetailsAPIView,
+    AuthorBookmarkedSeriesIdsAPIView,
 )
 
+PAGE_SIZE = settings.REST_FRAMEWORK['PAGE_SIZE']
+
 
 class AuthorListTest(TestCase):
     """
@@ -324,7 +344,7 @@ class AuthorContentListingTest(TestCase):
 
         # get pages 1 and 2 - due to page 
         # number based pagination with a limit
-        # of 10 objects per page, we need to
+        # of PAGE_SIZE objects per page, we need to
         # make 2 requests to get all the
         # content in any view that uses ListAPIView
         # TODO make a more generic method to get paginated data
@@ -372,22 +392,22 @@ class AuthorContentListingTest(TestCase):
         # get serialized values
 
         author_1_post_list_page_1_serialized_data = PostListSerializer(
-            Post.objects.filter(author=self.author_1)[:10],
+            Post.objects.filter(author=self.author_1)[:PAGE_SIZE],
             many=True
         ).data
 
         author_1_post_list_page_2_serialized_data = PostListSerializer(
-            Post.objects.filter(author=self.author_1)[10:],
+            Post.objects.filter(author=self.author_1)[PAGE_SIZE:],
             many=True
         ).data
 
         author_2_post_list_page_1_serialized_data = PostListSerializer(
-            Post.objects.filter(author=self.author_2)[:10],
+            Post.objects.filter(author=self.author_2)[:PAGE_SIZE],
             many=True
         ).data
 
         author_2_post_list_page_2_serialized_data = PostListSerializer(
-            Post.objects.filter(author=self.author_2)[10:],
+            Post.objects.filter(author=self.author_2)[PAGE_SIZE:],
             many=True
         ).data
 
@@ -455,22 +475,22 @@ class AuthorContentListingTest(TestCase):
         # get serialized values
 
         author_1_series_list_page_1_serialized_data = SeriesListSerializer(
-            Series.objects.filter(creator=self.author_1)[:10],
+            Series.objects.filter(creator=self.author_1)[:PAGE_SIZE],
             many=True
         ).data
 
         author_1_series_list_page_2_serialized_data = SeriesListSerializer(
-            Series.objects.filter(creator=self.author_1)[10:],
+            Series.objects.filter(creator=self.author_1)[PAGE_SIZE:],
             many=True
         ).data
 
         author_2_series_list_page_1_serialized_data = SeriesListSerializer(
-            Series.objects.filter(creator=self.author_2)[:10],
+            Series.objects.filter(creator=self.author_2)[:PAGE_SIZE],
             many=True
         ).data
 
         author_2_series_list_page_2_serialized_data = SeriesListSerializer(
-            Series.objects.filter(creator=self.author_2)[10:],
+            Series.objects.filter(creator=self.author_2)[PAGE_SIZE:],
             many=True
         ).data
 
@@ -538,22 +558,22 @@ class AuthorContentListingTest(TestCase):
         # get serialized values
 
         author_1_tutorial_list_page_1_serialized_data = TutorialListSerializer(
-            Tutorial.objects.filter(author=self.author_1)[:10],
+            Tutorial.objects.filter(author=self.author_1)[:PAGE_SIZE],
             many=True
         ).data
 
         author_1_tutorial_list_page_2_serialized_data = TutorialListSerializer(
-            Tutorial.objects.filter(author=self.author_1)[10:],
+            Tutorial.objects.filter(author=self.author_1)[PAGE_SIZE:],
             many=True
         ).data
 
         author_2_tutorial_list_page_1_serialized_data = TutorialListSerializer(
-            Tutorial.objects.filter(author=self.author_2)[:10],
+            Tutorial.objects.filter(author=self.author_2)[:PAGE_SIZE],
             many=True
         ).data
 
         author_2_tutorial_list_page_2_serialized_data = TutorialListSerializer(
-            Tutorial.objects.filter(author=self.author_2)[10:],
+            Tutorial.objects.filter(author=self.author_2)[PAGE_SIZE:],
             many=True
         ).data
 
@@ -616,3 +636,504 @@ class AuthorAuthenticateTest(TestCase):
 
         # compare status code
         self.assertEqual(response.status_code, 404)
+
+
+class AuthorLikedTutorialIdsTest(TestCase):
+
+    def setUp(self):
+
+        self.factory = RequestFactory()
+        self.url = '/api/authors/liked/tutorials/'
+
+        self.author = create_author()
+        self.tutorials = [create_tutorial(self.author.id, draft=False) for _ in range(10)]
+
+        # like every other tutorial
+        for tutorial in self.tutorials[::2]:
+            tutorial.votes.up(self.author.user_id)
+
+    def test_liked_tutorial_ids(self):
+
+        token = Token.objects.get(user_id=self.author.user_id).key
+        request = self.factory.post(self.url, {'token': token})
+
+        # one query for the token and one for the ids
+        with self.assertNumQueries(2):
+            response = AuthorLikedTutorialIdsAPIView.as_view()(request)
+            response.render()
+
+        self.assertEqual(response.status_code, 200)
+
+        content = json.loads(response.content.decode())
+        liked = sorted((tutorial.id for tutorial in self.tutorials[::2]), reverse=True)
+
+        self.assertEqual(content, {'count': len(liked), 'results': liked})
+
+    def test_deleted_tutorial_ids(self):
+
+        Tutorial.objects.get(pk=self.tutorials[0].pk).delete()
+
+        request = self.factory.get(self.url)
+        force_authenticate(request, self.author.user)
+
+        response = AuthorLikedTutorialIdsAPIView.as_view()(request)
+        response.render()
+
+        content = json.loads(response.content.decode())
+        self.assertNotIn(self.tutorials[0].id, content)
+        self.assertEqual(len(content), 4)
+
+
+class AuthorBookmarkedSeriesIdsTest(TransactionTestCase):
+
+    def setUp(self):
+
+        cache.clear()
+
+        self.factory = RequestFactory()
+        self.url = '/api/authors/bookmarked/series/'
+
+        self.author = create_author()
+        self.token = Token.objects.get(user_id=self.author.user_id).key
+        self.series = [create_one_series(self.author.id) for _ in range(6)]
+
+    def toggle_bookmark(self, series: Series) -> int:
+        request = self.factory.post('/api/series/bookmark/', {
+            'token': self.token,
+            'series_id': series.id,
+        })
+        response = SeriesBookmarkAPIView.as_view()(request)
+        response.render()
+        return json.loads(response.content.decode())['action']
+
+    def bookmarked_series_ids(self) -> typing.List[int]:
+        request = self.factory.post(self.url, {'token': self.token})
+        response = AuthorBookmarkedSeriesIdsAPIView.as_view()(request)
+        response.render()
+        return json.loads(response.content.decode())['results']
+
+    def test_bookmark_toggles(self):
+
+        for series in self.series[:3]:
+            self.assertEqual(self.toggle_bookmark(series), 1)
+        self.assertEqual(self.toggle_bookmark(self.series[0]), -1)
+
+        expected = sorted(series.id for series in self.series[1:3])
+        self.assertEqual(self.bookmarked_series_ids(), expected)
+
+        # the cached set is dropped whenever the table changes
+        self.assertEqual(self.toggle_bookmark(self.series[4]), 1)
+        self.assertEqual(self.bookmarked_series_ids(), sorted(expected + [self.series[4].id]))
+
+    def test_bookmarked_ids_served_from_cache(self):
+
+        self.toggle_bookmark(self.series[0])
+        self.bookmarked_series_ids()
+
+        # the token's author is resolved from the cache too
+        with self.assertNumQueries(0):
+            self.assertEqual(self.bookmarked_series_ids(), [self.series[0].id])
+
+    def test_bookmark_toggles_off_the_table(self):
+
+        # a stale cached set doesn't decide the toggle
+        cache.set(bookmarks_cache_key(self.author.id, 'series'), {self.series[0].id})
+        self.assertEqual(self.toggle_bookmark(self.series[0]), 1)
+
+        cache.set(bookmarks_cache_key(self.author.id, 'series'), set())
+        self.assertEqual(self.toggle_bookmark(self.series[0]), -1)
+        self.assertEqual(self.toggle_bookmark(self.series[0]), 1)
+
+        self.assertEqual(Bookmark.objects.filter(author=self.author).count(), 1)
+
+    def test_rolled_back_bookmark_not_cached(self):
+
+        self.assertEqual(self.bookmarked_series_ids(), [])
+
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Bookmark.objects.create(author=self.author, model_type='series', model_pk=self.series[0].id)
+                raise IntegrityError
+
+        self.assertEqual(self.bookmarked_series_ids(), [])
+
+
+class SeriesBatchBookmarkTest(TransactionTestCase):
+    """
+    Batches of bookmark toggles are applied as sets and the
+    cached bookmarked ids of the author follow them.
+    """
+
+    def setUp(self):
+
+        cache.clear()
+
+        self.author = create_author()
+        self.token = Token.objects.get(user_id=self.author.user_id).key
+        self.series = [create_one_series(self.author.id) for _ in range(5)]
+
+    def apply(self, actions: list) -> dict:
+        request = APIRequestFactory().post('/api/series/bookmark/batch/', {
+            'token': self.token,
+            'actions': actions,
+        }, format='json')
+        response = SeriesBatchBookmarkAPIView.as_view()(request)
+        response.render()
+        return json.loads(response.content.decode())
+
+    def test_batch(self):
+
+        first, second, third = (series.id for series in self.series[:3])
+        # load the cached set so that the batch has to drop it
+        self.assertEqual(get_bookmarked_ids(self.author.id), set())
+
+        response = self.apply([
+            {'id': first, 'state': True},
+            {'id': second, 'state': True},
+            {'id': 0x7fffffff, 'state': True},
+            {'id': second, 'state': False},
+            {'id': third, 'state': True},
+        ])
+
+        self.assertEqual(response['missing'], [0x7fffffff])
+        self.assertEqual(response['results'], [
+            {'id': first, 'state': True}, {'id': second, 'state': False}, {'id': third, 'state': True},
+        ])
+        self.assertEqual(get_bookmarked_ids(self.author.id), {first, third})
+
+        with self.assertNumQueries(6):
+            # the series, BEGIN, a lock, the bookmarks and a
+            # delete (which collects the rows it signals for
+            # first), the principal is cached since the first
+            self.apply([{'id': first, 'state': False}, {'id': third, 'state': True}])
+
+        self.assertEqual(get_bookmarked_ids(self.author.id), {third})
+        self.assertEqual(Bookmark.objects.filter(author=self.author).count(), 1)
+
+    def test_invalid_actions(self):
+
+        self.assertIn('error', self.apply([{'id': 'one', 'state': True}]))
+        self.assertIn('error', self.apply({'id': self.series[0].id, 'state': True}))
+
+        request = APIRequestFactory().post('/api/series/bookmark/batch/', [self.token], format='json')
+        self.assertEqual(SeriesBatchBookmarkAPIView.as_view()(request).status_code, 400)
+
+
+class AuthorStateTest(TestCase):
+    """
+    Liked and bookmarked flags are looked up for the ids
+    asked for only, at a cost independent of how much
+    the user liked and bookmarked.
+    """
+
+    def setUp(self):
+
+        cache.clear()
+
+        self.factory = RequestFactory()
+        self.author = create_author()
+        self.token = Token.objects.get(user_id=self.author.user_id).key
+
+        self.series = [create_one_series(self.author.id) for _ in range(3)]
+        self.tutorials = [create_tutorial(self.author.id, draft=False) for _ in range(3)]
+
+        self.tutorials[1].votes.up(self.author.user_id)
+        Bookmark.objects.create(author=self.author, model_type='series', model_pk=self.series[2].id)
+
+    def get_state(self, **params) -> dict:
+        request = self.factory.post('/api/authors/state/', {'token': self.token, **params})
+        response = AuthorStateAPIView.as_view()(request)
+        response.render()
+        return json.loads(response.content.decode())
+
+    def test_flags(self):
+
+        state = self.get_state(
+            tutorials=[tutorial.id for tutorial in self.tutorials],
+            series=','.join(str(series.id) for series in self.series),
+        )
+
+        self.assertEqual([tutorial['liked'] for tutorial in state['tutorials']], [False, True, False])
+        self.assertEqual([series['bookmarked'] for series in state['series']], [False, False, True])
+
+        self.assertIn('error', self.get_state(tutorials='one,two'))
+
+    def test_cost(self):
+
+        self.get_state(tutorials=self.tutorials[0].id, series=self.series[0].id)
+
+        for tutorial in self.tutorials:
+            tutorial.votes.up(create_author().user_id)
+
+        # one IN query on the vote table, the bookmarks and
+        # the principal come out of the cache
+        with self.assertNumQueries(1):
+            state = self.get_state(tutorials=self.tutorials[1].id, series=self.series[2].id)
+
+        self.assertEqual(state, {
+            'tutorials': [{'id': self.tutorials[1].id, 'liked': True}],
+            'series': [{'id': self.series[2].id, 'bookmarked': True}],
+        })
+
+
+class TokenPrincipalTest(TransactionTestCase):
+    """
+    Tokens resolve to principals through the caches,
+    which forget them as soon as the token is rotated
+    or the user changes. Runs outside of a transaction
+    since invalidation waits for changes to commit.
+    """
+
+    def setUp(self):
+        cache.clear()
+        local_principals.clear()
+        self.factory = APIRequestFactory()
+        self.author = create_author()
+        self.token = Token.objects.get(user_id=self.author.user_id).key
+
+    def authenticate(self, token: str):
+        request = self.factory.get('/api/authors/', HTTP_AUTHORIZATION=f'Token {token}')
+        return CachedTokenAuthentication().authenticate(request)
+
+    def test_resolve_token(self):
+
+        principal = resolve_token(self.token)
+        self.assertEqual((principal.user_id, principal.author_id), (self.author.user_id, self.author.id))
+
+        with self.assertNumQueries(0):
+            resolve_token(self.token)
+            user, key = self.authenticate(self.token)
+            self.assertEqual(user.author.id, self.author.id)
+            self.assertTrue(user.is_authenticated)
+
+        # a process that hasn't seen the token reads it off the shared cache
+        local_principals.clear()
+        with self.assertNumQueries(0):
+            resolve_token(self.token)
+
+        with self.assertRaises(Token.DoesNotExist):
+            resolve_token('not-a-token')
+
+    def test_invalidation(self):
+
+        resolve_token(self.token)
+
+        self.author.user.is_staff = True
+        self.author.user.save()
+        self.assertTrue(resolve_token(self.token).is_staff)
+
+        self.author.user.is_active = False
+        self.author.user.save()
+        with self.assertRaises(Token.DoesNotExist):
+            resolve_token(self.token)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.token)
+
+        self.author.user.is_active = True
+        self.author.user.save()
+        resolve_token(self.token)
+
+        # rotating the token retires the old key at once
+        Token.objects.filter(key=self.token).delete()
+        new_token = Token.objects.create(user=self.author.user).key
+        with self.assertRaises(Token.DoesNotExist):
+            resolve_token(self.token)
+        self.assertEqual(resolve_token(new_token).author_id, self.author.id)
+
+
+class CachedBasicAuthenticationTest(TestCase):
+
+    def setUp(self):
+        verified_credentials.clear()
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username='scripted', password='first-password')
+
+    def authenticate(self, password: str):
+        credentials = base64.b64encode(f'scripted:{password}'.encode()).decode()
+        request = self.factory.get('/api/authors/', HTTP_AUTHORIZATION=f'Basic {credentials}')
+        return CachedBasicAuthentication().authenticate(request)
+
+    def test_verified_credentials_skip_the_hasher(self):
+
+        with mock.patch.object(User, 'check_password', autospec=True, side_effect=User.check_password) as check:
+            self.assertEqual(self.authenticate('first-password')[0], self.user)
+            self.assertEqual(self.authenticate('first-password')[0], self.user)
+            self.assertEqual(check.call_count, 1)
+
+            with self.assertRaises(AuthenticationFailed):
+                self.authenticate('wrong-password')
+
+    def test_password_change_invalidates(self):
+
+        self.authenticate('first-password')
+
+        # as changed by another process
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('second-password')
+        user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate('first-password')
+        self.assertEqual(self.authenticate('second-password')[0], self.user)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate('second-password')
+
+
+class AuthorContentTest(TestCase):
+    """
+    The merged content of an author is paginated in the
+    database, newest first across posts, tutorials and
+    series, and a page costs the same number of queries
+    however much the author wrote.
+    """
+
+    def setUp(self):
+
+        self.factory = APIRequestFactory()
+        self.author = create_author()
+
+        content = [create_post(self.author.id, draft=False) for _ in range(7)] + \
+                  [create_tutorial(self.author.id, draft=False) for _ in range(7)] + \
+                  [create_one_series(self.author.id) for _ in range(6)]
+        random.shuffle(content)
+
+        self.now = timezone.now()
+        for index, instance in enumerate(content):
+            self.set_age(instance, datetime.timedelta(minutes=index))
+
+        self.expected = [(type(instance).__name__, instance.id) for instance in content]
+
+        # someone else's content is left out
+        create_post(create_author().id, draft=False)
+
+    def set_age(self, instance, age: datetime.timedelta):
+        # saved rather than updated so the timeline follows
+        instance.timestamp = self.now - age
+        instance.save()
+
+    def get_content(self, **params) -> dict:
+        request = self.factory.get('/api/authors/content/', params)
+        force_authenticate(request, user=self.author.user)
+        response = AuthorContentAPIView.as_view()(request)
+        response.render()
+        return json.loads(response.content.decode())
+
+    def test_merged_pages(self):
+
+        pages = [self.get_content(limit=8, offset=offset) for offset in (0, 8, 16)]
+
+        self.assertEqual(pages[0]['overall_total'], 20)
+        self.assertEqual([(result['type'], result['id']) for page in pages for result in page['results']],
+                         self.expected)
+        self.assertIsNone(pages[2]['next'])
+        self.assertEqual(self.get_content(limit=8, offset=40)['results'], [])
+
+    def test_page_cost_independent_of_output(self):
+
+        # loads request.user.author once
+        self.get_content(limit=5)
+
+        with CaptureQueriesContext(connection) as before:
+            self.get_content(limit=5)
+
+        for _ in range(30):
+            self.set_age(create_post(self.author.id, draft=False), datetime.timedelta(days=1))
+
+        with self.assertNumQueries(len(before)):
+            self.assertEqual(self.get_content(limit=5)['overall_total'], 50)
+
+
+class AuthorConditionalGetTest(TransactionTestCase):
+    """
+    Author details and the content of an author answer
+    revalidations with a 304 until something changes.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.author = create_author()
+        self.post = create_post(self.author.id, draft=False)
+
+    def get_detail(self, **headers):
+        username = self.author.user.username
+        request = self.factory.get(f'/api/authors/detail/{username}/', **headers)
+        return AuthorDetailAPIView.as_view()(request, username=username)
+
+    def get_content(self, **headers):
+        request = self.factory.get('/api/authors/content/', **headers)
+        force_authenticate(request, user=self.author.user)
+        return AuthorContentAPIView.as_view()(request)
+
+    def test_author_detail_conditional_get(self):
+
+        response = self.get_detail()
+        etag = response['ETag']
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        self.assertEqual(self.get_detail(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.author.bio = 'A new bio.'
+        self.author.save()
+
+        response = self.get_detail(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_author_content_conditional_get(self):
+
+        etag = self.get_content()['ETag']
+        self.assertEqual(self.get_content(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # edits leave the timeline rows as they are
+        self.post.title = 'An Edited Title'
+        self.post.save()
+
+        response = self.get_content(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class AuthorTimelineTest(TestCase):
+    """
+    Timeline entries follow the posts, tutorials and series
+    of an author and can be rebuilt from scratch.
+    """
+
+    def setUp(self):
+        self.author = create_author()
+        self.post = create_post(self.author.id, draft=False)
+        self.series = create_one_series(self.author.id)
+        self.tutorial = create_tutorial(self.author.id, draft=True)
+
+    def entries(self) -> list:
+        return list(TimelineEntry.objects.filter(author=self.author).values_list('kind', 'object_id'))
+
+    def test_signals(self):
+
+        self.assertCountEqual(self.entries(), [
+            ('post', self.post.id), ('series', self.series.id), ('tutorial', self.tutorial.id),
+        ])
+
+        self.tutorial.timestamp = timezone.now() + datetime.timedelta(days=1)
+        self.tutorial.save()
+        self.assertEqual(self.entries()[0], ('tutorial', self.tutorial.id))
+
+        # votes save the tutorial but leave its entry alone
+        tutorial = Tutorial.objects.get(pk=self.tutorial.pk)
+        with CaptureQueriesContext(connection) as context:
+            tutorial.votes.up(self.author.user_id)
+        self.assertFalse([query['sql'] for query in context.captured_queries if 'timelineentry' in query['sql']])
+
+        self.post.delete()
+        self.assertNotIn(('post', self.post.id), self.entries())
+
+    def test_rebuild(self):
+
+        expected = self.entries()
+        TimelineEntry.objects.all().delete()
+
+        self.assertEqual(rebuild_timeline(chunk_size=2), {'post': 1, 'tutorial': 1, 'series': 1})
+        self.assertEqual(self.entries(), expected)
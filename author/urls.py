@@ -3,6 +3,7 @@ from django.urls import path
 from author.views import (
     AuthorListAPIView,
     AuthorDetailAPIView,
+    AuthorStateAPIView,
     AuthorContentAPIView,
     AuthorPostListAPIView,
     AuthenticateAuthorView,
@@ -32,6 +33,9 @@ urlpatterns = (
     # for author bookmarked models
     path('bookmarked/series/', AuthorBookmarkedSeriesIdsAPIView.as_view()),
 
+    # liked and bookmarked flags of the models on a page
+    path('state/', AuthorStateAPIView.as_view()),
+
     # to authenticate authors
     path('authenticate/<uuid:uuid>/', AuthenticateAuthorView.as_view()),
 
@@ -0,0 +1,180 @@
+import typing
+import hashlib
+
+from django.db import transaction, DEFAULT_DB_ALIAS
+from django.core.cache import cache
+from django.contrib.auth.models import User
+
+from rest_framework.authtoken.models import Token
+
+from core.cache import LocalCache
+from author.models import Author, Bookmark
+
+
+# principals live in the shared cache until their token or
+# user changes, the in-process copies for a few seconds as
+# invalidations can only reach the process they happen in
+PRINCIPAL_CACHE_TIMEOUT = 60 * 60 * 24
+LOCAL_PRINCIPAL_TTL = 30
+LOCAL_PRINCIPAL_SIZE = 1024
+
+# bookmarked ids are dropped whenever they change, the
+# timeout only bounds how long a set read off the table
+# by a request racing a change can outlive the change
+BOOKMARKS_CACHE_TIMEOUT = 60 * 60
+
+
+def bookmarks_cache_key(author_id, model_type: str) -> str:
+    return f'bookmarks:{author_id}:{model_type}'
+
+
+def get_bookmarked_ids(author_id, model_type: str = 'series') -> set:
+    """
+    Returns the set of model_pks an author has bookmarked
+    for a model_type. The set is kept in the cache (Redis)
+    and only read off the Bookmark table on a miss.
+    """
+    key = bookmarks_cache_key(author_id, model_type)
+    ids = cache.get(key)
+
+    if ids is None:
+        ids = set(Bookmark.objects.filter(
+            author_id=author_id,
+            model_type=model_type,
+        ).values_list('model_pk', flat=True))
+        cache.set(key, ids, timeout=BOOKMARKS_CACHE_TIMEOUT)
+
+    return ids
+
+
+def invalidate_bookmarked_ids(author_id, model_type: str):
+    """
+    Drops the cached set of an author once a change to
+    their bookmarks commits, the next lookup reads it off
+    the table again. Deleting the key can't lose a change
+    the way rewriting the cached set from two requests
+    at once can.
+    """
+    key = bookmarks_cache_key(author_id, model_type)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def set_bookmarked(author_id, model_type: str, states: dict) -> dict:
+    """
+    Bookmarks or unbookmarks many objects of a model_type
+    at once - states maps model_pks to whether they should
+    end up bookmarked. Costs the same few queries however
+    many states there are and returns the final states.
+    Checking that the objects exist is up to the caller.
+    """
+    bookmarks = Bookmark.objects.filter(author_id=author_id, model_type=model_type)
+
+    with transaction.atomic():
+        # batches of the same author wait for each other
+        # so that both can't add the same bookmark
+        list(Author.objects.select_for_update().filter(pk=author_id).order_by().values_list('pk'))
+
+        marked = set(bookmarks.filter(model_pk__in=list(states)).values_list('model_pk', flat=True))
+        added = [pk for pk, state in states.items() if state and pk not in marked]
+        removed = [pk for pk, state in states.items() if not state and pk in marked]
+
+        # bulk_create sends no signals, the cached set of
+        # the author is invalidated once here instead
+        Bookmark.objects.bulk_create(
+            Bookmark(author_id=author_id, model_type=model_type, model_pk=pk) for pk in added
+        )
+        if removed:
+            bookmarks.filter(model_pk__in=removed).delete()
+
+        if added or removed:
+            invalidate_bookmarked_ids(author_id, model_type)
+
+    return dict(states)
+
+
+class Principal(typing.NamedTuple):
+    user_id: int
+    author_id: typing.Optional[int]
+    is_staff: bool
+    is_superuser: bool
+    is_active: bool
+
+
+local_principals = LocalCache(LOCAL_PRINCIPAL_SIZE, LOCAL_PRINCIPAL_TTL)
+
+
+def principal_cache_key(token: str) -> str:
+    # tokens are credentials, keep them out of the cache keys
+    return f'principal:{hashlib.sha256(token.encode()).hexdigest()}'
+
+
+def resolve_token(token: str) -> Principal:
+    """
+    Maps an auth token to the ids and flags of its user
+    through the in-process LRU, then the shared cache and
+    only then a single query. Raises Token.DoesNotExist
+    for unknown tokens and tokens of inactive users.
+    """
+    principal = local_principals.get(token)
+
+    if principal is None:
+        key = principal_cache_key(token)
+        principal = cache.get(key)
+
+        if principal is None:
+            row = Token.objects.filter(key=token).values_list(
+                'user_id', 'user__author__id', 'user__is_staff', 'user__is_superuser', 'user__is_active'
+            ).first()
+
+            if row is None:
+                raise Token.DoesNotExist('Invalid token.')
+
+            principal = Principal(*row)
+            cache.set(key, principal, timeout=PRINCIPAL_CACHE_TIMEOUT)
+
+        local_principals.set(token, principal)
+
+    if not principal.is_active:
+        raise Token.DoesNotExist('User inactive or deleted.')
+
+    return principal
+
+
+def invalidate_principals(*tokens):
+    """
+    Forgets the principals of tokens once the current
+    transaction commits, so that a request racing the
+    change can't cache the old principal again.
+    """
+    def forget():
+        local_principals.discard(*tokens)
+        cache.delete_many([principal_cache_key(token) for token in tokens])
+
+    if tokens:
+        transaction.on_commit(forget)
+
+
+def principal_user(principal: Principal) -> User:
+    """
+    Builds the User of a principal without a query. Only
+    the principal's fields are loaded, the rest is deferred
+    and fetched on access (saving it only writes the loaded
+    fields), and its author is attached the same way.
+    """
+    def from_principal(model, values: dict):
+        names = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+        return model.from_db(DEFAULT_DB_ALIAS, names, [values[name] for name in names])
+
+    user = from_principal(User, {
+        'id': principal.user_id,
+        'is_staff': principal.is_staff,
+        'is_active': principal.is_active,
+        'is_superuser': principal.is_superuser,
+    })
+
+    if principal.author_id is not None:
+        author = from_principal(Author, {'id': principal.author_id, 'user_id': principal.user_id})
+        Author.user.field.set_cached_value(author, user)
+        User.author.related.set_cached_value(user, author)
+
+    return user
@@ -5,15 +5,19 @@ from django.core.exceptions import ObjectDoesNotExist
 
 from rest_framework.authtoken.models import Token
 from rest_framework.views import APIView, Response
-from drf_multiple_model.views import FlatMultipleModelAPIView
 from rest_framework.parsers import FormParser, MultiPartParser
-from rest_framework.generics import ListAPIView, RetrieveAPIView
+from rest_framework.generics import ListAPIView, GenericAPIView, RetrieveAPIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from drf_multiple_model.pagination import MultipleModelLimitOffsetPagination
 
 from blog.models import Post
-from author.models import Author, Bookmark
+from core.mixins import EagerLoadingMixin, ConditionalGetMixin
+from author.models import Author
 from author.permissions import IsSuperUser
+from author.paginators import AuthorContentPaginator
+from author.content import content_index, content_window, hydrate_content
+from author.utils import get_bookmarked_ids, resolve_token
+from core.utils import parse_ids
+from tutorial.views.utils import liked_tutorial_ids, liked_among
 from tutorial.models import Tutorial, Series
 from blog.serializers import PostListSerializer
 from author.serializers import (
@@ -83,7 +87,7 @@ class GetTokenAndAuthorDetailsAPIView(APIView):
             }, status=401)
 
 
-class AuthorListAPIView(ListAPIView):
+class AuthorListAPIView(EagerLoadingMixin, ListAPIView):
     """
     Purely for administrative purposes.
     Only admin is allowed to view list
@@ -110,7 +114,12 @@ class AuthorListAPIView(ListAPIView):
     serializer_class = AuthorListSerializer
 
 
-class AuthorDetailAPIView(RetrieveAPIView):
+class AuthorDetailAPIView(ConditionalGetMixin, EagerLoadingMixin, RetrieveAPIView):
+    # authors have no column of their own to tell when they
+    # (or their users) changed, every change bumps the tag
+    last_modified_field = None
+    validator_tags = ('authors',)
+
     lookup_url_kwarg = 'username'
     lookup_field = 'user__username'
     queryset = Author.objects.all()
@@ -118,12 +127,13 @@ class AuthorDetailAPIView(RetrieveAPIView):
     serializer_class = AuthorSerializer
 
 
-class AuthorPostListAPIView(ListAPIView):
+class AuthorPostListAPIView(ConditionalGetMixin, EagerLoadingMixin, ListAPIView):
     """
     This view gets the list of posts by the author username
     provided in the url as a slug - '<slug:username>/author/'
     """
 
+    validator_tags = ('authors',)
     serializer_class = PostListSerializer
 
     def get_queryset(self):
@@ -134,12 +144,13 @@ class AuthorPostListAPIView(ListAPIView):
         return queryset
 
 
-class AuthorTutorialListAPIView(ListAPIView):
+class AuthorTutorialListAPIView(ConditionalGetMixin, EagerLoadingMixin, ListAPIView):
     """
     This view gets the list of tutorials by the author username
     provided in the url as a slug - '<slug:username>/tutorials/'
     """
 
+    validator_tags = ('series', 'authors')
     serializer_class = TutorialListSerializer
 
     def get_queryset(self):
@@ -150,11 +161,12 @@ class AuthorTutorialListAPIView(ListAPIView):
         return queryset
 
 
-class AuthorSeriesListAPIView(ListAPIView):
+class AuthorSeriesListAPIView(ConditionalGetMixin, EagerLoadingMixin, ListAPIView):
     """
     Same as AuthorTutorialListAPIView but for tutorial.Series.
     """
 
+    validator_tags = ('tutorials', 'authors')
     serializer_class = SeriesListSerializer
 
     def get_queryset(self):
@@ -178,11 +190,7 @@ class AuthorLikedTutorialIdsAPIView(APIView):
     def get(request):
 
         if request.user.is_authenticated:
-            user_id = request.user.id
-            tutorials = Tutorial.votes.all(user_id)
-            return Response([
-                tutorial.pk for tutorial in tutorials
-            ])
+            return Response(liked_tutorial_ids(request.user.id))
         else:
             return Response({
                 'error': 'Unauthorized to view response.'
@@ -201,15 +209,15 @@ class AuthorLikedTutorialIdsAPIView(APIView):
         try:
 
             if token:
-                user_id = Token.objects.get(key=token).user_id
+                user_id = resolve_token(token).user_id
             else:
                 user_id = request.user.id
 
-            tutorials = Tutorial.votes.all(user_id)
+            tutorial_ids = liked_tutorial_ids(user_id)
 
             return Response({
-                'count': len(tutorials),
-                'results': [tutorial.pk for tutorial in tutorials]
+                'count': len(tutorial_ids),
+                'results': tutorial_ids
             })
 
         except ObjectDoesNotExist:
@@ -231,11 +239,8 @@ class AuthorBookmarkedSeriesIdsAPIView(APIView):
     def get(request):
 
         if request.user.is_authenticated:
-            user = request.user
-            series = Bookmark.objects.filter(author_id=user.author.id, model_type='series')
-            return Response([
-                s.model_pk for s in series
-            ])
+            series_ids = get_bookmarked_ids(request.user.author.id, 'series')
+            return Response(sorted(series_ids))
         else:
             return Response({
                 'error': 'Unauthorized to view response.'
@@ -254,15 +259,15 @@ class AuthorBookmarkedSeriesIdsAPIView(APIView):
         try:
 
             if token:
-                user_id = Token.objects.get(key=token).user_id
+                author_id = resolve_token(token).author_id
             else:
-                user_id = request.user.id
+                author_id = request.user.author.id
 
-            series = Bookmark.objects.filter(author__user_id=user_id, model_type='series')
+            series_ids = sorted(get_bookmarked_ids(author_id, 'series'))
 
             return Response({
-                'count': len(series),
-                'results': [s.id for s in series]
+                'count': len(series_ids),
+                'results': series_ids
             })
 
         except ObjectDoesNotExist:
@@ -271,23 +276,102 @@ class AuthorBookmarkedSeriesIdsAPIView(APIView):
             }, status=401)
 
 
-class AuthorContentAPIView(FlatMultipleModelAPIView):
-    sorting_field = '-timestamp'
+class AuthorStateAPIView(APIView):
+    """
+    Returns whether the user liked and bookmarked the
+    tutorials and series with the ids given in the
+    `tutorials` and `series` parameters - the ones on
+    the page the client renders - so the client needn't
+    fetch the complete liked and bookmarked id lists.
+    Takes an authtoken with POST like the views above.
+    """
+
+    max_ids = 200
+    parser_classes = (FormParser, MultiPartParser)
+
+    def get(self, request):
+
+        if not request.user.is_authenticated:
+            return Response({
+                'error': 'Unauthorized to view response.'
+            }, status=401)
+
+        return self.state(request.query_params, request.user.id, request.user.author.id)
+
+    def post(self, request):
+
+        token = request.POST.get('token')
+
+        if not token and not request.user.is_authenticated:
+            return Response({
+                'error': 'Unauthorized to view response.'
+            }, status=401)
+
+        try:
+
+            if token:
+                principal = resolve_token(token)
+                user_id, author_id = principal.user_id, principal.author_id
+            else:
+                user_id, author_id = request.user.id, request.user.author.id
+
+            return self.state(request.POST, user_id, author_id)
+
+        except ObjectDoesNotExist:
+            return Response({
+                'error': 'Invalid auth token provided.'
+            }, status=401)
+
+    def state(self, params, user_id: int, author_id: int):
+
+        try:
+            tutorial_ids = parse_ids(params.getlist('tutorials'), self.max_ids)
+            series_ids = parse_ids(params.getlist('series'), self.max_ids)
+        except ValueError:
+            return Response({
+                'error': f'Provide up to {self.max_ids} tutorial and series ids.'
+            }, status=400)
+
+        liked = liked_among(user_id, tutorial_ids)
+        bookmarked = get_bookmarked_ids(author_id, 'series') if series_ids else set()
+
+        return Response({
+            'tutorials': [{'id': pk, 'liked': pk in liked} for pk in tutorial_ids],
+            'series': [{'id': pk, 'bookmarked': pk in bookmarked} for pk in series_ids],
+        })
+
+
+class AuthorContentAPIView(ConditionalGetMixin, GenericAPIView):
+    """
+    Pages through everything the authenticated author
+    wrote, newest first, with limit and offset. Only
+    the rows of the page requested are read and loaded
+    (see author.content) instead of all of the author's
+    posts, tutorials and series. Conditional requests
+    are answered off the timeline rows of the page and
+    the tags of the kinds, before any of them is loaded.
+    """
+
     permission_classes = (IsAuthenticated,)
-    pagination_class = MultipleModelLimitOffsetPagination
-
-    def get_querylist(self):
-        return [
-            {
-                'serializer_class': PostListSerializer,
-                'queryset': Post.objects.filter(author__user=self.request.user),
-            },
-            {
-                'serializer_class': TutorialListSerializer,
-                'queryset': Tutorial.objects.filter(author__user=self.request.user),
-            },
-            {
-                'serializer_class': SeriesListSerializer,
-                'queryset': Series.objects.filter(creator__user=self.request.user),
-            }
-        ]
+    pagination_class = AuthorContentPaginator
+
+    last_modified_field = None
+    validator_tags = ('posts', 'tutorials', 'series', 'authors')
+
+    def row_version(self, row) -> tuple:
+        timestamp, pk, kind = row
+        return f'{kind}:{pk}', None
+
+    def get(self, request):
+
+        author_id = request.user.author.id
+        count = content_index(author_id).count()
+
+        rows = self.paginator.paginate_window(
+            count,
+            lambda offset, limit: content_window(author_id, offset, limit),
+            request,
+        )
+        self.check_preconditions(*self.compute_validators(rows, count))
+
+        return self.get_paginated_response(hydrate_content(rows, self.get_serializer_context()))
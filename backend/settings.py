@@ -30,6 +30,7 @@ INSTALLED_APPS = [
     'blog.apps.BlogConfig',
     'author.apps.AuthorConfig',
     'tutorial.apps.TutorialConfig',
+    'search.apps.SearchConfig',
     # third party
     'vote',
     'corsheaders',
@@ -150,10 +151,10 @@ CORS_ORIGIN_ALLOW_ALL = True
 
 REST_FRAMEWORK = {
     'PAGE_SIZE': 12,
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.TimelinePagination',
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.BasicAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'author.authentication.CachedBasicAuthentication',
+        'author.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
 }
@@ -1,48 +1,26 @@
-from django.core.management.base import BaseCommand, CommandError
+from django.db.models.functions import Substr
 
 from blog.models import Post
 
-from prettytable import PrettyTable
+from core.management.commands._listing import ListCommand, Column
 
 
-table = PrettyTable()
-table.field_names = [p.name for p in Post._meta.get_fields()]
-for field in ['vote_score', 'votes', 'num_vote_up', 'num_vote_down']:
-    table.field_names.remove(field)
-
-
-class Command(BaseCommand):
+class Command(ListCommand):
 
     help = 'Lists blog.models.Posts'
-
-    def get_version(self):
-        return '1.0.0'
-
-    def add_arguments(self, parser):
-        parser.add_argument('number', type=int, default=Post.objects.count(), nargs='?')
-
-    def handle(self, *args, **options):
-
-        try:
-
-            posts = Post.objects.order_by('pk')
-
-            for index in range(options['number']):
-
-                post = posts[index]
-
-                table.add_row([post.id,
-                               f'{post.body[:10]}...',
-                               f'{post.title[:20]}...',
-                               post.draft,
-                               f'{post.description[:10]}...',
-                               f'{post.thumbnail[-3:]}',
-                               post.timestamp.ctime(),
-                               post.uuid.__str__()[-12:],
-                               post.slug,
-                               post.author])
-
-            print(table)
-
-        except Exception as e:
-            raise CommandError(str(e))
+    queryset = Post.objects.annotate(body_start=Substr('body', 1, 10))
+
+    columns = (
+        Column('id', 'id', 8),
+        Column('title', 'title', 20),
+        # bodies run long, only their start is read
+        Column('body', 'body_start', 10),
+        Column('draft', 'draft', 5),
+        Column('description', 'description', 10),
+        Column('thumbnail', 'thumbnail', 20),
+        Column('timestamp', 'timestamp', 24),
+        Column('updated', 'updated', 24),
+        Column('uuid', 'uuid', 12),
+        Column('slug', 'slug', 20),
+        Column('author', 'author__user__username', 15),
+    )
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.4 on 2026-10-18 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_auto_20190611_1154'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['draft', '-timestamp', '-id'], name='post_draft_timeline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-timestamp', '-id'], name='post_author_timeline_idx'),
+        ),
+    ]
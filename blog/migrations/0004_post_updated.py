@@ -0,0 +1,27 @@
+# Generated by Django 2.2.4 on 2026-10-18 14:02
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def populate_updated(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.update(updated=F('timestamp'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_auto_20261018_1236'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_updated, migrations.RunPython.noop),
+    ]
@@ -4,13 +4,16 @@ from vote.models import VoteModel
 
 from django.db import models
 from django.dispatch import receiver
-from django.utils.text import slugify
-from django.db.models.signals import pre_save
+from django.contrib.auth.models import User
+from django.db.models.signals import pre_save, post_save, post_delete
 
 from author.models import Author
+from core.utils import unique_slug
+from core.models import StoredValuesMixin
+from core.cache import invalidate_tags, invalidate_payloads
 
 
-class Post(VoteModel, models.Model):
+class Post(StoredValuesMixin, VoteModel, models.Model):
 
     body = models.TextField()
     title = models.CharField(max_length=100)
@@ -18,6 +21,7 @@ class Post(VoteModel, models.Model):
     description = models.CharField(max_length=250)
     thumbnail = models.URLField(null=True, blank=True)
     timestamp = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
     uuid = models.UUIDField(default=uuid.uuid4, editable=False)
     slug = models.SlugField(max_length=250, blank=True, unique=True)
 
@@ -30,9 +34,47 @@ class Post(VoteModel, models.Model):
 
     class Meta:
         ordering = ('-timestamp', '-id')
+        indexes = [
+            models.Index(fields=['draft', '-timestamp', '-id'], name='post_draft_timeline_idx'),
+            models.Index(fields=['author', '-timestamp', '-id'], name='post_author_timeline_idx'),
+        ]
+
+
+# noinspection PyUnusedLocal
+@receiver(pre_save, sender=Post)
+def post_invalidate_previous_payload(sender, instance: Post = None, **kwargs):
+    # connected before post_title_to_slug so the
+    # slug is still the one the post is cached by
+    invalidate_payloads('post', instance.slug)
 
 
 # noinspection PyUnusedLocal
 @receiver(pre_save, sender=Post)
 def post_title_to_slug(sender, instance: Post = None, **kwargs):
-    instance.slug = slugify(f'{instance.title}')
+    instance.slug = unique_slug(instance, f'{instance.title}')
+
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_invalidate_cache(sender, **kwargs):
+    invalidate_tags('posts')
+
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_invalidate_payload(sender, instance: Post = None, **kwargs):
+    invalidate_payloads('post', instance.slug)
+
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Author)
+def author_invalidate_post_payloads(sender, instance=None, update_fields=None, **kwargs):
+    # logins only touch last_login which isn't served
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+
+    author = {'author_id': instance.pk} if sender is Author else {'author__user_id': instance.pk}
+    invalidate_payloads('post', *Post.objects.filter(**author).values_list('slug', flat=True))
@@ -18,6 +18,8 @@ class PostListSerializer(ModelSerializer):
         model = Post
         fields = ('id', 'title', 'slug', 'description', 'timestamp', 'thumbnail', 'author', 'num_vote_up',
                   'num_vote_down', 'draft')
+        select_related = ('author__user',)
+        values_sources = {'author': 'author__user__username'}
 
 
 class PostDetailSerializer(ModelSerializer):
@@ -28,4 +30,6 @@ class PostDetailSerializer(ModelSerializer):
     class Meta:
 
         model = Post
-        fields = '__all__'
+        # updated only versions the payload for conditional requests
+        exclude = ('updated',)
+        select_related = ('author__user',)
@@ -1,10 +1,13 @@
 import json
 import typing
 import random
+from unittest import mock
 
 import faker
 
-from django.test import TestCase
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
 from django.utils.text import slugify
 
 from rest_framework.authtoken.models import Token
@@ -18,6 +21,7 @@ from blog.views import PostListAPIView, PostDetailAPIView, PostCreateAPIView
 
 
 BASE_URL = '/api/blog'
+PAGE_SIZE = settings.REST_FRAMEWORK['PAGE_SIZE']
 
 
 class PostListAndDetailTest(TestCase):
@@ -53,7 +57,7 @@ class PostListAndDetailTest(TestCase):
 
             # decode response and check serialized data
             content = json.loads(response.content.decode())
-            posts = reversed(self.posts[-(page*10):50-(10*(page-1))])
+            posts = list(reversed(self.posts))[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
             serialized_data = PostListSerializer(posts, many=True).data
 
             self.assertEqual(content['results'], serialized_data, msg=f'{page}')
@@ -78,6 +82,180 @@ class PostListAndDetailTest(TestCase):
         serialized_data = PostDetailSerializer(post).data
 
         self.assertEqual(content, serialized_data)
+        self.assertNotIn('updated', content)
+
+
+class PostListQueryCountTest(TestCase):
+
+    def setUp(self):
+        self.url = BASE_URL
+        self.factory = APIRequestFactory()
+        self.authors = [create_author() for _ in range(5)]
+        self.posts = [create_post(random.choice(self.authors).id, draft=False) for _ in range(30)]
+
+    def test_post_list_query_count(self):
+        """
+        A page of posts should cost one query for
+        the count and one for the page, no matter
+        how many distinct authors are on it.
+        """
+
+        request = self.factory.get(f'{self.url}/')
+
+        with self.assertNumQueries(2):
+            response = PostListAPIView.as_view()(request)
+            response.render()
+
+        self.assertEqual(response.status_code, 200)
+
+
+class PostListCursorTest(TestCase):
+
+    def setUp(self):
+        self.url = BASE_URL
+        self.factory = APIRequestFactory()
+        self.authors = [create_author() for _ in range(3)]
+        self.posts = [create_post(random.choice(self.authors).id) for _ in range(30)]
+
+    def test_post_list_cursor_pages(self):
+        """
+        Walks every page of posts with cursors and compares
+        the posts against the page number ordering.
+        """
+
+        url, ids = f'{self.url}/?cursor=', []
+
+        while url:
+
+            request = self.factory.get(url)
+
+            # no COUNT(*) is made, only the page query
+            with self.assertNumQueries(1):
+                response = PostListAPIView.as_view()(request)
+                response.render()
+
+            self.assertEqual(response.status_code, 200)
+
+            content = json.loads(response.content.decode())
+            self.assertNotIn('count', content)
+
+            ids += [post['id'] for post in content['results']]
+            url = content['next']
+
+        self.assertEqual(ids, list(Post.objects.filter(draft=False).values_list('id', flat=True)))
+
+
+class PostDetailCacheTest(TransactionTestCase):
+    """
+    Post payloads are served from the cache until the
+    post or its author change. Runs outside of a test
+    transaction since invalidation waits for commits.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.author = create_author()
+        self.post = create_post(self.author.id, draft=False)
+
+    def get_detail(self, slug: str):
+        request = self.factory.get(f'{BASE_URL}/detail/{slug}/')
+        response = PostDetailAPIView.as_view()(request, slug=slug)
+        response.render()
+        return response
+
+    def test_post_detail_cache(self):
+
+        self.assertEqual(self.get_detail(self.post.slug).status_code, 200)
+
+        # served from the cache
+        with self.assertNumQueries(0):
+            response = self.get_detail(self.post.slug)
+        self.assertEqual(json.loads(response.content.decode())['title'], self.post.title)
+
+        old_slug = self.post.slug
+        self.post.title = 'A Completely Renamed Post'
+        self.post.save()
+
+        self.assertEqual(self.get_detail(old_slug).status_code, 404)
+        response = self.get_detail(self.post.slug)
+        self.assertEqual(json.loads(response.content.decode())['title'], 'A Completely Renamed Post')
+
+        self.author.user.first_name = 'Renamed'
+        self.author.user.save()
+        response = self.get_detail(self.post.slug)
+        self.assertEqual(json.loads(response.content.decode())['author']['user']['first_name'], 'Renamed')
+
+        Post.objects.get(pk=self.post.pk).delete()
+        self.assertEqual(self.get_detail(self.post.slug).status_code, 404)
+
+
+    def test_post_detail_saved_while_read(self):
+        get_object = PostDetailAPIView.get_object
+
+        def get_object_then_edit(view):
+            # the post is edited and committed after the view
+            # read it, but before the payload is cached
+            instance = get_object(view)
+            Post.objects.filter(pk=instance.pk).update(description='Edited meanwhile.')
+            Post.objects.get(pk=instance.pk).save()
+            return instance
+
+        with mock.patch.object(PostDetailAPIView, 'get_object', get_object_then_edit):
+            response = self.get_detail(self.post.slug)
+        self.assertNotEqual(json.loads(response.content.decode())['description'], 'Edited meanwhile.')
+
+        response = self.get_detail(self.post.slug)
+        self.assertEqual(json.loads(response.content.decode())['description'], 'Edited meanwhile.')
+
+class PostConditionalGetTest(TransactionTestCase):
+    """
+    Validators emitted by the post views let clients
+    revalidate with a 304 until something changes.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.author = create_author()
+        self.post = create_post(self.author.id, draft=False)
+
+    def test_post_list_conditional_get(self):
+
+        response = PostListAPIView.as_view()(self.factory.get(BASE_URL))
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        request = self.factory.get(BASE_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(PostListAPIView.as_view()(request).status_code, 304)
+
+        request = self.factory.get(BASE_URL, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(PostListAPIView.as_view()(request).status_code, 304)
+
+        self.post.title = 'An Edited Title'
+        self.post.save()
+
+        request = self.factory.get(BASE_URL, HTTP_IF_NONE_MATCH=etag)
+        response = PostListAPIView.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_post_detail_conditional_get(self):
+
+        url = f'{BASE_URL}/detail/{self.post.slug}/'
+        etag = PostDetailAPIView.as_view()(self.factory.get(url), slug=self.post.slug)['ETag']
+
+        # answered off the cached validators
+        with self.assertNumQueries(0):
+            request = self.factory.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(PostDetailAPIView.as_view()(request, slug=self.post.slug).status_code, 304)
+
+        self.author.user.first_name = 'Renamed'
+        self.author.user.save()
+
+        request = self.factory.get(url, HTTP_IF_NONE_MATCH=etag)
+        response = PostDetailAPIView.as_view()(request, slug=self.post.slug)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
 
 
 class PostCreateTest(TestCase):
@@ -135,6 +313,20 @@ class PostCreateTest(TestCase):
         )).data
         self.assertEqual(content['details'], serialized_data)
 
+    def test_create_post_same_title(self):
+
+        data = self.data.copy()
+        data['token'] = Token.objects.get(user_id=self.authors[0].user_id).key
+
+        for _ in range(2):
+            response = PostCreateAPIView.as_view()(self.factory.post(self.url, data))
+            self.assertEqual(response.status_code, 201)
+
+        # like tutorials and series, the second one gets a suffix
+        slug = slugify(self.data['title'])
+        self.assertEqual(response.data['details']['slug'], f'{slug}-2')
+        self.assertCountEqual(Post.objects.values_list('slug', flat=True), [slug, f'{slug}-2'])
+
     def test_create_post_without_authentication(self):
 
         request = self.factory.post(self.url, self.data)
@@ -1,7 +1,9 @@
 """
 
-API views for posts in the blog models. Room for
-cache can be made with caching PostDetailAPIView.
+API views for posts in the blog models. Payloads of
+PostDetailAPIView are cached per slug and invalidated
+by the signals in blog.models. Both the list and the
+detail views answer conditional requests with a 304.
 
 TODO write a view listing blog posts for authenticated
      users to delete or update or simply view drafts
@@ -9,11 +11,9 @@ TODO write a view listing blog posts for authenticated
      authentication will have to be covered much later.
 
 """
-from django.utils.text import slugify
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.authtoken.models import Token
 from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.generics import (
@@ -23,24 +23,33 @@ from rest_framework.generics import (
 )
 
 from blog.models import Post
+from author.utils import resolve_token
+from core.utils import create_with_unique_slug
+from core.mixins import (
+    ValuesListMixin,
+    EagerLoadingMixin,
+    CachedRetrieveMixin,
+    ConditionalGetMixin,
+)
 from blog.serializers import (
     PostListSerializer,
     PostDetailSerializer
 )
 
 
-class PostListAPIView(ListAPIView):
+class PostListAPIView(ConditionalGetMixin, ValuesListMixin, EagerLoadingMixin, ListAPIView):
     """
     Lists all posts that aren't drafted True
     in JSON format with AllowAny permissions.
     """
 
+    validator_tags = ('authors',)
     permission_classes = (AllowAny,)
     serializer_class = PostListSerializer
     queryset = Post.objects.filter(draft=False)
 
 
-class PostDetailAPIView(RetrieveAPIView):
+class PostDetailAPIView(ConditionalGetMixin, CachedRetrieveMixin, EagerLoadingMixin, RetrieveAPIView):
     """
     Gets details of blog posts in drafted False
     queryset. Optimisation using id as lookup_field
@@ -48,6 +57,8 @@ class PostDetailAPIView(RetrieveAPIView):
     """
     lookup_field = 'slug'
     lookup_url_kwarg = 'slug'
+    payload_cache_prefix = 'post'
+    validator_tags = ('authors',)
     permission_classes = (AllowAny,)
     serializer_class = PostDetailSerializer
     queryset = Post.objects.filter(draft=False)
@@ -96,13 +107,6 @@ class PostCreateAPIView(APIView):
                 'error': f'{str(e)} field not provided.'
             }, status=400)
 
-        # check if post with same title exists
-        slugs = [slug[0] for slug in Post.objects.values_list('slug')]
-        if slugify(title) in slugs:
-            return Response({
-                'error': f'Post with title "{title}" already exists!'
-            }, status=400)
-
         token = request.POST.get('token')
 
         if not token and not request.user.is_authenticated:
@@ -113,11 +117,12 @@ class PostCreateAPIView(APIView):
         try:
 
             if token:
-                author_id = Token.objects.get(key=token).user.author.id
+                author_id = resolve_token(token).author_id
             else:
                 author_id = request.user.author.id
 
-            post = Post.objects.create(
+            post = create_with_unique_slug(
+                Post,
                 body=body,
                 title=title,
                 draft=draft,
@@ -0,0 +1,171 @@
+import time
+import typing
+import threading
+import functools
+import collections
+
+from django.db import transaction
+from django.core.cache import cache
+from django.utils.cache import (
+    get_cache_key,
+    learn_cache_key,
+    set_response_etag,
+    patch_cache_control,
+    get_conditional_response,
+)
+
+
+def tag_version_key(tag: str) -> str:
+    return f'tag-version:{tag}'
+
+
+def new_tag_version() -> int:
+    # versions start off the clock instead of at 1 so
+    # that a version key evicted from the cache never
+    # brings pages cached under an old version back
+    return int(time.time() * 1000)
+
+
+def get_tag_versions(tags) -> str:
+    """
+    Returns the current versions of the given tags
+    joined into a string fit for a cache key prefix.
+    """
+    keys = [tag_version_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+
+    missing = {key: new_tag_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+
+    return '.'.join(str(versions[key]) for key in keys)
+
+
+def bump_tags(*tags):
+    for tag in tags:
+        key = tag_version_key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_tag_version(), timeout=None)
+
+
+def invalidate_tags(*tags):
+    """
+    Moves every response cached with cache_page_tagged
+    under any of the given tags to a new key, so that
+    the stale ones are never read again (and are left
+    for the cache to evict). The bump waits for the
+    current transaction to commit, or else a request
+    could cache the old rows under the new version.
+    """
+    transaction.on_commit(lambda: bump_tags(*tags))
+
+
+def cache_page_tagged(timeout: int, key_prefix: str, tags):
+    """
+    Caches the responses of a view per URL (and the
+    headers it varies on) like django's cache_page, with
+    the current versions of tags worked into the keys.
+    Since invalidate_tags purges responses exactly when
+    the data behind them changes, timeouts can be long -
+    on the server only, a bump can't purge the copies
+    browsers and proxies hold, so unlike cache_page this
+    sends no max-age or Expires and tells them to check
+    back every time with Cache-Control: no-cache. Cached
+    responses carry an ETag of their content, a matching
+    If-None-Match is answered with a 304.
+    """
+    def decorator(view_func):
+
+        @functools.wraps(view_func)
+        def wrapped_view(request, *args, **kwargs):
+
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+
+            prefix = f'{key_prefix}.{get_tag_versions(tags)}'
+            key = get_cache_key(request, prefix, 'GET', cache=cache)
+            response = cache.get(key) if key is not None else None
+
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+
+                if response.status_code == 200 and not response.streaming:
+                    if callable(getattr(response, 'render', None)):
+                        response.render()
+                    set_response_etag(response)
+                    cache.set(learn_cache_key(request, response, timeout, prefix, cache=cache), response, timeout)
+
+            patch_cache_control(response, no_cache=True)
+
+            if response.has_header('ETag'):
+                return get_conditional_response(request, etag=response['ETag'], response=response)
+            return response
+
+        return wrapped_view
+
+    return decorator
+
+
+# payloads are versioned per lookup so that a payload read
+# before an invalidation and cached after it is never served,
+# the timeout only bounds how long such leftovers are kept
+PAYLOAD_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def payload_tag(prefix: str, lookup) -> str:
+    return f'payload:{prefix}:{lookup}'
+
+
+def invalidate_payloads(prefix: str, *lookups):
+    """
+    Moves the payloads cached by CachedRetrieveMixin
+    for the given lookups to new versions once the
+    current transaction commits (see invalidate_tags).
+    """
+    tags = [payload_tag(prefix, lookup) for lookup in lookups if lookup]
+    if tags:
+        invalidate_tags(*tags)
+
+
+class LocalCache:
+    """
+    Bounded LRU of key -> value with a TTL, kept in
+    process memory. For values a process can afford to
+    hold on to for ttl seconds after they've changed, or
+    which are checked for staleness when read.
+    """
+
+    def __init__(self, size: int, ttl: int):
+        self.size, self.ttl = size, ttl
+        self.lock = threading.Lock()
+        self.entries = collections.OrderedDict()
+
+    def get(self, key: str) -> typing.Any:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def discard(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2 with its parameters read off the ARGON2_TIME_COST,
+    ARGON2_MEMORY_COST (KiB) and ARGON2_PARALLELISM settings,
+    as suggested by the benchmark_hashers command for this
+    host, instead of Django's defaults.
+
+    Opt in by putting it in place of Argon2PasswordHasher at
+    the top of PASSWORD_HASHERS. Both share the 'argon2'
+    algorithm, so existing hashes keep verifying and since
+    must_update compares parameters, they're rehashed with
+    the tuned ones the next time their user logs in.
+    """
+
+    @property
+    def time_cost(self):
+        return getattr(settings, 'ARGON2_TIME_COST', Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        return getattr(settings, 'ARGON2_MEMORY_COST', Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self):
+        return getattr(settings, 'ARGON2_PARALLELISM', Argon2PasswordHasher.parallelism)
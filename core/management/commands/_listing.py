@@ -0,0 +1,95 @@
+import csv
+import json
+import datetime
+import collections
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.management.base import BaseCommand, CommandError
+
+
+# width is how many characters of a value the table
+# shows, csv and ndjson output has all that is read
+Column = collections.namedtuple('Column', ('name', 'lookup', 'width'))
+
+
+class ListCommand(BaseCommand):
+    """
+    Base of the list_* commands. Rows are read off the
+    command's queryset with values_list queries over the
+    columns' lookups (related columns are joined in, not
+    fetched row by row), chunk_size rows at a time in
+    primary key order, and written out as they arrive, as
+    a table, csv or ndjson. Every chunk picks up after
+    the last primary key of the one before, so memory is
+    bounded by the chunk size - unlike .iterator(), which
+    mysqlclient buffers the whole result of client-side.
+    """
+
+    columns = ()
+    queryset = None
+
+    def get_version(self):
+        return '1.0.0'
+
+    def add_arguments(self, parser):
+        parser.add_argument('number', type=int, default=None, nargs='?', help='rows to list, all by default')
+        parser.add_argument('--format', choices=('table', 'csv', 'ndjson'), default='table')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def rows(self, number, chunk_size: int):
+        queryset = self.queryset.order_by('pk').values_list('pk', *(column.lookup for column in self.columns))
+        last, listed = None, 0
+
+        while number is None or listed < number:
+            size = chunk_size if number is None else min(chunk_size, number - listed)
+            chunk = list((queryset if last is None else queryset.filter(pk__gt=last))[:size])
+
+            for row in chunk:
+                yield row[1:]
+
+            listed += len(chunk)
+            if len(chunk) < size:
+                break
+            last = chunk[-1][0]
+
+    def handle(self, *args, **options):
+
+        try:
+            rows = self.rows(options['number'], options['chunk_size'])
+            getattr(self, f'write_{options["format"]}')(rows)
+        except Exception as e:
+            raise CommandError(str(e))
+
+    def write_table(self, rows):
+        widths = [max(len(column.name), column.width) for column in self.columns]
+        border = '+' + '+'.join('-' * (width + 2) for width in widths) + '+'
+
+        def line(values):
+            return '| ' + ' | '.join(value.ljust(width) for value, width in zip(values, widths)) + ' |'
+
+        def cell(value, width):
+            value = value.ctime() if isinstance(value, datetime.datetime) else str(value)
+            value = value.replace('\n', ' ')
+            return value if len(value) <= width else f'{value[:width - 3]}...'
+
+        self.stdout.write(border)
+        self.stdout.write(line(column.name for column in self.columns))
+        self.stdout.write(border)
+
+        for row in rows:
+            self.stdout.write(line(cell(value, width) for value, width in zip(row, widths)))
+
+        self.stdout.write(border)
+
+    def write_csv(self, rows):
+        writer = csv.writer(self.stdout, lineterminator='\n')
+        writer.writerow(column.name for column in self.columns)
+
+        for row in rows:
+            writer.writerow(value.isoformat() if isinstance(value, datetime.datetime) else value for value in row)
+
+    def write_ndjson(self, rows):
+        names = [column.name for column in self.columns]
+
+        for row in rows:
+            self.stdout.write(json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder))
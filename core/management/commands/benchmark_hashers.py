@@ -0,0 +1,135 @@
+import time
+import statistics
+
+from django.contrib.auth.hashers import get_hashers, Argon2PasswordHasher
+from django.core.management.base import BaseCommand, CommandError
+
+from core.hashers import TunedArgon2PasswordHasher
+
+from prettytable import PrettyTable
+
+
+PASSWORD = 'correct horse battery staple'
+
+
+def verify_latency(hasher, iterations: int) -> float:
+    """
+    Median milliseconds a hasher takes to verify a
+    password against a hash it made - the work done
+    for every login.
+    """
+    encoded = hasher.encode(PASSWORD, hasher.salt())
+    timings = []
+
+    for _ in range(iterations):
+        start = time.perf_counter()
+        hasher.verify(PASSWORD, encoded)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(timings)
+
+
+def argon2_hasher(time_cost: int, memory_cost: int, parallelism: int) -> Argon2PasswordHasher:
+    hasher = Argon2PasswordHasher()
+    hasher.time_cost, hasher.memory_cost, hasher.parallelism = time_cost, memory_cost, parallelism
+    return hasher
+
+
+class Command(BaseCommand):
+
+    help = 'Benchmarks PASSWORD_HASHERS on this host and suggests Argon2 parameters for a target latency.'
+
+    def get_version(self):
+        return '1.0.0'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=5)
+        parser.add_argument('--target-ms', type=float, default=50.0)
+        parser.add_argument('--parallelism', type=int, default=TunedArgon2PasswordHasher().parallelism)
+        parser.add_argument('--max-memory', type=int, default=64, help='Largest memory cost to try, in MiB.')
+
+    def handle(self, *args, **options):
+
+        try:
+
+            print(self.benchmark_hashers(options['iterations']))
+
+            candidates, suggestion = self.calibrate_argon2(
+                options['target_ms'], options['parallelism'], options['max_memory'] * 1024, options['iterations']
+            )
+            print(candidates)
+
+            if suggestion is None:
+                print(f'Even the cheapest Argon2 parameters take longer than {options["target_ms"]}ms here.')
+                return
+
+            time_cost, memory_cost, latency = suggestion
+            print(f'Suggested for {options["target_ms"]}ms ({latency:.1f}ms measured, '
+                  f'{1000 / latency:.1f} logins/sec per core):\n'
+                  f'ARGON2_TIME_COST = {time_cost}\n'
+                  f'ARGON2_MEMORY_COST = {memory_cost}\n'
+                  f'ARGON2_PARALLELISM = {options["parallelism"]}\n'
+                  f'with core.hashers.TunedArgon2PasswordHasher first in PASSWORD_HASHERS.')
+
+        except Exception as e:
+            raise CommandError(str(e))
+
+    @staticmethod
+    def benchmark_hashers(iterations: int) -> PrettyTable:
+
+        table = PrettyTable()
+        table.field_names = ['hasher', 'algorithm', 'verify (ms)', 'logins/sec per core']
+
+        for hasher in get_hashers():
+
+            name = f'{type(hasher).__module__}.{type(hasher).__name__}'
+
+            try:
+                latency = verify_latency(hasher, iterations)
+            except ValueError as e:
+                # the hasher's library isn't installed
+                table.add_row([name, hasher.algorithm, str(e), '-'])
+                continue
+
+            table.add_row([name, hasher.algorithm, f'{latency:.2f}', f'{1000 / latency:.1f}'])
+
+        return table
+
+    @staticmethod
+    def calibrate_argon2(target_ms: float, parallelism: int, max_memory: int, iterations: int) -> tuple:
+        """
+        Doubles the memory cost from Django's default up to
+        max_memory (KiB) and finds the largest time cost that
+        verifies within target_ms for each. The suggestion is
+        the most memory hungry candidate with at least two
+        passes - memory is what makes cracking expensive.
+        """
+        table = PrettyTable()
+        table.field_names = ['memory cost (KiB)', 'time cost', 'verify (ms)']
+
+        suggestion = None
+        memory_cost = Argon2PasswordHasher.memory_cost
+
+        while memory_cost <= max_memory:
+
+            single_pass = verify_latency(argon2_hasher(1, memory_cost, parallelism), iterations)
+            if single_pass > target_ms:
+                break
+
+            # a pass costs about the same, start off the estimate
+            # and back off while the measurement is over the target
+            time_cost = max(1, int(target_ms // single_pass))
+            latency = verify_latency(argon2_hasher(time_cost, memory_cost, parallelism), iterations)
+
+            while time_cost > 1 and latency > target_ms:
+                time_cost -= 1
+                latency = verify_latency(argon2_hasher(time_cost, memory_cost, parallelism), iterations)
+
+            table.add_row([memory_cost, time_cost, f'{latency:.2f}'])
+
+            if time_cost >= 2 or suggestion is None:
+                suggestion = (time_cost, memory_cost, latency)
+
+            memory_cost *= 2
+
+        return table, suggestion
@@ -0,0 +1,53 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.synthetic import Generator
+
+
+class Command(BaseCommand):
+
+    help = 'Generates large volumes of synthetic authors, series, tutorials, posts, votes and bookmarks'
+
+    def get_version(self):
+        return '1.0.0'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--authors', type=int, default=100)
+        parser.add_argument('--series', type=int, default=200)
+        parser.add_argument('--tutorials', type=int, default=2000)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--votes', type=int, default=10000)
+        parser.add_argument('--bookmarks', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=None, help='seed to reproduce a dataset with')
+        parser.add_argument('--workers', type=int, default=1, help='processes writing text')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--no-index', action='store_true',
+                            help="don't index for search (run rebuild_index afterwards)")
+
+    def handle(self, *args, **options):
+
+        seed = options['seed'] if options['seed'] is not None else random.randrange(2 ** 32)
+        print(f'Generating with seed {seed}.')
+
+        generator = Generator(
+            seed=seed,
+            workers=options['workers'],
+            index=not options['no_index'],
+            chunk_size=options['chunk_size'],
+            counts={
+                'post': options['posts'],
+                'vote': options['votes'],
+                'author': options['authors'],
+                'series': options['series'],
+                'tutorial': options['tutorials'],
+                'bookmark': options['bookmarks'],
+            },
+        )
+
+        try:
+            created = generator.run()
+        except Exception as e:
+            raise CommandError(str(e))
+
+        print('Created ' + ', '.join(f'{count} {kind} rows' for kind, count in created.items()) + '.')
@@ -0,0 +1,202 @@
+import hashlib
+
+from django.core.cache import cache
+from django.utils.http import http_date, quote_etag
+from django.utils.cache import get_conditional_response
+
+from rest_framework.response import Response
+
+from core.utils import eager_load, annotate_rows
+from core.cache import PAYLOAD_CACHE_TIMEOUT, payload_tag, get_tag_versions
+from core.serializers import get_values_serializer
+
+
+class EagerLoadingMixin:
+    """
+    Mixin for GenericAPIView subclasses that plans the
+    queryset according to the view's serializer. Hooks
+    into filter_queryset (instead of get_queryset) since
+    most views override get_queryset to filter by slug
+    or username and the planning should still apply.
+    Columns the view reads itself besides the serializer
+    go in required_columns so they aren't deferred.
+    Annotations are computed for the page or the object
+    once it's fetched, keeping them out of the count.
+    """
+
+    required_columns = ()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return eager_load(queryset, self.get_serializer_class(), keep=self.required_columns, annotate=False)
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            annotate_rows(page, self.get_serializer_class())
+        return page
+
+    def get_object(self):
+        instance = super().get_object()
+        annotate_rows([instance], self.get_serializer_class())
+        return instance
+
+
+class ValuesListMixin:
+    """
+    Mixin for read-only ListAPIViews that builds the page
+    from .values() rows with a ValuesSerializer compiled
+    from the view's serializer class instead of running
+    a full ModelSerializer over model instances.
+    """
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        serializer = get_values_serializer(serializer_class)
+
+        # annotations are filled in per page by annotate_rows
+        annotations = getattr(getattr(serializer_class, 'Meta', None), 'annotations', {})
+        lookups = [lookup for lookup in serializer.lookups if lookup not in annotations]
+
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = queryset.prefetch_related(None).values(
+            *dict.fromkeys(['pk', *lookups, *getattr(self, 'required_columns', ())])
+        )
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+
+        return Response(serializer.serialize(annotate_rows(list(queryset), serializer_class)))
+
+
+class CachedRetrieveMixin:
+    """
+    Mixin for RetrieveAPIViews that keeps the serialized
+    payload of every object in the cache under its lookup
+    value (the slug mostly), so that a cache hit is served
+    without a single query. Models are responsible for
+    calling invalidate_payloads with payload_cache_prefix
+    whenever something the payload is built from changes.
+    The version of the lookup is read before the object,
+    a payload built from a row that changed meanwhile is
+    cached under a version that is no longer current.
+    """
+
+    payload_cache_prefix = None
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        tag = payload_tag(self.payload_cache_prefix, lookup)
+        key = f'{tag}.{get_tag_versions((tag,))}'
+
+        cached = cache.get(key)
+
+        if cached is None:
+            instance = self.get_object()
+            cached = (getattr(self, 'validators', None), self.get_serializer(instance).data)
+            cache.set(key, cached, timeout=PAYLOAD_CACHE_TIMEOUT)
+        elif cached[0] is not None:
+            # validators are cached along with the payload
+            # so conditional requests are answered for free
+            self.check_preconditions(*cached[0])
+
+        return Response(cached[1])
+
+
+class NotModified(Exception):
+
+    def __init__(self, response):
+        super(NotModified, self).__init__()
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Mixin for generic views that emits ETag and Last-Modified
+    validators and answers matching conditional requests with
+    a 304 (or a 412) before anything is serialized. Validators
+    are derived from the rows the view fetches anyway - the pk
+    and last_modified_field of the object or of every row on
+    the page - plus the page's count and the versions of the
+    cache tags (see core.cache) of related rows the payload
+    renders, such as the author's name.
+
+    Works for RetrieveAPIViews and for paginated ListAPIViews,
+    including ValuesListMixin ones. Models without a column
+    like 'updated' set last_modified_field to None, their
+    rows are versioned by the cache tags alone and carry no
+    Last-Modified. Views paging through something else can
+    override row_version and call check_preconditions.
+    """
+
+    validator_tags = ()
+    last_modified_field = 'updated'
+
+    validators = None
+
+    @property
+    def required_columns(self):
+        return ('pk', self.last_modified_field) if self.last_modified_field else ('pk',)
+
+    def row_version(self, row) -> tuple:
+        """
+        The pk and the last modified time (or None) of
+        a row, a model instance or a values() dict.
+        """
+        if isinstance(row, dict):
+            return row['pk'], row[self.last_modified_field] if self.last_modified_field else None
+        return row.pk, getattr(row, self.last_modified_field) if self.last_modified_field else None
+
+    def compute_validators(self, rows, count=None):
+        versions = [self.row_version(row) for row in rows]
+
+        fingerprint = '|'.join([
+            get_tag_versions(self.validator_tags) if self.validator_tags else '',
+            str(count),
+            ','.join(f'{pk}:{timestamp.timestamp() if timestamp else ""}' for pk, timestamp in versions),
+        ])
+        etag = quote_etag(hashlib.md5(fingerprint.encode()).hexdigest())
+
+        modified = [timestamp for pk, timestamp in versions if timestamp is not None]
+        return f'W/{etag}', int(max(modified).timestamp()) if modified else None
+
+    def check_preconditions(self, etag, last_modified):
+        self.validators = (etag, last_modified)
+
+        response = get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            raise NotModified(response)
+
+    def get_object(self):
+        instance = super(ConditionalGetMixin, self).get_object()
+        self.check_preconditions(*self.compute_validators([instance]))
+        return instance
+
+    def paginate_queryset(self, queryset):
+        page = super(ConditionalGetMixin, self).paginate_queryset(queryset)
+
+        if page is not None:
+            # page number paginators expose the total which the
+            # response carries, cursor paginators don't have one
+            django_page = getattr(self.paginator, 'page', None)
+            count = django_page.paginator.count if django_page is not None else None
+            self.check_preconditions(*self.compute_validators(page, count))
+
+        return page
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super(ConditionalGetMixin, self).handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super(ConditionalGetMixin, self).finalize_response(request, response, *args, **kwargs)
+
+        if self.validators is not None and response.status_code in (200, 304):
+            etag, last_modified = self.validators
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+
+        return response
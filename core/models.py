@@ -1,3 +1,39 @@
-from django.db import models
+class StoredValuesMixin:
+    """
+    Mixin for models whose signal receivers need to tell
+    what a save changed without reading the row again.
+    Remembers the values of the fields an instance was
+    loaded with (or last saved) in stored_values, keyed
+    by attname - references to the values, not copies.
+    """
 
-# Create your models here.
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(StoredValuesMixin, cls).from_db(db, field_names, values)
+        instance.stored_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super(StoredValuesMixin, self).save(*args, **kwargs)
+
+        update_fields = kwargs.get('update_fields')
+        deferred = self.get_deferred_fields()
+
+        stored = getattr(self, 'stored_values', {})
+        stored.update({
+            field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields
+            if field.attname not in deferred and (
+                update_fields is None or field.name in update_fields or field.attname in update_fields
+            )
+        })
+        self.stored_values = stored
+
+    def has_changed(self, *fields) -> bool:
+        """
+        Whether any of fields (attnames) differs from its
+        stored value. Fields the instance wasn't loaded
+        with - none at all for new instances - count as
+        changed.
+        """
+        stored = getattr(self, 'stored_values', {})
+        return any(field not in stored or stored[field] != getattr(self, field) for field in fields)
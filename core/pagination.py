@@ -0,0 +1,38 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class TimelineCursorPagination(CursorPagination):
+    """
+    Cursor pagination over the ('-timestamp', '-id')
+    ordering shared by posts, tutorials and series.
+    Every page is a range scan on the matching index,
+    so deep pages cost as much as the first one.
+    """
+    ordering = ('-timestamp', '-id')
+
+
+class TimelinePagination(PageNumberPagination):
+    """
+    Page number pagination that clients can opt out of
+    in favour of TimelineCursorPagination by passing a
+    `cursor` query parameter - empty for the first page
+    and the `next` / `previous` links after that. Page
+    numbers need a COUNT(*) and an OFFSET scan which
+    grow with the page requested; cursors need neither.
+    """
+    cursor_query_param = 'cursor'
+
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param in request.query_params:
+            self.cursor_paginator = TimelineCursorPagination()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+
+        return super(TimelinePagination, self).paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+
+        return super(TimelinePagination, self).get_paginated_response(data)
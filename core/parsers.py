@@ -0,0 +1,42 @@
+import json
+
+from rest_framework.parsers import BaseParser
+from rest_framework.exceptions import ParseError
+
+
+def read_ndjson(lines) -> list:
+    """
+    Parses newline delimited JSON (one value per line,
+    blank lines skipped) from an iterable of str or bytes
+    lines. Raises ValueError naming the first bad line.
+    """
+    values = []
+
+    for number, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode()
+        if not line.strip():
+            continue
+        try:
+            values.append(json.loads(line))
+        except ValueError as e:
+            raise ValueError(f'Line {number} is not valid JSON: {e}')
+
+    return values
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses application/x-ndjson request bodies into
+    a list of the values of their lines.
+    """
+
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return []
+        try:
+            return read_ndjson(stream)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ParseError(str(e))
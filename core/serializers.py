@@ -0,0 +1,92 @@
+import functools
+from collections import OrderedDict
+
+from rest_framework.serializers import Serializer, IntegerField, BooleanField
+
+
+class ValuesSerializer:
+    """
+    Serializes rows of a .values() queryset with the
+    fields of an existing ModelSerializer, skipping
+    model instantiation and DRF's attribute traversal
+    for every field of every row. The output matches
+    what the ModelSerializer itself would produce.
+
+    Fields that don't map onto a column of their own
+    (string related fields, method fields and so on)
+    are mapped onto a values() lookup in the Meta of
+    the serializer with a `values_sources` dict. The
+    values of those are used as they are.
+    """
+
+    def __init__(self, serializer_class):
+        meta = getattr(serializer_class, 'Meta', None)
+        sources = getattr(meta, 'values_sources', {})
+
+        self.accessors = []
+
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if name in sources:
+                self.accessors.append((name, sources[name], None))
+            else:
+                self.accessors.append((name, field.source, field.to_representation))
+
+        self.lookups = tuple(lookup for name, lookup, representation in self.accessors)
+
+    def to_representation(self, row: dict) -> OrderedDict:
+        ret = OrderedDict()
+
+        for name, lookup, representation in self.accessors:
+            value = row[lookup]
+            if value is None or representation is None:
+                ret[name] = value
+            else:
+                ret[name] = representation(value)
+
+        return ret
+
+    def serialize(self, rows) -> list:
+        return [self.to_representation(row) for row in rows]
+
+
+@functools.lru_cache(maxsize=None)
+def get_values_serializer(serializer_class) -> ValuesSerializer:
+    """
+    Compiles the field accessors of a serializer class
+    once per process instead of once per request.
+    """
+    return ValuesSerializer(serializer_class)
+
+
+class ToggleSerializer(Serializer):
+    """
+    One (id, state) pair of a batch of toggles, e.g.
+    {"id": 4, "state": true} to like tutorial 4.
+    """
+
+    id = IntegerField(min_value=1)
+    state = BooleanField()
+
+
+def parse_toggles(data, max_length: int) -> dict:
+    """
+    Validates a list of toggles and folds it into a dict
+    of ids to the state they should end up in. Later
+    toggles of the same id win, just like replaying them
+    one by one would. Raises ValueError on invalid input.
+    """
+    if not isinstance(data, list):
+        raise ValueError('Provide actions as a list of ids and states.')
+    # checked before validating, so an oversized batch is
+    # turned down without a look at any of its toggles
+    if len(data) > max_length:
+        raise ValueError(f'Cannot apply more than {max_length} actions at once.')
+
+    serializer = ToggleSerializer(data=data, many=True)
+
+    if not serializer.is_valid():
+        raise ValueError('Provide actions as a list of ids and states.')
+
+    return {toggle['id']: toggle['state'] for toggle in serializer.validated_data}
@@ -0,0 +1,476 @@
+"""
+
+Synthetic data for load and scale testing - authors, series,
+tutorials, posts, votes and bookmarks in the volumes of a
+production database, generated in chunks. The text of every
+chunk is written by worker processes (faker is what takes
+the time) while the main process inserts the chunks that
+are done with bulk_create, chunk by chunk, in order. Only
+a couple of chunks per worker are generated ahead of the
+inserts, and votes and bookmarks are drawn and inserted a
+chunk at a time too, so memory doesn't grow with volume.
+
+Rows refer to other rows by pks drawn off the range of the
+pks present (see sample_rows and pair_chunks) and only the
+rows drawn are read back, a chunk at a time, never the ids
+of a whole table.
+
+Every chunk draws from its own random generators, seeded
+off the seed of the run, its kind and its number, so the
+same seed builds the same data with any number of workers,
+and on the same starting database the same seed makes the
+same database. Votes and bookmarks already there are left
+as they are, running again doesn't duplicate them.
+
+Slugs and usernames are allocated a chunk at a time with
+unique_slugs, which reads the taken ones with a query per
+couple hundred of them - any suffix scheme of our own could
+collide with a title that slugifies to the same thing.
+
+bulk_create skips save() and its signals, so whatever the
+receivers would do for the rows is done here in bulk too.
+
+"""
+import math
+import random
+import itertools
+import collections
+import multiprocessing
+
+import faker
+
+from django.db import transaction, connections
+from django.utils import timezone
+from django.db.models import Count, Sum, Min, Max, Subquery, OuterRef, F
+from django.db.models.functions import Coalesce
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+
+from rest_framework.authtoken.models import Token
+
+from vote.models import Vote, UP
+
+from blog.models import Post
+from search.index import index_objects
+from author.models import Author, Bookmark
+from author.utils import bookmarks_cache_key
+from author.content import record_new_content
+from tutorial.models import Tutorial, Series
+from core.cache import bump_tags, invalidate_payloads
+from core.utils import unique_slugs, bulk_create_by_slug
+
+PASSWORD = 'aaa'
+PHOTO_IDS = ('566', '741', '849', '885', '973')
+
+SERIES_TYPES = [choice for choice, label in Series.CHOICES]
+
+# chance of a tutorial being part of a series, of a
+# tutorial or post being a draft, of a user being staff
+IN_SERIES = 0.85
+DRAFT = 0.10
+STAFF = 0.08
+
+
+def chunk_random(seed, kind: str, number: int, purpose: str = 'text') -> random.Random:
+    # str seeds are hashed with sha512, unlike hash() they
+    # are the same in every process and every run
+    return random.Random(f'{seed}:{kind}:{number}:{purpose}')
+
+
+def chunk_faker(rng: random.Random) -> faker.Faker:
+    fake = faker.Faker()
+    fake.seed_instance(rng.getrandbits(64))
+    return fake
+
+
+def distinct_pairs(rng: random.Random, left: list, right: list, total: int):
+    """
+    Yields up to total distinct pairs of items of left and
+    right in a random order, without keeping the pairs
+    drawn so far - the pairs are read off a random affine
+    permutation of the numbers of all the pairs there are.
+    """
+    size = len(left) * len(right)
+
+    if not size:
+        return
+
+    step = rng.randrange(1, max(size, 2))
+    while math.gcd(step, size) != 1:
+        step = rng.randrange(1, size)
+    offset = rng.randrange(size)
+
+    for number in range(min(total, size)):
+        position = (offset + step * number) % size
+        yield left[position // len(right)], right[position % len(right)]
+
+
+def pk_range(queryset) -> range:
+    bounds = queryset.aggregate(low=Min('pk'), high=Max('pk'))
+    return range(bounds['low'], bounds['high'] + 1) if bounds['low'] is not None else range(0)
+
+
+def sample_rows(rng: random.Random, queryset, size: int, *fields) -> list:
+    """
+    Draws size rows of queryset at random, with replacement,
+    as tuples of their pk and fields. Pks are drawn off the
+    range between the lowest and the highest and read back
+    with one query, the ones that fell into gaps are drawn
+    again - only the rows drawn are read from the table.
+    """
+    pks = pk_range(queryset)
+    rows = [None] * size if pks else []
+    missing = list(range(len(rows)))
+
+    while missing:
+        drawn = [pks[rng.randrange(len(pks))] for _ in missing]
+        found = {row[0]: row for row in queryset.filter(pk__in=set(drawn)).values_list('pk', *fields)}
+
+        for position, pk in zip(missing, drawn):
+            rows[position] = found.get(pk)
+        missing = [position for position in missing if rows[position] is None]
+
+    return rows
+
+
+def picsum(rng: random.Random) -> str:
+    return f'https://picsum.photos/1900/1080/?image={rng.choice(PHOTO_IDS)}'
+
+
+def body(fake: faker.Faker, rng: random.Random) -> str:
+    return '\n\n'.join(fake.sentence(170) for _ in range(rng.randint(7, 10)))
+
+
+def generate_author(fake, rng) -> dict:
+    return {
+        'email': fake.email(),
+        'bio': fake.text(65),
+        'username': fake.user_name(),
+        'last_name': fake.last_name(),
+        'first_name': fake.first_name(),
+        'is_staff': rng.random() < STAFF,
+    }
+
+
+def generate_series(fake, rng) -> dict:
+    return {
+        'thumbnail': picsum(rng),
+        'description': fake.text(150),
+        'type_of': rng.choice(SERIES_TYPES),
+        'name': fake.text(50).title()[:-1],
+    }
+
+
+def generate_tutorial(fake, rng) -> dict:
+    return {
+        'content': body(fake, rng),
+        'description': fake.text(150),
+        'draft': rng.random() < DRAFT,
+        'title': fake.text(50).title()[:-1],
+    }
+
+
+def generate_post(fake, rng) -> dict:
+    return {
+        'body': body(fake, rng),
+        'thumbnail': picsum(rng),
+        'description': fake.text(150),
+        'draft': rng.random() < DRAFT,
+        'title': fake.text(50).title()[:-1],
+    }
+
+
+GENERATORS = {
+    'author': generate_author,
+    'series': generate_series,
+    'tutorial': generate_tutorial,
+    'post': generate_post,
+}
+
+
+def generate_chunk(task: tuple) -> list:
+    """
+    Writes the fields of a chunk of rows. Runs in the
+    worker processes, so it must not touch the database.
+    """
+    seed, kind, number, size = task
+
+    rng = chunk_random(seed, kind, number)
+    fake = chunk_faker(rng)
+
+    return [GENERATORS[kind](fake, rng) for _ in range(size)]
+
+
+class Generator:
+    """
+    Generates counts (a dict of author, series, tutorial,
+    post, vote and bookmark to the number of each to
+    create) off seed. log is called with progress.
+    """
+
+    def __init__(self, counts: dict, seed, workers: int = 1, chunk_size: int = 1000, index: bool = True,
+                 log=print):
+        self.seed = seed
+        self.log = log
+        self.index = index
+        self.counts = counts
+        self.workers = workers
+        self.chunk_size = chunk_size
+
+    def run(self) -> dict:
+        if self.workers > 1:
+            # workers are forked, keep them off our connections
+            connections.close_all()
+            pool = multiprocessing.Pool(self.workers)
+        else:
+            pool = None
+
+        try:
+            created = {
+                'author': self.create_authors(pool),
+                'series': self.create_series(pool),
+                'tutorial': self.create_tutorials(pool),
+                'post': self.create_posts(pool),
+                'vote': self.create_votes(),
+                'bookmark': self.create_bookmarks(),
+            }
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+        bump_tags('posts', 'series', 'tutorials', 'authors')
+
+        return created
+
+    def generated(self, pool, tasks):
+        """
+        Yields the rows of every task in order. Workers are
+        kept at most two tasks each ahead of the consumer,
+        pool.imap would generate all of them as fast as it
+        can and buffer what isn't consumed yet.
+        """
+        if pool is None:
+            yield from map(generate_chunk, tasks)
+            return
+
+        tasks = iter(tasks)
+        window = collections.deque(
+            pool.apply_async(generate_chunk, (task,)) for task in itertools.islice(tasks, self.workers * 2)
+        )
+
+        while window:
+            rows = window.popleft().get()
+            for task in itertools.islice(tasks, 1):
+                window.append(pool.apply_async(generate_chunk, (task,)))
+            yield rows
+
+    def chunks(self, pool, kind: str):
+        """
+        Yields the chunk number and the generated rows of
+        every chunk of kind, in order.
+        """
+        total = self.counts.get(kind, 0)
+
+        tasks = (
+            (self.seed, kind, number, min(self.chunk_size, total - start))
+            for number, start in enumerate(range(0, total, self.chunk_size))
+        )
+
+        for number, rows in enumerate(self.generated(pool, tasks)):
+            yield number, rows
+            self.log(f'Created {number * self.chunk_size + len(rows)} of {total} {kind} rows.')
+
+    def links(self, kind: str, number: int) -> random.Random:
+        return chunk_random(self.seed, kind, number, 'links')
+
+    def record(self, kind: str, instances: list):
+        if self.index:
+            index_objects(kind, instances)
+        record_new_content(instances)
+
+    def create_authors(self, pool) -> int:
+        # one hash for everyone, hashing is meant to be slow
+        password = make_password(PASSWORD)
+
+        for number, rows in self.chunks(pool, 'author'):
+            rng = self.links('author', number)
+            usernames = unique_slugs(User, [row['username'] for row in rows], 'username')
+
+            users = [
+                User(
+                    password=password,
+                    email=row['email'],
+                    is_staff=row['is_staff'],
+                    last_name=row['last_name'],
+                    first_name=row['first_name'],
+                    username=username,
+                )
+                for row, username in zip(rows, usernames)
+            ]
+
+            with transaction.atomic():
+                bulk_create_by_slug(User, users, self.chunk_size, 'username')
+                Author.objects.bulk_create(
+                    Author(user_id=user.pk, bio=row['bio'], authenticated=user.is_staff)
+                    for user, row in zip(users, rows)
+                )
+                Token.objects.bulk_create(
+                    Token(user_id=user.pk, key='%040x' % rng.getrandbits(160)) for user in users
+                )
+
+        return self.counts.get('author', 0)
+
+    def create_series(self, pool) -> int:
+
+        for number, rows in self.chunks(pool, 'series'):
+            rng = self.links('series', number)
+            slugs = unique_slugs(Series, [row['name'] for row in rows])
+            creators = sample_rows(rng, Author.objects.all(), len(rows))
+
+            series = [
+                Series(creator_id=creator_id, slug=slug, **row)
+                for row, slug, (creator_id,) in zip(rows, slugs, creators)
+            ]
+
+            with transaction.atomic():
+                bulk_create_by_slug(Series, series, self.chunk_size)
+                self.record('series', series)
+
+        return self.counts.get('series', 0)
+
+    def create_tutorials(self, pool) -> int:
+
+        for number, rows in self.chunks(pool, 'tutorial'):
+            rng = self.links('tutorial', number)
+            slugs = unique_slugs(Tutorial, [row['title'] for row in rows])
+
+            in_series = [rng.random() < IN_SERIES for _ in rows] if Series.objects.exists() else [False] * len(rows)
+            series = iter(sample_rows(rng, Series.objects.all(), sum(in_series), 'creator_id'))
+            authors = iter(sample_rows(rng, Author.objects.all(), len(rows) - sum(in_series)))
+
+            tutorials = [Tutorial(slug=slug, **row) for row, slug in zip(rows, slugs)]
+
+            for tutorial, part_of_series in zip(tutorials, in_series):
+                if part_of_series:
+                    # tutorials of a series are by its creator
+                    tutorial.series_id, tutorial.author_id = next(series)
+                else:
+                    tutorial.author_id, = next(authors)
+
+            # tutorials are numbered on after the existing ones of
+            # their series, earlier chunks are inserted by now
+            numbers = dict(Tutorial.objects.filter(
+                series__in={tutorial.series_id for tutorial in tutorials if tutorial.series_id}
+            ).values('series').order_by().annotate(count=Count('pk')).values_list('series', 'count'))
+
+            for tutorial in tutorials:
+                if tutorial.series_id:
+                    numbers[tutorial.series_id] = tutorial.number = numbers.get(tutorial.series_id, 0) + 1
+
+            with transaction.atomic():
+                bulk_create_by_slug(Tutorial, tutorials, self.chunk_size)
+                self.record('tutorial', tutorials)
+
+        return self.counts.get('tutorial', 0)
+
+    def create_posts(self, pool) -> int:
+
+        for number, rows in self.chunks(pool, 'post'):
+            rng = self.links('post', number)
+            slugs = unique_slugs(Post, [row['title'] for row in rows])
+            authors = sample_rows(rng, Author.objects.all(), len(rows))
+
+            posts = [
+                Post(author_id=author_id, slug=slug, **row)
+                for row, slug, (author_id,) in zip(rows, slugs, authors)
+            ]
+
+            with transaction.atomic():
+                bulk_create_by_slug(Post, posts, self.chunk_size)
+                self.record('post', posts)
+
+        return self.counts.get('post', 0)
+
+    def pair_chunks(self, kind: str, left, right):
+        """
+        Yields up to counts[kind] distinct pairs of pks of
+        the rows of the querysets left and right, chunk_size
+        of them at a time. Pairs are drawn off the pk ranges
+        of both and checked against the rows a chunk at a
+        time, the ones that fell into gaps are skipped.
+        """
+        left_pks, right_pks = pk_range(left), pk_range(right)
+        pairs = distinct_pairs(self.links(kind, 0), left_pks, right_pks, len(left_pks) * len(right_pks))
+        wanted = self.counts.get(kind, 0)
+
+        while wanted:
+            drawn = list(itertools.islice(pairs, self.chunk_size))
+            if not drawn:
+                break
+
+            lefts = set(left.filter(pk__in={pair[0] for pair in drawn}).values_list('pk', flat=True))
+            rights = set(right.filter(pk__in={pair[1] for pair in drawn}).values_list('pk', flat=True))
+
+            chunk = [pair for pair in drawn if pair[0] in lefts and pair[1] in rights][:wanted]
+            wanted -= len(chunk)
+
+            if chunk:
+                yield chunk
+
+    def create_votes(self) -> int:
+        content_type = ContentType.objects.get_for_model(Tutorial)
+
+        # counters are recounted in the database instead of
+        # moved vote by vote, which also settles conflicts
+        votes = Vote.objects.filter(
+            action=UP, content_type=content_type, object_id=OuterRef('pk')
+        ).order_by().values('object_id').annotate(count=Count('pk')).values('count')
+        scores = Tutorial.objects.filter(
+            series=OuterRef('pk')
+        ).order_by().values('series').annotate(score=Sum('vote_score')).values('score')
+
+        created = 0
+
+        for chunk in self.pair_chunks('vote', User.objects.filter(author__isnull=False), Tutorial.objects.all()):
+            # only the tutorials voted on and their series are recounted
+            tutorials = Tutorial.objects.filter(pk__in={tutorial_id for user_id, tutorial_id in chunk})
+            now = timezone.now()
+
+            with transaction.atomic():
+                # users may have liked some of these already
+                Vote.objects.bulk_create((
+                    Vote(user_id=user_id, content_type=content_type, object_id=tutorial_id, action=UP)
+                    for user_id, tutorial_id in chunk
+                ), ignore_conflicts=True)
+
+                tutorials.update(num_vote_up=Coalesce(Subquery(votes), 0), updated=now)
+                tutorials.update(vote_score=F('num_vote_up') - F('num_vote_down'))
+
+                series_ids = set(tutorials.filter(series__isnull=False).values_list('series_id', flat=True))
+                Series.objects.filter(pk__in=series_ids).update(vote_score=Coalesce(Subquery(scores), 0), updated=now)
+
+                invalidate_payloads('tutorial', *tutorials.values_list('slug', flat=True))
+
+            created += len(chunk)
+            self.log(f'Created {created} of {self.counts.get("vote", 0)} vote rows.')
+
+        return created
+
+    def create_bookmarks(self) -> int:
+        created = 0
+
+        for chunk in self.pair_chunks('bookmark', Author.objects.all(), Series.objects.all()):
+            # authors may have bookmarked some of these already
+            Bookmark.objects.bulk_create((
+                Bookmark(author_id=author_id, model_type='series', model_pk=series_id)
+                for author_id, series_id in chunk
+            ), ignore_conflicts=True)
+
+            # cached bookmarked ids are read again on next use
+            cache.delete_many([bookmarks_cache_key(author_id, 'series') for author_id in {pair[0] for pair in chunk}])
+
+            created += len(chunk)
+
+        return created
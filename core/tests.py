@@ -1,3 +1,335 @@
-from django.test import TestCase
+import io
+import csv
+import json
+import random
 
-# Create your tests here.
+from django.db import connection
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password, identify_hasher
+from django.core.cache import cache
+from django.utils.text import slugify
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.generics import ListAPIView
+from rest_framework.test import APIRequestFactory
+from rest_framework.authtoken.models import Token
+
+from vote.models import Vote
+
+from blog.models import Post
+from author.models import Author, Bookmark, TimelineEntry
+from core.synthetic import Generator, generate_chunk, distinct_pairs, sample_rows
+from tutorial.models import Tutorial, Series
+from blog.views import PostListAPIView
+from core.utils import unused_columns, unique_slugs, create_with_unique_slug
+from core.mixins import EagerLoadingMixin
+from author.views import AuthorPostListAPIView
+from blog.serializers import PostListSerializer, PostDetailSerializer
+from blog.management.commands._create_post import create_post
+from author.management.commands._create_author import create_author
+from tutorial.management.commands._create_series import create_one_series
+from tutorial.management.commands._create_tutorial import create_tutorial
+from tutorial.views.tutorials import RecentTutorialAPIView
+from tutorial.views.series import SeriesListAPIView, SeriesNameAndIdListAPIView
+from tutorial.serializers import (
+    SeriesListSerializer,
+    TutorialListSerializer,
+    TutorialDetailSerializer,
+    SeriesNameAndIdSerializer,
+)
+
+
+class ValuesListTest(TestCase):
+    """
+    Compares the JSON rendered by the views that serialize
+    .values() rows against the JSON rendered by plain
+    ListAPIViews over the same ModelSerializers byte by byte.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+        self.factory = APIRequestFactory()
+        self.authors = [create_author() for _ in range(5)]
+        self.series = [create_one_series(random.choice(self.authors).id) for _ in range(15)]
+        self.posts = [create_post(random.choice(self.authors).id) for _ in range(30)]
+
+        for _ in range(30):
+            tutorial = create_tutorial(random.choice(self.authors).id, draft=random.random() < 0.2)
+            if random.random() < 0.8:
+                tutorial.series = random.choice(self.series)
+                tutorial.save()
+
+    def render(self, view, url: str) -> bytes:
+        response = view(self.factory.get(url))
+        response.render()
+        self.assertEqual(response.status_code, 200)
+        return response.content
+
+    @staticmethod
+    def plain_list_view(serializer_class, queryset, **attrs):
+        return type('PlainListAPIView', (EagerLoadingMixin, ListAPIView), {
+            'queryset': queryset,
+            'serializer_class': serializer_class,
+            **attrs,
+        }).as_view()
+
+    def test_post_list(self):
+        plain_view = self.plain_list_view(PostListSerializer, Post.objects.filter(draft=False))
+
+        for page in (1, 2):
+            self.assertEqual(self.render(PostListAPIView.as_view(), f'/api/blog/?page={page}'),
+                             self.render(plain_view, f'/api/blog/?page={page}'))
+
+    def test_recent_tutorial_list(self):
+        plain_view = self.plain_list_view(TutorialListSerializer,
+                                          RecentTutorialAPIView.queryset,
+                                          pagination_class=RecentTutorialAPIView.pagination_class)
+
+        self.assertEqual(self.render(RecentTutorialAPIView.as_view(), '/api/tutorials/recent/'),
+                         self.render(plain_view, '/api/tutorials/recent/'))
+
+    def test_series_list(self):
+        plain_view = self.plain_list_view(SeriesListSerializer, Series.objects.all())
+
+        for page in (1, 2):
+            self.assertEqual(self.render(SeriesListAPIView.as_view(), f'/api/series/?page={page}'),
+                             self.render(plain_view, f'/api/series/?page={page}'))
+
+    def test_series_name_list(self):
+        plain_view = self.plain_list_view(SeriesNameAndIdSerializer, Series.objects.all(), pagination_class=None)
+
+        self.assertEqual(self.render(SeriesNameAndIdListAPIView.as_view(), '/api/series/names/'),
+                         self.render(plain_view, '/api/series/names/'))
+
+
+class DeferredColumnsTest(TestCase):
+
+    def test_unused_columns(self):
+        """
+        Text columns only the detail serializers output
+        are deferred for the list serializers.
+        """
+
+        self.assertIn('body', unused_columns(PostListSerializer))
+        self.assertIn('content', unused_columns(TutorialListSerializer))
+
+        # updated is only kept for the validators of the views
+        self.assertEqual(unused_columns(PostDetailSerializer), ('updated',))
+        self.assertEqual(unused_columns(TutorialDetailSerializer), ('updated',))
+
+    def test_author_post_list_defers_body(self):
+        author = create_author()
+        posts = [create_post(author.id) for _ in range(5)]
+
+        request = APIRequestFactory().get(f'/api/authors/detail/{author.user.username}/posts/')
+
+        with CaptureQueriesContext(connection) as context:
+            response = AuthorPostListAPIView.as_view()(request, username=author.user.username)
+            response.render()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(posts), response.data['count'])
+
+        page_query = context.captured_queries[-1]['sql']
+        quote = connection.ops.quote_name
+
+        self.assertIn(f'{quote("blog_post")}.{quote("title")}', page_query)
+        self.assertNotIn(f'{quote("blog_post")}.{quote("body")}', page_query)
+
+
+class UniqueSlugTest(TestCase):
+
+    def setUp(self):
+        self.author = create_author()
+
+    def create_tutorial(self, title: str) -> Tutorial:
+        return create_with_unique_slug(
+            Tutorial,
+            title=title,
+            content='content',
+            description='description',
+            author_id=self.author.id,
+        )
+
+    def test_collision_suffixes(self):
+        tutorials = [self.create_tutorial('Binary Search Trees') for _ in range(3)]
+
+        self.assertEqual([tutorial.slug for tutorial in tutorials],
+                         ['binary-search-trees', 'binary-search-trees-2', 'binary-search-trees-3'])
+
+        # slugs sharing the prefix aren't mistaken for collisions
+        self.assertEqual(self.create_tutorial('Binary Search').slug, 'binary-search')
+
+    def test_resave_keeps_slug(self):
+        self.create_tutorial('Graphs')
+        tutorial = self.create_tutorial('Graphs')
+
+        tutorial.description = 'updated description'
+        tutorial.save()
+        self.assertEqual(Tutorial.objects.get(pk=tutorial.pk).slug, 'graphs-2')
+
+        tutorial.title = 'Directed Graphs'
+        tutorial.save()
+        self.assertEqual(Tutorial.objects.get(pk=tutorial.pk).slug, 'directed-graphs')
+
+    def test_batch_matches_one_by_one(self):
+        titles = ['Graphs', 'Binary Search', 'Graphs', 'Graphs 2', 'Binary Search', 'Heaps']
+        self.create_tutorial('Graphs')
+        self.create_tutorial('Binary Search')
+
+        with self.assertNumQueries(1):
+            slugs = unique_slugs(Tutorial, titles)
+
+        self.assertEqual(slugs, [self.create_tutorial(title).slug for title in titles])
+
+
+class ListCommandTest(TestCase):
+
+    def setUp(self):
+        self.authors = [create_author() for _ in range(3)]
+        for author in self.authors:
+            create_post(author.id, draft=False)
+            create_tutorial(author.id, draft=False)
+            create_one_series(author.id)
+
+    @staticmethod
+    def list_rows(command: str, *args, **options) -> list:
+        out = io.StringIO()
+        call_command(command, *args, stdout=out, **options)
+        return out.getvalue().splitlines()
+
+    def test_keyset_chunks(self):
+
+        for command in ('list_posts', 'list_tutorials', 'list_series', 'list_users'):
+            with self.assertNumQueries(1):
+                rows = self.list_rows(command, format='ndjson')
+            self.assertEqual(len(rows), 3)
+
+            # a query per chunk, the last one found short
+            with self.assertNumQueries(2):
+                chunked = self.list_rows(command, format='ndjson', chunk_size=2)
+            self.assertEqual(chunked, rows)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.list_rows('list_posts', 2, format='ndjson', chunk_size=2)), 2)
+
+        # only the start of long text is read
+        contents = [json.loads(row)['content'] for row in self.list_rows('list_tutorials', format='ndjson')]
+        self.assertEqual(contents, [tutorial.content[:10] for tutorial in Tutorial.objects.order_by('pk')])
+
+        rows = [json.loads(row) for row in self.list_rows('list_users', format='ndjson')]
+        self.assertEqual([row['token'] for row in rows],
+                         [Token.objects.get(user_id=author.user_id).key for author in self.authors])
+
+    def test_formats(self):
+
+        # bodies span lines, which csv quotes
+        rows = list(csv.reader(io.StringIO('\n'.join(self.list_rows('list_posts', 2, format='csv')))))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0][:2], ['id', 'title'])
+
+        # borders, header and two rows
+        self.assertEqual(len(self.list_rows('list_series', 2)), 6)
+
+
+class GeneratorTest(TestCase):
+
+    def test_chunks_are_reproducible(self):
+        self.assertEqual(generate_chunk((7, 'post', 3, 2)), generate_chunk((7, 'post', 3, 2)))
+        self.assertNotEqual(generate_chunk((7, 'post', 3, 2)), generate_chunk((7, 'post', 4, 2)))
+
+    def test_distinct_pairs(self):
+        left, right = list(range(7)), list(range(10, 16))
+
+        pairs = list(distinct_pairs(random.Random(7), left, right, 30))
+        self.assertEqual(len(set(pairs)), 30)
+        self.assertEqual(pairs, list(distinct_pairs(random.Random(7), left, right, 30)))
+
+        # asking for more than there are yields all of them
+        self.assertEqual(set(distinct_pairs(random.Random(7), left, right, 100)),
+                         {(a, b) for a in left for b in right})
+
+    def test_generate(self):
+        create_one_series(create_author().id)
+
+        counts = {'author': 5, 'series': 3, 'tutorial': 7, 'post': 3, 'vote': 12, 'bookmark': 4}
+        created = Generator(counts, seed=7, chunk_size=2, log=lambda message: None).run()
+
+        self.assertEqual(created, counts)
+        self.assertEqual(Token.objects.count(), User.objects.count())
+        self.assertEqual(TimelineEntry.objects.count(), 4 + 7 + 3)
+        self.assertEqual(Vote.objects.count(), 12)
+
+        for tutorial in Tutorial.objects.all():
+            self.assertEqual(tutorial.vote_score, tutorial.votes.count())
+        for series in Series.objects.all():
+            self.assertEqual(series.vote_score, sum(tutorial.vote_score for tutorial in series.tutorials.all()))
+
+        # generated slugs don't get in the way of new ones
+        post = create_post(draft=False)
+        self.assertEqual(post.slug, slugify(post.title))
+
+    def test_generate_slugs_taken(self):
+        author = create_author()
+
+        # a post already holds the slug of the first generated one
+        title = generate_chunk((7, 'post', 0, 4))[0]['title']
+        Post.objects.create(title=title, description='-', body='-', author=author)
+
+        Generator({'post': 6}, seed=7, chunk_size=4, log=lambda message: None).run()
+
+        self.assertEqual(Post.objects.filter(title=title).count(), 2)
+        self.assertEqual(Post.objects.values('slug').distinct().count(), Post.objects.count())
+
+    def test_generate_again(self):
+        counts = {'author': 4, 'series': 3, 'tutorial': 4, 'vote': 6, 'bookmark': 5}
+        Generator(counts, seed=7, chunk_size=2, log=lambda message: None).run()
+
+        # the same pairs are drawn again and left as they are
+        Generator({'vote': 6, 'bookmark': 5}, seed=7, chunk_size=2, log=lambda message: None).run()
+
+        self.assertEqual(Bookmark.objects.count(), 5)
+        self.assertEqual(Vote.objects.count(), 6)
+
+    def test_sample_rows(self):
+        authors = [create_author() for _ in range(6)]
+        Author.objects.filter(pk__in=[author.pk for author in authors[1:5]]).delete()
+
+        rows = sample_rows(random.Random(7), Author.objects.all(), 20, 'user_id')
+        self.assertEqual(len(rows), 20)
+        self.assertEqual({row for row in rows}, {(author.pk, author.user_id) for author in (authors[0], authors[5])})
+        self.assertEqual(sample_rows(random.Random(7), Series.objects.all(), 3), [])
+
+    def test_generate_leaves_other_rows(self):
+        tutorial = create_tutorial(create_author().id, draft=False)
+        updated = Tutorial.objects.get(pk=tutorial.pk).updated
+
+        Generator({'author': 2, 'tutorial': 2, 'vote': 0}, seed=7, log=lambda message: None).run()
+
+        self.assertEqual(Tutorial.objects.get(pk=tutorial.pk).updated, updated)
+
+
+@override_settings(
+    PASSWORD_HASHERS=['core.hashers.TunedArgon2PasswordHasher'],
+    ARGON2_TIME_COST=1, ARGON2_MEMORY_COST=1024, ARGON2_PARALLELISM=1,
+)
+class TunedArgon2PasswordHasherTest(TestCase):
+
+    def test_tuned_parameters_and_upgrade(self):
+
+        encoded = make_password('a-password')
+        summary = identify_hasher(encoded).safe_summary(encoded)
+        self.assertEqual((summary['time cost'], summary['memory cost'], summary['parallelism']), (1, 1024, 1))
+
+        with self.settings(ARGON2_TIME_COST=2):
+            user = User.objects.create(username='tuned', password=encoded)
+            self.assertTrue(identify_hasher(encoded).must_update(encoded))
+
+            # logging in rehashes with the tuned parameters
+            self.assertTrue(user.check_password('a-password'))
+            user.refresh_from_db()
+            self.assertNotEqual(user.password, encoded)
+            self.assertFalse(identify_hasher(user.password).must_update(user.password))
@@ -0,0 +1,235 @@
+import re
+import functools
+import collections
+
+from django.db.models import Q
+from django.utils.text import slugify
+from django.db import transaction, IntegrityError
+
+
+@functools.lru_cache(maxsize=None)
+def unused_columns(serializer_class) -> tuple:
+    """
+    Names of the columns of a ModelSerializer's model
+    that none of its fields read, e.g. Post.body for
+    PostListSerializer. Relations and the primary key
+    are always kept, so fields that read through a
+    method (source='*' or source='get_...') should
+    only rely on those.
+    """
+    meta = getattr(serializer_class, 'Meta', None)
+    model = getattr(meta, 'model', None)
+
+    if model is None:
+        return ()
+
+    sources = {field.source.split('.')[0] for field in serializer_class().fields.values()}
+
+    return tuple(
+        field.name for field in model._meta.concrete_fields
+        if not field.is_relation and not field.primary_key and field.name not in sources
+    )
+
+
+def eager_load(queryset, serializer_class, keep=(), annotate=True):
+    """
+    Applies the related lookups and annotations a
+    serializer declares in its Meta (select_related,
+    prefetch_related and annotations) to a queryset
+    so that rendering a page of objects costs a fixed
+    number of queries instead of one or more queries
+    for every row in the page. Columns the serializer
+    never outputs are deferred as well, except for the
+    ones named in keep. Querysets that get paginated
+    should leave annotations to annotate_rows instead.
+    """
+    meta = getattr(serializer_class, 'Meta', None)
+
+    annotations = getattr(meta, 'annotations', {})
+    select_related = getattr(meta, 'select_related', ())
+    prefetch_related = getattr(meta, 'prefetch_related', ())
+
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    if annotations and annotate:
+        queryset = queryset.annotate(**annotations)
+
+    deferred = [column for column in unused_columns(serializer_class) if column not in keep]
+    if deferred:
+        queryset = queryset.defer(*deferred)
+
+    return queryset
+
+
+def annotate_rows(rows, serializer_class):
+    """
+    Computes the annotations a serializer declares in its
+    Meta for a page of rows (model instances or values()
+    dicts carrying a pk) with one query over their pks
+    and sets them on the rows. Aggregates over joins (see
+    PUBLISHED_TUTORIAL_COUNT) annotated on the queryset
+    itself would end up in the paginator's COUNT as well,
+    grouping every matching row instead of just the page.
+    """
+    meta = getattr(serializer_class, 'Meta', None)
+    annotations = getattr(meta, 'annotations', {})
+
+    if not annotations or not rows:
+        return rows
+
+    pks = [row['pk'] if isinstance(row, dict) else row.pk for row in rows]
+    values = {
+        row['pk']: row
+        for row in meta.model._default_manager.filter(pk__in=pks).order_by().values('pk').annotate(**annotations)
+    }
+
+    for row, pk in zip(rows, pks):
+        for name in annotations:
+            if isinstance(row, dict):
+                row[name] = values[pk][name]
+            else:
+                setattr(row, name, values[pk][name])
+
+    return rows
+
+
+def parse_ids(values, max_length: int) -> list:
+    """
+    Reads ids out of query or form values, which can
+    be given one per value or comma separated (e.g.
+    ?ids=1,2&ids=3). Duplicates are dropped and order
+    is kept. Raises ValueError on anything but ids and
+    on more than max_length of them.
+    """
+    ids = []
+
+    for value in values:
+        for part in value.split(','):
+            if part.strip():
+                ids.append(int(part))
+
+    ids = list(dict.fromkeys(ids))
+
+    if any(pk < 1 for pk in ids) or len(ids) > max_length:
+        raise ValueError(f'Provide up to {max_length} ids.')
+
+    return ids
+
+
+def unique_slug(instance, value: str, slug_field: str = 'slug') -> str:
+    """
+    Slugifies value into a slug no other row of the
+    instance's model holds, appending -2, -3 and so
+    on to it on collisions. Checking the plain slug is
+    a single lookup on the unique index of the field
+    and collisions only range scan the same index.
+
+    Saving an instance that already holds a slug for
+    the same value again keeps its slug as it is.
+    """
+    model = type(instance)
+    max_length = model._meta.get_field(slug_field).max_length
+
+    # leave room for a collision suffix
+    base = slugify(value)[:max_length - 10]
+    current = getattr(instance, slug_field)
+    pattern = re.compile(rf'^{re.escape(base)}(?:-(\d+))?$')
+
+    if instance.pk and current and pattern.match(current):
+        return current
+
+    queryset = model._default_manager.exclude(pk=instance.pk)
+
+    if not queryset.filter(**{slug_field: base}).exists():
+        return base
+
+    taken = queryset.filter(**{f'{slug_field}__startswith': f'{base}-'}).values_list(slug_field, flat=True)
+    suffixes = [int(match.group(1)) for match in map(pattern.match, taken) if match and match.group(1)]
+
+    return f'{base}-{max(suffixes + [1]) + 1}'
+
+
+def unique_slugs(model, values, slug_field: str = 'slug', chunk_size: int = 200) -> list:
+    """
+    unique_slug for many new instances of a model at
+    once - returns a slug for every value, in order,
+    that neither existing rows nor the other slugs hold.
+    Taken slugs are read with a query per chunk_size
+    distinct slugs instead of a query or two per value.
+    """
+    max_length = model._meta.get_field(slug_field).max_length
+
+    bases = [slugify(value)[:max_length - 10] for value in values]
+    distinct = list(dict.fromkeys(bases))
+
+    taken, highest = set(), collections.defaultdict(int)
+
+    def take(slug):
+        taken.add(slug)
+        head, _, suffix = slug.rpartition('-')
+        if head and suffix.isdigit():
+            highest[head] = max(highest[head], int(suffix))
+
+    for start in range(0, len(distinct), chunk_size):
+        query = Q()
+        for base in distinct[start:start + chunk_size]:
+            query |= Q(**{slug_field: base}) | Q(**{f'{slug_field}__startswith': f'{base}-'})
+
+        for slug in model._default_manager.filter(query).values_list(slug_field, flat=True).iterator():
+            take(slug)
+
+    slugs = []
+
+    for base in bases:
+        slug = base
+
+        if slug in taken:
+            suffix = max(highest[base], 1) + 1
+            while f'{base}-{suffix}' in taken:
+                suffix += 1
+            slug = f'{base}-{suffix}'
+
+        take(slug)
+        slugs.append(slug)
+
+    return slugs
+
+
+def bulk_create_by_slug(model, instances: list, chunk_size: int = 500, slug_field: str = 'slug') -> list:
+    """
+    bulk_create in chunks that leaves every instance with
+    its primary key set. Backends that can't return the
+    keys of inserted rows (MySQL) get them read back by
+    slug, with one more query per chunk.
+    """
+    for start in range(0, len(instances), chunk_size):
+        chunk = model._default_manager.bulk_create(instances[start:start + chunk_size])
+
+        if chunk and chunk[0].pk is None:
+            pks = dict(model._default_manager.filter(**{
+                f'{slug_field}__in': [getattr(instance, slug_field) for instance in chunk]
+            }).values_list(slug_field, 'pk'))
+
+            for instance in chunk:
+                instance.pk = pks[getattr(instance, slug_field)]
+
+    return instances
+
+
+def create_with_unique_slug(model, retries: int = 3, **fields):
+    """
+    Creates an instance of a model whose pre_save signal
+    fills in its slug with unique_slug. Two concurrent
+    creates can still pick the same slug - the loser hits
+    the unique constraint and is retried, which makes the
+    signal pick the next free suffix.
+    """
+    for attempt in range(retries):
+        try:
+            with transaction.atomic():
+                return model.objects.create(**fields)
+        except IntegrityError:
+            if attempt + 1 == retries:
+                raise
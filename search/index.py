@@ -0,0 +1,406 @@
+"""
+
+An inverted index over posts, tutorials and series kept
+in the search models. Text is split into lowercase terms
+and every posting stores the frequency of a term in a
+document, weighted by the field it appears in (a term in
+a title counts thrice). Queries are ranked with BM25 and
+the last term of a query matches as a prefix as well, so
+results show up while a client is still typing.
+
+Ranking reads a bounded number of postings whatever the
+size of the index - a prefix expands to its most common
+terms only, common terms contribute the postings with the
+highest frequencies only, and neither the number of
+documents a term is found in (kept in the Term table)
+nor the corpus statistics BM25 normalizes by (counters
+kept in the cache) are aggregated over the postings.
+
+Drafts are never indexed. The signals in search.models
+keep the index up to date, rebuild_index rebuilds it.
+
+"""
+import re
+import math
+import hashlib
+import collections
+
+from django.db import transaction
+from django.db.models import F, Count, Sum
+from django.core.cache import cache
+
+from blog.models import Post
+from tutorial.models import Tutorial, Series
+from search.models import Document, Posting, Term
+
+
+K1 = 1.2
+B = 0.75
+
+MIN_PREFIX_LENGTH = 3
+# indexed terms a prefix expands to at most, the ones
+# found in the most documents are kept
+MAX_PREFIX_TERMS = 16
+# postings read per term at most, the ones with the
+# highest (weighted) frequencies are kept
+MAX_TERM_POSTINGS = 1000
+
+# corpus statistics are moved along with the index and
+# only expire to even out what a race may have skewed
+STATS_CACHE_TIMEOUT = 60 * 60
+MAX_TERM_LENGTH = Posting._meta.get_field('term').max_length
+
+TERM_RE = re.compile(r'\w+')
+STOP_WORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'from', 'has', 'have', 'in', 'is',
+    'it', 'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'were', 'will', 'with',
+))
+
+Source = collections.namedtuple('Source', ('model', 'fields', 'title_field', 'published'))
+
+SOURCES = {
+    'post': Source(Post, (('title', 3), ('description', 2), ('body', 1)), 'title', {'draft': False}),
+    'tutorial': Source(Tutorial, (('title', 3), ('description', 2), ('content', 1)), 'title', {'draft': False}),
+    'series': Source(Series, (('name', 3), ('description', 1)), 'name', {}),
+}
+
+KINDS = {source.model: kind for kind, source in SOURCES.items()}
+
+
+def tokenize(text: str) -> list:
+    return [
+        term for term in TERM_RE.findall(text.lower())
+        if term not in STOP_WORDS and len(term) <= MAX_TERM_LENGTH
+    ]
+
+
+def is_published(instance, source: Source) -> bool:
+    # values are compared the way they are stored, views
+    # assign form input such as draft='False' as it is
+    return all(
+        instance._meta.get_field(field).to_python(getattr(instance, field)) == value
+        for field, value in source.published.items()
+    )
+
+
+def is_stale(instance) -> bool:
+    """
+    Whether the document of a saved instance may be out
+    of date - a vote saves a whole tutorial, but leaves
+    everything that's indexed as it was loaded.
+    """
+    source = SOURCES[KINDS[type(instance)]]
+    return instance.has_changed(
+        'slug', 'timestamp', 'description', source.title_field,
+        *(field for field, weight in source.fields), *source.published,
+    )
+
+
+def stats_cache_keys(kind: str) -> tuple:
+    return f'search-documents:{kind}', f'search-length:{kind}'
+
+
+def corpus_stats(kinds=None) -> tuple:
+    """
+    Returns the number of documents of kinds (all of them
+    by default) and the sum of their lengths. Both are kept
+    in the cache per kind and moved by index_objects and
+    remove_object as documents come and go, the Document
+    table is only aggregated for kinds missing there.
+    """
+    kinds = kinds or list(SOURCES)
+
+    keys = [key for kind in kinds for key in stats_cache_keys(kind)]
+    stats = cache.get_many(keys)
+
+    missing = [kind for kind in kinds if any(key not in stats for key in stats_cache_keys(kind))]
+
+    if missing:
+        aggregated = {
+            kind: (count, length) for kind, count, length in Document.objects.filter(
+                kind__in=missing
+            ).order_by().values('kind').annotate(count=Count('id'), length=Sum('length')).values_list(
+                'kind', 'count', 'length'
+            )
+        }
+
+        for kind in missing:
+            for key, value in zip(stats_cache_keys(kind), aggregated.get(kind, (0, 0))):
+                # add, counters moved meanwhile are kept
+                cache.add(key, value or 0, timeout=STATS_CACHE_TIMEOUT)
+                stats[key] = value or 0
+
+    count = sum(stats[stats_cache_keys(kind)[0]] for kind in kinds)
+    length = sum(stats[stats_cache_keys(kind)[1]] for kind in kinds)
+
+    return count, length
+
+
+def move_corpus_stats(kind: str, documents: int, length: int):
+    """
+    Adds to the cached statistics of a kind once the
+    current transaction commits. Kinds not cached are
+    aggregated again on the next read instead.
+    """
+    def move():
+        for key, delta in zip(stats_cache_keys(kind), (documents, length)):
+            if delta:
+                try:
+                    cache.incr(key, delta)
+                except ValueError:
+                    pass
+
+    if documents or length:
+        transaction.on_commit(move)
+
+
+def chunked_terms(terms: dict, chunk_size: int = 500):
+    for delta, of_delta in terms.items():
+        for start in range(0, len(of_delta), chunk_size):
+            yield delta, of_delta[start:start + chunk_size]
+
+
+def move_term_counts(kind: str, added, removed):
+    """
+    Counts documents into and out of the Term rows of
+    their terms. added and removed are the terms of the
+    documents written and deleted, one entry per term
+    and document. Rows no document is left in go.
+    """
+    deltas = collections.Counter(added)
+    deltas.subtract(removed)
+
+    terms = collections.defaultdict(list)
+    for term, delta in deltas.items():
+        if delta:
+            terms[delta].append(term)
+
+    Term.objects.bulk_create((
+        Term(term=term, kind=kind) for delta in terms if delta > 0 for term in terms[delta]
+    ), ignore_conflicts=True)
+
+    for delta, chunk in chunked_terms(terms):
+        Term.objects.filter(kind=kind, term__in=chunk).update(documents=F('documents') + delta)
+
+    for delta, chunk in chunked_terms(terms):
+        if delta < 0:
+            Term.objects.filter(kind=kind, term__in=chunk, documents=0).delete()
+
+
+def build_document(kind: str, instance) -> tuple:
+    """
+    Returns an unsaved Document for instance along
+    with the weighted frequencies of its terms.
+    """
+    source = SOURCES[kind]
+    frequencies = collections.Counter()
+
+    for field, weight in source.fields:
+        for term in tokenize(getattr(instance, field) or ''):
+            frequencies[term] += weight
+
+    document = Document(
+        kind=kind,
+        object_id=instance.pk,
+        slug=instance.slug,
+        timestamp=instance.timestamp,
+        length=sum(frequencies.values()),
+        title=getattr(instance, source.title_field),
+        description=(instance.description or '')[:300],
+    )
+
+    fingerprint = '\x00'.join(
+        [document.title, document.slug, document.description, document.timestamp.isoformat()] +
+        [getattr(instance, field) or '' for field, weight in source.fields]
+    )
+    document.digest = hashlib.sha1(fingerprint.encode()).hexdigest()
+
+    return document, frequencies
+
+
+def index_objects(kind: str, instances) -> int:
+    """
+    (Re)indexes instances of the kind's model in bulk and
+    returns the number of documents written. Instances
+    whose indexed text didn't change since they were last
+    indexed are skipped - tutorials are saved on every
+    vote, for one - and unpublished ones are removed.
+    """
+    built = {
+        instance.pk: build_document(kind, instance)
+        for instance in instances if is_published(instance, SOURCES[kind])
+    }
+    unpublished = [instance.pk for instance in instances if instance.pk not in built]
+
+    existing = {
+        pk: (digest, length) for pk, digest, length in Document.objects.filter(
+            kind=kind, object_id__in=list(built) + unpublished
+        ).values_list('object_id', 'digest', 'length')
+    }
+
+    changed = {pk: entry for pk, entry in built.items() if existing.get(pk, (None,))[0] != entry[0].digest}
+    removed = [pk for pk in unpublished + list(changed) if pk in existing]
+
+    if not changed and not removed:
+        return 0
+
+    with transaction.atomic():
+        move_term_counts(
+            kind,
+            [term for document, frequencies in changed.values() for term in frequencies],
+            Posting.objects.filter(
+                document__kind=kind, document__object_id__in=removed
+            ).values_list('term', flat=True) if removed else (),
+        )
+
+        Document.objects.filter(kind=kind, object_id__in=removed).delete()
+        Document.objects.bulk_create(document for document, frequencies in changed.values())
+
+        move_corpus_stats(
+            kind,
+            len(changed) - len(removed),
+            sum(document.length for document, frequencies in changed.values()) -
+            sum(existing[pk][1] for pk in removed),
+        )
+
+        # bulk_create doesn't set primary keys on MySQL
+        ids = dict(Document.objects.filter(
+            kind=kind, object_id__in=list(changed)
+        ).values_list('object_id', 'id'))
+
+        Posting.objects.bulk_create(
+            Posting(document_id=ids[pk], term=term, frequency=frequency)
+            for pk, (document, frequencies) in changed.items()
+            for term, frequency in frequencies.items()
+        )
+
+    return len(changed)
+
+
+def index_object(instance) -> int:
+    return index_objects(KINDS[type(instance)], [instance])
+
+
+def remove_object(instance):
+    kind = KINDS[type(instance)]
+    documents = Document.objects.filter(kind=kind, object_id=instance.pk)
+
+    length = documents.values_list('length', flat=True).first()
+
+    if length is not None:
+        with transaction.atomic():
+            move_term_counts(kind, (), Posting.objects.filter(
+                document__kind=kind, document__object_id=instance.pk
+            ).values_list('term', flat=True))
+            documents.delete()
+            move_corpus_stats(kind, -1, -length)
+
+
+def rebuild(chunk_size: int = 500) -> dict:
+    """
+    Drops the index and indexes every published object
+    again, chunk_size objects at a time. Returns the
+    number of documents indexed per kind.
+    """
+    counts = {}
+
+    with transaction.atomic():
+        Term.objects.all().delete()
+        Posting.objects.all().delete()
+        Document.objects.all().delete()
+
+        for kind, source in SOURCES.items():
+            counts[kind], chunk = 0, []
+            queryset = source.model.objects.filter(**source.published).order_by('pk')
+
+            for instance in queryset.iterator(chunk_size=chunk_size):
+                chunk.append(instance)
+                if len(chunk) == chunk_size:
+                    counts[kind] += index_objects(kind, chunk)
+                    chunk = []
+
+            if chunk:
+                counts[kind] += index_objects(kind, chunk)
+
+        keys = [key for kind in SOURCES for key in stats_cache_keys(kind)]
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+    return counts
+
+
+def rank(query: str, kinds=None) -> list:
+    """
+    Scores the documents matching any term of query with
+    BM25 and returns (document id, score) pairs, the best
+    match first. The last term matches the indexed terms
+    it's a prefix of too (the MAX_PREFIX_TERMS most common
+    ones, picked off the Term table), scoring by the best
+    of them. Terms found in more than MAX_TERM_POSTINGS
+    documents only score the ones they're most frequent in.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+
+    if not terms:
+        return []
+
+    prefix = terms[-1] if len(terms[-1]) >= MIN_PREFIX_LENGTH else None
+
+    count, length = corpus_stats(kinds)
+
+    if not count:
+        return []
+
+    average = length / count
+
+    postings, counts = Posting.objects.order_by(), Term.objects.order_by()
+    if kinds:
+        postings = postings.filter(document__kind__in=kinds)
+        counts = counts.filter(kind__in=kinds)
+
+    # the number of documents every term is found in, summed
+    # over the kinds searched without reading any postings
+    counts = counts.values('term').annotate(documents=Sum('documents'))
+
+    frequencies = dict(counts.filter(term__in=terms).values_list('term', 'documents'))
+
+    if prefix:
+        # terms are lowercase already, LIKE without BINARY
+        # can range scan the term index on MySQL
+        frequencies.update(counts.filter(term__istartswith=prefix).exclude(term__in=terms).order_by(
+            '-documents', 'term'
+        ).values_list('term', 'documents')[:MAX_PREFIX_TERMS])
+
+    rows = ('document_id', 'term', 'frequency', 'document__length')
+
+    common = [term for term, documents in frequencies.items() if documents > MAX_TERM_POSTINGS]
+    rare = [term for term in frequencies if term not in common]
+
+    found = list(postings.filter(term__in=rare).values_list(*rows)) if rare else []
+    for term in common:
+        found += postings.filter(term=term).order_by('-frequency').values_list(*rows)[:MAX_TERM_POSTINGS]
+
+    by_term = collections.defaultdict(list)
+    for document_id, term, frequency, document_length in found:
+        by_term[term].append((document_id, frequency, document_length))
+
+    scores = collections.defaultdict(float)
+
+    for query_term in terms:
+        best = {}
+
+        for term, postings_of_term in by_term.items():
+            if term != query_term and not (query_term == prefix and term.startswith(prefix)):
+                continue
+
+            documents = frequencies[term]
+            idf = math.log(1 + (count - documents + 0.5) / (documents + 0.5))
+
+            for document_id, frequency, document_length in postings_of_term:
+                norm = K1 * (1 - B + B * document_length / (average or 1))
+                score = idf * frequency * (K1 + 1) / (frequency + norm)
+                best[document_id] = max(best.get(document_id, 0), score)
+
+        for document_id, score in best.items():
+            scores[document_id] += score
+
+    return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
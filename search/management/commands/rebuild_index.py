@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from search.index import rebuild
+
+
+class Command(BaseCommand):
+
+    help = 'Rebuilds the search index over posts, tutorials and series'
+
+    def get_version(self):
+        return '1.0.0'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+
+        try:
+
+            counts = rebuild(options['chunk_size'])
+
+            for kind, count in counts.items():
+                print(f'Indexed {count} {kind} documents.')
+
+        except Exception as e:
+            raise CommandError(str(e))
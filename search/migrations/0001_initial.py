@@ -0,0 +1,45 @@
+# Generated by Django 2.2.4 on 2026-10-18 12:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Document',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('timestamp', models.DateTimeField()),
+                ('title', models.CharField(max_length=160)),
+                ('slug', models.SlugField(max_length=250)),
+                ('description', models.CharField(max_length=300)),
+                ('kind', models.CharField(choices=[('post', 'Post'), ('series', 'Series'), ('tutorial', 'Tutorial')], max_length=10)),
+                ('length', models.PositiveIntegerField(default=0)),
+                ('digest', models.CharField(max_length=40)),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='Posting',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('frequency', models.PositiveIntegerField()),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='postings', to='search.Document')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='posting',
+            index=models.Index(fields=['term', 'document'], name='posting_term_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.4 on 2026-10-18 13:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='posting',
+            name='posting_term_idx',
+        ),
+        migrations.AddIndex(
+            model_name='posting',
+            index=models.Index(fields=['term', '-frequency'], name='posting_term_frequency_idx'),
+        ),
+    ]
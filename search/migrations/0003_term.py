@@ -0,0 +1,39 @@
+# Generated by Django 2.2.4 on 2026-10-18 14:12
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_terms(apps, schema_editor):
+    Term = apps.get_model('search', 'Term')
+    Posting = apps.get_model('search', 'Posting')
+
+    Term.objects.bulk_create(
+        Term(term=term, kind=kind, documents=documents)
+        for term, kind, documents in Posting.objects.order_by().values('term', 'document__kind').annotate(
+            documents=Count('id')
+        ).values_list('term', 'document__kind', 'documents')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0002_posting_term_frequency_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Term',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('kind', models.CharField(choices=[('post', 'Post'), ('series', 'Series'), ('tutorial', 'Tutorial')], max_length=10)),
+                ('documents', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('term', 'kind')},
+            },
+        ),
+        migrations.RunPython(populate_terms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,88 @@
+from django.db import models
+from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete
+
+from blog.models import Post
+from tutorial.models import Tutorial, Series
+
+
+class Document(models.Model):
+    """
+    An indexed post, tutorial or series. Carries the
+    fields search results are rendered from so a page
+    of results never has to touch the indexed models.
+    """
+
+    KINDS = [
+        ('post', 'Post'),
+        ('series', 'Series'),
+        ('tutorial', 'Tutorial'),
+    ]
+
+    object_id = models.PositiveIntegerField()
+    timestamp = models.DateTimeField()
+    title = models.CharField(max_length=160)
+    slug = models.SlugField(max_length=250)
+    description = models.CharField(max_length=300)
+    kind = models.CharField(choices=KINDS, max_length=10)
+    # sum of the weighted frequencies of all postings
+    length = models.PositiveIntegerField(default=0)
+    digest = models.CharField(max_length=40)
+
+    def __str__(self):
+        return f'{self.kind}: {self.title}'
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+
+
+class Posting(models.Model):
+
+    term = models.CharField(max_length=64)
+    frequency = models.PositiveIntegerField()
+
+    document = models.ForeignKey(Document,
+                                 related_name='postings',
+                                 on_delete=models.CASCADE)
+
+    class Meta:
+        indexes = [
+            # ranking reads the postings of a term with the
+            # highest frequencies first, see search.index
+            models.Index(fields=['term', '-frequency'], name='posting_term_frequency_idx'),
+        ]
+
+
+
+class Term(models.Model):
+    """
+    The number of documents of a kind a term is found
+    in, moved along with the postings by search.index
+    so that ranking never has to count postings.
+    """
+
+    term = models.CharField(max_length=64)
+    kind = models.CharField(choices=Document.KINDS, max_length=10)
+    documents = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # also ranges over the terms starting with a prefix
+        unique_together = ('term', 'kind')
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Series)
+@receiver(post_save, sender=Tutorial)
+def index_saved_object(sender, instance=None, raw=False, **kwargs):
+    from search.index import index_object, is_stale
+    if not raw and is_stale(instance):
+        index_object(instance)
+
+
+# noinspection PyUnusedLocal
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Series)
+@receiver(post_delete, sender=Tutorial)
+def unindex_deleted_object(sender, instance=None, **kwargs):
+    from search.index import remove_object
+    remove_object(instance)
@@ -0,0 +1,22 @@
+from rest_framework.serializers import (
+    CharField,
+    FloatField,
+    IntegerField,
+    DateTimeField,
+    ModelSerializer,
+)
+
+from search.models import Document
+
+
+class SearchResultSerializer(ModelSerializer):
+
+    type = CharField(source='kind')
+    score = FloatField(read_only=True)
+    id = IntegerField(source='object_id')
+    timestamp = DateTimeField(format='%dth %b, %Y')
+
+    class Meta:
+
+        model = Document
+        fields = ('id', 'type', 'title', 'slug', 'description', 'timestamp', 'score')
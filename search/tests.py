@@ -0,0 +1,200 @@
+import json
+from unittest import mock
+
+from django.db import connection
+from django.db.models import Sum, Count
+from django.core.cache import cache
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, TransactionTestCase
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from blog.models import Post
+from tutorial.models import Tutorial
+from blog.views import PostCreateAPIView
+from search.views import SearchAPIView
+from search.index import index_object, rank, corpus_stats
+from search.models import Document, Posting, Term
+from tutorial.management.commands._create_series import create_one_series
+from tutorial.management.commands._create_tutorial import create_tutorial
+from author.management.commands._create_author import create_author
+
+
+BASE_URL = '/api/search/'
+
+
+class SearchIndexTest(TestCase):
+
+    def setUp(self):
+
+        cache.clear()
+
+        self.factory = APIRequestFactory()
+        self.author = create_author()
+
+        self.title_post = self.create_post('Python Generators Explained', 'Lazy iteration in depth.')
+        self.body_post = self.create_post('Notes From A Conference', 'Talks about python and rust.')
+        self.draft_post = self.create_post('Python Drafts', 'Unfinished python notes.', draft=True)
+
+    def create_post(self, title: str, description: str, draft: bool = False) -> Post:
+        return Post.objects.create(title=title, description=description, body='Some body text.',
+                                   draft=draft, author=self.author)
+
+    def search(self, **params) -> dict:
+        response = SearchAPIView.as_view()(self.factory.get(BASE_URL, params))
+        response.render()
+        return json.loads(response.content.decode())
+
+    def test_ranking_and_draft_exclusion(self):
+        """
+        Title matches outrank description matches and
+        drafts never show up, not even by prefix.
+        """
+        results = self.search(q='python')['results']
+        self.assertEqual([result['id'] for result in results], [self.title_post.id, self.body_post.id])
+        self.assertEqual(results[0]['title'], self.title_post.title)
+        self.assertEqual(results[0]['type'], 'post')
+
+        self.assertEqual(len(self.search(q='unfinished')['results']), 0)
+
+    def test_prefix_matching(self):
+        results = self.search(q='lazy gener')['results']
+        self.assertEqual([result['id'] for result in results], [self.title_post.id])
+
+    def test_incremental_updates(self):
+
+        self.draft_post.draft = False
+        self.draft_post.save()
+        self.assertEqual(len(self.search(q='unfinished')['results']), 1)
+
+        self.title_post.draft = True
+        self.title_post.save()
+        self.assertEqual(len(self.search(q='generators')['results']), 0)
+
+        self.body_post.delete()
+        self.assertFalse(Document.objects.filter(kind='post', object_id=self.body_post.id).exists())
+        self.assertFalse(Posting.objects.filter(term='rust').exists())
+
+        # saving without touching the text doesn't reindex
+        self.assertEqual(index_object(self.draft_post), 0)
+
+    def test_votes_not_reindexed(self):
+
+        tutorial = Tutorial.objects.get(pk=create_tutorial(self.author.id, draft=False).pk)
+
+        with CaptureQueriesContext(connection) as context:
+            tutorial.votes.up(self.author.user_id)
+            tutorial.votes.delete(self.author.user_id)
+
+        self.assertFalse([query['sql'] for query in context.captured_queries if 'search_' in query['sql']])
+
+        tutorial.title = 'A Retitled Tutorial'
+        tutorial.save()
+        self.assertEqual(Document.objects.get(kind='tutorial', object_id=tutorial.pk).title, 'A Retitled Tutorial')
+
+    def test_type_filter(self):
+
+        series = create_one_series(self.author.id)
+        series.name = 'Python From Scratch'
+        series.save()
+
+        results = self.search(q='python', type='series')['results']
+        self.assertEqual([(result['type'], result['id']) for result in results], [('series', series.id)])
+        self.assertEqual(len(rank('python')), 3)
+
+    def test_invalid_queries(self):
+        self.assertIn('error', self.search(q=' '))
+        self.assertIn('error', self.search(q='python', type='author'))
+
+    def test_created_through_view(self):
+        """
+        Form input such as draft=False arrives as a
+        string and still counts as published.
+        """
+        request = self.factory.post('/api/blog/new/', {
+            'draft': False,
+            'body': 'Some body text.',
+            'title': 'Indexed Through The View',
+            'description': 'Posted with a form.',
+            'token': Token.objects.get(user_id=self.author.user_id).key,
+        })
+        self.assertEqual(PostCreateAPIView.as_view()(request).status_code, 201)
+
+        results = self.search(q='form')['results']
+        self.assertEqual([result['title'] for result in results], ['Indexed Through The View'])
+
+
+class SearchRankingBoundsTest(TransactionTestCase):
+    """
+    Corpus statistics follow the index through the cache,
+    document counts per term through the Term table, and
+    prefixes only expand to a few of their terms.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.author = create_author()
+
+    def create_post(self, title: str, draft: bool = False) -> Post:
+        return Post.objects.create(title=title, description='A description.', body='Some body text.',
+                                   draft=draft, author=self.author)
+
+    def assert_stats_match_index(self):
+        self.assertEqual(corpus_stats(), (
+            Document.objects.count(), Document.objects.aggregate(length=Sum('length'))['length'] or 0,
+        ))
+
+    def assert_terms_match_index(self):
+        self.assertEqual(
+            set(Term.objects.values_list('term', 'kind', 'documents')),
+            set(Posting.objects.values('term', 'document__kind').annotate(documents=Count('id')).values_list(
+                'term', 'document__kind', 'documents'
+            )),
+        )
+
+    def test_corpus_stats(self):
+
+        posts = [self.create_post(f'Post Number {number}') for number in range(3)]
+        self.assert_stats_match_index()
+
+        # cached from here on, and moved along with the index
+        with self.assertNumQueries(0):
+            corpus_stats()
+
+        posts[0].title = 'A Much Longer Title Than Any Other Post'
+        posts[0].save()
+        posts[1].draft = True
+        posts[1].save()
+        posts[2].delete()
+        self.create_post('Another Post')
+
+        self.assert_stats_match_index()
+        self.assert_terms_match_index()
+        self.assertEqual(corpus_stats(['series']), (0, 0))
+
+    def test_prefix_expansion(self):
+
+        for word, documents in (('pythonic', 3), ('pythons', 2), ('pythonista', 1)):
+            for _ in range(documents):
+                self.create_post(f'{word} notes')
+
+        with mock.patch('search.index.MAX_PREFIX_TERMS', 2):
+            with CaptureQueriesContext(connection) as context:
+                self.assertEqual(len(rank('pyth')), 5)
+
+        # postings are read, never counted
+        for query in context.captured_queries:
+            self.assertFalse('search_posting' in query['sql'] and 'COUNT(' in query['sql'], query['sql'])
+
+        # too short to expand
+        self.assertEqual(rank('py'), [])
+
+    def test_common_terms_pruned(self):
+
+        posts = [self.create_post('Python Notes'), self.create_post('Python Python Python')]
+
+        with mock.patch('search.index.MAX_TERM_POSTINGS', 1):
+            self.assertEqual([document for document, score in rank('python')], [
+                Document.objects.get(object_id=posts[1].id).id,
+            ])
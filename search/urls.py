@@ -0,0 +1,9 @@
+from django.urls import path
+
+from search.views import SearchAPIView
+
+app_name = 'search'
+
+urlpatterns = [
+    path('', SearchAPIView.as_view(), name='api-search'),
+]
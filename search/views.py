@@ -0,0 +1,52 @@
+from rest_framework.response import Response
+from rest_framework.generics import ListAPIView
+from rest_framework.permissions import AllowAny
+from rest_framework.pagination import PageNumberPagination
+
+from search.index import rank, SOURCES
+from search.models import Document
+from search.serializers import SearchResultSerializer
+
+
+class SearchAPIView(ListAPIView):
+    """
+    Searches posts, tutorials and series for the terms
+    in the `q` query parameter, best match first. Pass
+    `type` (once or more) to search only some of post,
+    tutorial and series. Only the documents on the page
+    requested are loaded from the index.
+    """
+
+    permission_classes = (AllowAny,)
+    pagination_class = PageNumberPagination
+    serializer_class = SearchResultSerializer
+
+    def list(self, request, *args, **kwargs):
+
+        query = request.query_params.get('q', '').strip()
+        kinds = request.query_params.getlist('type')
+
+        if not query:
+            return Response({
+                'error': 'Search query q not provided.'
+            }, status=400)
+
+        invalid = [kind for kind in kinds if kind not in SOURCES]
+        if invalid:
+            return Response({
+                'error': f'Cannot search for type "{invalid[0]}".'
+            }, status=400)
+
+        page = self.paginate_queryset(rank(query, kinds))
+        documents = Document.objects.in_bulk([document_id for document_id, score in page])
+
+        results = []
+        for document_id, score in page:
+            # unindexed since the ranking was read
+            if document_id not in documents:
+                continue
+            document = documents[document_id]
+            document.score = round(score, 4)
+            results.append(document)
+
+        return self.get_paginated_response(self.get_serializer(results, many=True).data)
@@ -0,0 +1,141 @@
+"""
+
+An in-memory, sorted-prefix index over the names and
+slugs of all series backing name autocompletion and
+availability checks without a query per keystroke.
+
+Entries are kept sorted by the slugified name, so the
+series whose names start with a prefix form a single
+range of entries found with two binary searches, and a
+dict of slugs answers availability in constant time.
+
+Every process holds its own copy. Series saves and
+deletes bump the 'series' cache tag (see core.cache)
+and update the copy of the process they happened in;
+copies of other processes notice the bump and reload.
+
+"""
+import bisect
+import threading
+import collections
+
+from django.utils.text import slugify
+
+from core.cache import get_tag_versions
+
+
+Entry = collections.namedtuple('Entry', ('key', 'id', 'name', 'slug'))
+
+
+class Matches:
+    """
+    Lazy view over the entries of a prefix range. Slicing
+    it only copies the slice, so paginating matches costs
+    as much for the hundredth page as for the first one.
+    """
+
+    def __init__(self, entries, start: int, stop: int):
+        self.entries = entries
+        self.start, self.stop = start, stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            return self.entries[self.start + start:self.start + stop:step]
+        return self.entries[self.start + range(len(self))[index]]
+
+
+class SeriesNameIndex:
+
+    tag = 'series'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = []
+        self.by_id = {}
+        self.slugs = {}
+        self.version = None
+
+    @staticmethod
+    def make_entry(pk: int, name: str, slug: str) -> Entry:
+        return Entry(slugify(name), pk, name, slug)
+
+    def load(self, version: str):
+        from tutorial.models import Series
+
+        entries = sorted(self.make_entry(*row) for row in Series.objects.values_list('id', 'name', 'slug'))
+
+        # entries are replaced instead of mutated so Matches
+        # handed out earlier keep slicing a consistent list
+        self.entries = entries
+        self.by_id = {entry.id: entry for entry in entries}
+        self.slugs = {entry.slug: entry.id for entry in entries}
+        self.version = version
+
+    def current(self):
+        """
+        Returns the index after reloading it if a series
+        was changed by another process since it was loaded.
+        """
+        version = get_tag_versions((self.tag,))
+
+        if version != self.version:
+            with self.lock:
+                if version != self.version:
+                    self.load(version)
+
+        return self
+
+    def apply(self, pk: int, entry: Entry = None):
+        """
+        Replaces (or with no entry, removes) the entry of
+        series pk. Called once the change is committed and
+        the tag bumped, so the bump is adopted if it's the
+        only one since the index was loaded - otherwise the
+        index is left for current() to reload.
+        """
+        with self.lock:
+            version = get_tag_versions((self.tag,))
+
+            if self.version is None or int(version) != int(self.version) + 1:
+                self.version = None
+                return
+
+            entries = list(self.entries)
+
+            previous = self.by_id.pop(pk, None)
+            if previous is not None:
+                del entries[bisect.bisect_left(entries, previous)]
+                self.slugs.pop(previous.slug, None)
+
+            if entry is not None:
+                bisect.insort(entries, entry)
+                self.by_id[pk] = entry
+                self.slugs[entry.slug] = pk
+
+            self.entries = entries
+            self.version = version
+
+    def update(self, pk: int, name: str, slug: str):
+        self.apply(pk, self.make_entry(pk, name, slug))
+
+    def remove(self, pk: int):
+        self.apply(pk)
+
+    def complete(self, prefix: str) -> Matches:
+        key = slugify(prefix)
+        entries = self.entries
+
+        start = bisect.bisect_left(entries, (key,))
+        stop = bisect.bisect_left(entries, (key + '\uffff',))
+
+        return Matches(entries, start, stop)
+
+    def is_taken(self, slug: str) -> bool:
+        return slug in self.slugs
+
+
+series_names = SeriesNameIndex()
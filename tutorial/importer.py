@@ -0,0 +1,102 @@
+"""
+
+Bulk import of series along with their tutorials, e.g. to
+migrate a course in one go. Records (one series with its
+nested tutorials each, as read off NDJSON) are validated
+up front, their slugs allocated in one batch and the rows
+created with bulk_create in chunks inside one transaction.
+
+bulk_create skips save() and its signals, so the work the
+receivers of Series and Tutorial would have done is done
+here in bulk instead - indexing the content for search,
+putting it on the author's timeline and bumping the cache
+tags (the series name index reloads off the bump).
+
+"""
+from django.db import transaction
+
+from search.index import index_objects
+from tutorial.models import Tutorial, Series
+from author.content import record_new_content
+from core.cache import invalidate_tags
+from core.utils import unique_slugs, bulk_create_by_slug
+from tutorial.serializers.imports import SeriesImportSerializer
+
+
+class InvalidImport(ValueError):
+
+    def __init__(self, errors: list):
+        super(InvalidImport, self).__init__(f'{len(errors)} invalid records, nothing was imported.')
+        self.errors = errors
+
+
+def validate_records(records: list) -> list:
+    """
+    Validates every record and returns their validated
+    data or raises InvalidImport with the errors of all
+    invalid records, by record number (starting at 1).
+    """
+    validated, errors = [], []
+
+    for number, record in enumerate(records, 1):
+        serializer = SeriesImportSerializer(data=record)
+        if serializer.is_valid():
+            validated.append(serializer.validated_data)
+        else:
+            errors.append({'record': number, 'errors': serializer.errors})
+
+    if errors:
+        raise InvalidImport(errors)
+
+    return validated
+
+
+def import_records(author_id: int, records: list, chunk_size: int = 500) -> list:
+    """
+    Validates records and creates their series and tutorials
+    for an author, all or nothing. Returns the created series
+    with the created tutorials in their `imported` attribute.
+    """
+    records = validate_records(records)
+
+    series = []
+    tutorials = []
+
+    for record in records:
+        fields = dict(record)
+        children = fields.pop('tutorials', [])
+
+        instance = Series(creator_id=author_id, **fields)
+        instance.imported = [
+            Tutorial(author_id=author_id, **{'number': number, **child})
+            for number, child in enumerate(children, 1)
+        ]
+
+        series.append(instance)
+        tutorials.extend(instance.imported)
+
+    with transaction.atomic():
+
+        for instance, slug in zip(series, unique_slugs(Series, [instance.name for instance in series])):
+            instance.slug = slug
+        for instance, slug in zip(tutorials, unique_slugs(Tutorial, [instance.title for instance in tutorials])):
+            instance.slug = slug
+
+        bulk_create_by_slug(Series, series, chunk_size)
+
+        for instance in series:
+            for tutorial in instance.imported:
+                tutorial.series_id = instance.pk
+
+        bulk_create_by_slug(Tutorial, tutorials, chunk_size)
+
+        for start in range(0, len(series), chunk_size):
+            index_objects('series', series[start:start + chunk_size])
+        for start in range(0, len(tutorials), chunk_size):
+            index_objects('tutorial', tutorials[start:start + chunk_size])
+
+        record_new_content(series + tutorials, chunk_size)
+
+        invalidate_tags('series', 'tutorials')
+
+    return series
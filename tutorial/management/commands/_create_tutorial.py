@@ -4,33 +4,32 @@ import random
 from author.models import Author
 from tutorial.models import Tutorial, Series
 
-AUTHOR_IDS = sorted([author_id[0] for author_id in Author.objects.values_list('id')])
-SERIES_IDS = sorted([series_id[0] for series_id in Series.objects.values_list('id')])
-
 fake = faker.Faker()
 
 
-def create_tutorial(author_id: int = None, draft: bool = random.random() < 0.10) -> Tutorial:
+def create_tutorial(author_id: int = None, draft: bool = None, author_ids: list = None) -> Tutorial:
     return Tutorial.objects.create(
-        draft=draft,
+        draft=random.random() < 0.10 if draft is None else draft,
         description=fake.text(150),
         title=fake.text(50).title()[:-1],
-        author_id=author_id if author_id else random.choice(AUTHOR_IDS),
+        author_id=author_id or random.choice(author_ids or list(Author.objects.values_list('id', flat=True))),
         content='\n\n'.join([fake.sentence(170) for _ in range(random.randint(7, 10))]),
     )
 
 
 def create_tutorials(n: int = 1):
 
+    author_ids = list(Author.objects.values_list('id', flat=True))
+    series_ids = list(Series.objects.values_list('id', flat=True))
+
     for i in range(n):
 
         print(f'Populating {i + 1} tutorial{"s" if n > 1 else ""}...', end='\r')
 
-        t = create_tutorial()
-
-        if random.random() >= 0.15:
-            t.series_id = random.choice(SERIES_IDS)
+        t = create_tutorial(author_ids=author_ids)
 
-        t.save()
+        if series_ids and random.random() >= 0.15:
+            t.series_id = random.choice(series_ids)
+            t.save()
 
     print(f'Populating {n} tutorial{"s" if n > 1 else ""}... done')
@@ -0,0 +1,46 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from author.models import Author
+from core.parsers import read_ndjson
+from tutorial.importer import import_records, InvalidImport
+
+
+class Command(BaseCommand):
+
+    help = 'Imports series with their tutorials in bulk from NDJSON, one series per line'
+
+    def get_version(self):
+        return '1.0.0'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='NDJSON file to import, - to read stdin')
+        parser.add_argument('--author', required=True, help='username of the author to import for')
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+
+        try:
+            author_id = Author.objects.values_list('id', flat=True).get(user__username=options['author'])
+        except Author.DoesNotExist:
+            raise CommandError(f'No author named {options["author"]}.')
+
+        try:
+
+            if options['path'] == '-':
+                records = read_ndjson(sys.stdin)
+            else:
+                with open(options['path']) as lines:
+                    records = read_ndjson(lines)
+
+            series = import_records(author_id, records, options['chunk_size'])
+
+        except InvalidImport as e:
+            for error in e.errors:
+                print(f'Record {error["record"]}: {error["errors"]}', file=sys.stderr)
+            raise CommandError(str(e))
+        except Exception as e:
+            raise CommandError(str(e))
+
+        print(f'Imported {len(series)} series and {sum(len(instance.imported) for instance in series)} tutorials.')
@@ -1,49 +1,28 @@
-from django.core.management.base import BaseCommand, CommandError
+from django.db.models.functions import Substr
 
 from tutorial.models import Tutorial
 
-from prettytable import PrettyTable
+from core.management.commands._listing import ListCommand, Column
 
 
-table = PrettyTable()
-table.field_names = [t.name for t in Tutorial._meta.get_fields()]
-
-
-class Command(BaseCommand):
+class Command(ListCommand):
 
     help = 'Lists tutorial.models.Tutorials'
-
-    def get_version(self):
-        return '1.0.0'
-
-    def add_arguments(self, parser):
-        parser.add_argument('number', type=int, default=Tutorial.objects.count(), nargs='?')
-
-    def handle(self, *args, **options):
-
-        try:
-
-            tutorials = Tutorial.objects.order_by('pk')
-
-            for index in range(options['number']):
-
-                tutorial = tutorials[index]
-
-                table.add_row([
-                    tutorial.id,
-                    f'{tutorial.content[:10]}',
-                    tutorial.title,
-                    tutorial.draft,
-                    f'{tutorial.description[:10]}',
-                    tutorial.timestamp.ctime(),
-                    tutorial.number,
-                    f'{tutorial.uuid.__str__()[-12:]}',
-                    f'{tutorial.slug[:10]}',
-                    tutorial.series.__str__()[:15],
-                    tutorial.author
-                ])
-
-            print(table)
-
-        except Exception as e:
-            raise CommandError(str(e))
+    queryset = Tutorial.objects.annotate(content_start=Substr('content', 1, 10))
+
+    columns = (
+        Column('id', 'id', 8),
+        Column('title', 'title', 20),
+        # contents run long, only their start is read
+        Column('content', 'content_start', 10),
+        Column('draft', 'draft', 5),
+        Column('description', 'description', 10),
+        Column('timestamp', 'timestamp', 24),
+        Column('updated', 'updated', 24),
+        Column('number', 'number', 6),
+        Column('uuid', 'uuid', 12),
+        Column('slug', 'slug', 20),
+        Column('vote_score', 'vote_score', 10),
+        Column('series', 'series__name', 15),
+        Column('author', 'author__user__username', 15),
+    )
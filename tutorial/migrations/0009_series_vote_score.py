@@ -0,0 +1,30 @@
+# Generated by Django 2.2.4 on 2026-10-18 12:40
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def populate_vote_score(apps, schema_editor):
+    Series = apps.get_model('tutorial', 'Series')
+    Tutorial = apps.get_model('tutorial', 'Tutorial')
+
+    scores = Tutorial.objects.filter(series__isnull=False).values('series').order_by().annotate(score=Sum('vote_score'))
+
+    for row in scores:
+        Series.objects.filter(pk=row['series']).update(vote_score=row['score'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorial', '0008_auto_20190816_2210'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='series',
+            name='vote_score',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(populate_vote_score, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.4 on 2026-10-18 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorial', '0009_series_vote_score'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='series',
+            index=models.Index(fields=['-timestamp', '-id'], name='series_timeline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='series',
+            index=models.Index(fields=['creator', '-timestamp', '-id'], name='series_creator_timeline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tutorial',
+            index=models.Index(fields=['author', '-timestamp', '-id'], name='tutorial_author_timeline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tutorial',
+            index=models.Index(fields=['series', 'draft', '-timestamp', '-id'], name='tutorial_series_timeline_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2.4 on 2026-10-18 18:10
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def populate_updated(apps, schema_editor):
+    Series = apps.get_model('tutorial', 'Series')
+    Series.objects.update(updated=F('timestamp'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorial', '0011_tutorial_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='series',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_updated, migrations.RunPython.noop),
+    ]
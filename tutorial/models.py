@@ -1,17 +1,24 @@
 import uuid
 import typing
+import collections
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, Q, F
+from django.utils import timezone
 from django.dispatch import receiver
-from django.utils.text import slugify
-from django.db.models.signals import pre_save
+from django.contrib.auth.models import User
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.contrib.contenttypes.models import ContentType
 
 from author.models import Author
+from core.utils import unique_slug
+from core.models import StoredValuesMixin
+from core.cache import invalidate_tags, invalidate_payloads
 
-from vote.models import VoteModel
+from vote.models import Vote, VoteModel
 
 
-class Series(models.Model):
+class Series(StoredValuesMixin, models.Model):
 
     CHOICES: typing.List[typing.Tuple[str, str]] = [
         ('other', 'Other'),
@@ -27,22 +34,46 @@ class Series(models.Model):
     description = models.TextField(max_length=300)
     thumbnail = models.URLField(null=True, blank=True)
     timestamp = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+    vote_score = models.IntegerField(default=0, db_index=True)
     type_of = models.CharField(choices=CHOICES, max_length=50)
     creator = models.ForeignKey(Author, on_delete=models.CASCADE)
     slug = models.SlugField(max_length=200, blank=True, unique=True)
 
-    def get_vote_score(self):
-        total = 0
+    @classmethod
+    def change_vote_score(cls, series_id, delta: int):
+        """
+        Adds delta to the sum of the vote scores
+        of a series' tutorials with a single UPDATE
+        instead of re-adding every tutorial's score.
+        """
+        if series_id and delta:
+            cls.objects.filter(pk=series_id).update(vote_score=F('vote_score') + delta, updated=timezone.now())
 
-        for tutorial in self.tutorials:
-            total += tutorial.vote_score
+    @classmethod
+    def change_vote_scores(cls, deltas: dict):
+        """
+        change_vote_score for many series at once, with
+        one UPDATE for every distinct delta in deltas
+        (a dict of series ids to deltas).
+        """
+        series_ids = collections.defaultdict(list)
+        for series_id, delta in deltas.items():
+            if series_id and delta:
+                series_ids[delta].append(series_id)
 
-        return total
+        now = timezone.now()
+        for delta, ids in series_ids.items():
+            cls.objects.filter(pk__in=ids).update(vote_score=F('vote_score') + delta, updated=now)
 
     def get_tutorials(self):
         return self.tutorials.filter(draft=False)
 
     def get_tutorial_count(self):
+        # querysets planned for the series serializers
+        # carry the count as an annotation already
+        if hasattr(self, 'published_tutorial_count'):
+            return self.published_tutorial_count
         return self.tutorials.filter(draft=False).count()
 
     def __str__(self):
@@ -52,15 +83,20 @@ class Series(models.Model):
         verbose_name = 'Series'
         verbose_name_plural = 'Series'
         ordering = ('-timestamp', '-pk')
+        indexes = [
+            models.Index(fields=['-timestamp', '-id'], name='series_timeline_idx'),
+            models.Index(fields=['creator', '-timestamp', '-id'], name='series_creator_timeline_idx'),
+        ]
 
 
-class Tutorial(VoteModel, models.Model):
+class Tutorial(StoredValuesMixin, VoteModel, models.Model):
 
     content = models.TextField()
     title = models.CharField(max_length=100)
     draft = models.BooleanField(default=False)
     description = models.CharField(max_length=250)
     timestamp = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
     number = models.PositiveSmallIntegerField(default=1)
     uuid = models.UUIDField(default=uuid.uuid4, editable=False)
     slug = models.SlugField(max_length=250, blank=True, unique=True)
@@ -77,6 +113,10 @@ class Tutorial(VoteModel, models.Model):
 
     class Meta:
         ordering = ('-timestamp', '-id')
+        indexes = [
+            models.Index(fields=['author', '-timestamp', '-id'], name='tutorial_author_timeline_idx'),
+            models.Index(fields=['series', 'draft', '-timestamp', '-id'], name='tutorial_series_timeline_idx'),
+        ]
 
     def get_series_thumbnail(self):
         if self.series:
@@ -86,12 +126,135 @@ class Tutorial(VoteModel, models.Model):
         return self.title
 
 
+# annotation read by Series.get_tutorial_count
+# so that listing series costs a single query
+PUBLISHED_TUTORIAL_COUNT = Count('tutorials', filter=Q(tutorials__draft=False))
+
+
+# noinspection PyUnusedLocal
+@receiver(pre_save, sender=Tutorial)
+def tutorial_invalidate_previous_payload(sender, instance: Tutorial = None, **kwargs):
+    # connected before tutorial_title_to_slug so the
+    # slug is still the one the tutorial is cached by
+    invalidate_payloads('tutorial', instance.slug)
+
+
 # noinspection PyUnusedLocal
 @receiver(pre_save, sender=Tutorial)
 def tutorial_title_to_slug(sender, instance: Tutorial = None, **kwargs):
-    instance.slug = slugify(f'{instance.title}')
+    instance.slug = unique_slug(instance, f'{instance.title}')
+
+
+# noinspection PyUnusedLocal
+@receiver(pre_save, sender=Tutorial)
+def tutorial_remember_stored_series(sender, instance: Tutorial = None, update_fields=None, **kwargs):
+    # the series and score as stored, for tutorial_move_series_vote_score,
+    # off the values the tutorial was loaded with where it has them
+    stored = getattr(instance, 'stored_values', {})
+
+    if not instance.pk or (update_fields is not None and not {'series', 'series_id'} & set(update_fields)):
+        instance.stored_series = None
+    elif 'series_id' in stored and 'vote_score' in stored:
+        instance.stored_series = stored['series_id'], stored['vote_score']
+    else:
+        instance.stored_series = Tutorial.objects.filter(pk=instance.pk).values_list(
+            'series_id', 'vote_score'
+        ).first()
+
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=Tutorial)
+def tutorial_move_series_vote_score(sender, instance: Tutorial = None, **kwargs):
+    stored = getattr(instance, 'stored_series', None)
+
+    if stored is not None and stored[0] != instance.series_id:
+        series_id, vote_score = stored
+        # a tutorial moved to another series takes its score along
+        with transaction.atomic():
+            Series.change_vote_score(series_id, -vote_score)
+            Series.change_vote_score(instance.series_id, vote_score)
+
+    instance.stored_series = None
+
+
+# noinspection PyUnusedLocal
+@receiver(post_delete, sender=Tutorial)
+def tutorial_remove_series_vote_score(sender, instance: Tutorial = None, **kwargs):
+    Series.change_vote_score(instance.series_id, -instance.vote_score)
+
+
+# noinspection PyUnusedLocal
+@receiver(post_delete, sender=Tutorial)
+def tutorial_delete_votes(sender, instance: Tutorial = None, **kwargs):
+    # votes are generic relations and aren't cascaded
+    # so liked ids read off the vote table would
+    # otherwise keep pointing at deleted tutorials
+    Vote.objects.filter(
+        object_id=instance.pk,
+        content_type=ContentType.objects.get_for_model(Tutorial),
+    ).delete()
+
 
 # noinspection PyUnusedLocal
 @receiver(pre_save, sender=Series)
 def series_title_to_slug(sender, instance: Series = None, **kwargs):
-    instance.slug = slugify(f'{instance.name}')
+    instance.slug = unique_slug(instance, f'{instance.name}')
+
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=Series)
+@receiver(post_delete, sender=Series)
+def series_invalidate_cache(sender, **kwargs):
+    invalidate_tags('series')
+
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=Series)
+def series_update_name_index(sender, instance: Series = None, **kwargs):
+    from tutorial.autocomplete import series_names
+    # connected after series_invalidate_cache so that
+    # the tag is bumped by the time the index updates
+    pk, name, slug = instance.pk, instance.name, instance.slug
+    transaction.on_commit(lambda: series_names.update(pk, name, slug))
+
+
+# noinspection PyUnusedLocal
+@receiver(post_delete, sender=Series)
+def series_remove_from_name_index(sender, instance: Series = None, **kwargs):
+    from tutorial.autocomplete import series_names
+    pk = instance.pk
+    transaction.on_commit(lambda: series_names.remove(pk))
+
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=Tutorial)
+@receiver(post_delete, sender=Tutorial)
+def tutorial_invalidate_cache(sender, **kwargs):
+    invalidate_tags('tutorials')
+
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=Tutorial)
+@receiver(post_delete, sender=Tutorial)
+def tutorial_invalidate_payload(sender, instance: Tutorial = None, **kwargs):
+    invalidate_payloads('tutorial', instance.slug)
+
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=Series)
+def series_invalidate_tutorial_payloads(sender, instance: Series = None, created=False, **kwargs):
+    # tutorial payloads carry the name and thumbnail of their series
+    if not created:
+        invalidate_payloads('tutorial', *instance.tutorials.values_list('slug', flat=True))
+
+
+# noinspection PyUnusedLocal
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Author)
+def author_invalidate_tutorial_payloads(sender, instance=None, update_fields=None, **kwargs):
+    # logins only touch last_login which isn't served
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+
+    author = {'author_id': instance.pk} if sender is Author else {'author__user_id': instance.pk}
+    invalidate_payloads('tutorial', *Tutorial.objects.filter(**author).values_list('slug', flat=True))
@@ -8,3 +8,8 @@ from tutorial.serializers.series import (
     SeriesDetailSerializer,
     SeriesNameAndIdSerializer,
 )
+
+from tutorial.serializers.imports import (
+    SeriesImportSerializer,
+    TutorialImportSerializer,
+)
@@ -0,0 +1,27 @@
+from rest_framework.serializers import ModelSerializer
+
+from tutorial.models import Tutorial, Series
+
+
+class TutorialImportSerializer(ModelSerializer):
+
+    class Meta:
+
+        model = Tutorial
+        fields = ('title', 'content', 'description', 'draft', 'number')
+
+
+class SeriesImportSerializer(ModelSerializer):
+    """
+    Validates a series to import along with its tutorials,
+    which are numbered in the order they are given unless
+    they carry a number of their own. Only validates, the
+    objects are created by tutorial.importer in bulk.
+    """
+
+    tutorials = TutorialImportSerializer(many=True, required=False)
+
+    class Meta:
+
+        model = Series
+        fields = ('name', 'type_of', 'description', 'thumbnail', 'tutorials')
@@ -1,4 +1,4 @@
-from tutorial.models import Series
+from tutorial.models import Series, PUBLISHED_TUTORIAL_COUNT
 from author.serializers import AuthorSerializer
 
 from rest_framework.serializers import (
@@ -26,7 +26,14 @@ class SeriesListSerializer(ModelSerializer):
     class Meta:
 
         model = Series
-        fields = ('id', 'name', 'slug', 'creator', 'type_of', 'timestamp', 'tutorial_count', 'description', 'thumbnail')
+        fields = ('id', 'name', 'slug', 'creator', 'type_of', 'timestamp', 'tutorial_count', 'description', 'thumbnail',
+                  'vote_score')
+        select_related = ('creator__user',)
+        annotations = {'published_tutorial_count': PUBLISHED_TUTORIAL_COUNT}
+        values_sources = {
+            'creator': 'creator__user__username',
+            'tutorial_count': 'published_tutorial_count',
+        }
 
 
 class SeriesDetailSerializer(ModelSerializer):
@@ -43,4 +50,7 @@ class SeriesDetailSerializer(ModelSerializer):
     class Meta:
 
         model = Series
-        fields = ('id', 'name', 'slug', 'creator', 'type_of', 'description', 'tutorial_count', 'timestamp')
+        fields = ('id', 'name', 'slug', 'creator', 'type_of', 'description', 'tutorial_count', 'timestamp',
+                  'vote_score')
+        select_related = ('creator__user',)
+        annotations = {'published_tutorial_count': PUBLISHED_TUTORIAL_COUNT}
@@ -1,25 +1,78 @@
+from django.db.models import Manager
+
 from rest_framework.serializers import (
     URLField,
     DateTimeField,
+    ListSerializer,
     ModelSerializer,
-    StringRelatedField
+    StringRelatedField,
+    SerializerMethodField,
 )
 
-from tutorial.models import Tutorial
+from tutorial.models import Tutorial, Series
 from author.serializers import AuthorSerializer
 
 
+class SeriesResolvingListSerializer(ListSerializer):
+    """
+    Loads the name and thumbnail of every series
+    referenced by a page of tutorials in one query
+    and shares them with the series and thumbnail
+    fields of each TutorialListSerializer through
+    the serializer context.
+    """
+
+    def to_representation(self, data):
+        tutorials = list(data.all() if isinstance(data, Manager) else data)
+
+        series_ids = {tutorial.series_id for tutorial in tutorials if tutorial.series_id}
+        self.context['series_lookup'] = {
+            series['id']: series for series in Series.objects.filter(
+                pk__in=series_ids
+            ).values('id', 'name', 'thumbnail')
+        } if series_ids else {}
+
+        return super(SeriesResolvingListSerializer, self).to_representation(tutorials)
+
+
 class TutorialListSerializer(ModelSerializer):
 
-    series = StringRelatedField()
+    series = SerializerMethodField()
     author = StringRelatedField()
+    thumbnail = SerializerMethodField()
     timestamp = DateTimeField(format='%dth %b, %Y')
-    thumbnail = URLField(source='get_series_thumbnail')
 
     class Meta:
 
         model = Tutorial
         fields = ('id', 'thumbnail', 'timestamp', 'title', 'series', 'author', 'slug', 'description', 'draft')
+        list_serializer_class = SeriesResolvingListSerializer
+        select_related = ('author__user',)
+        values_sources = {
+            'series': 'series__name',
+            'author': 'author__user__username',
+            'thumbnail': 'series__thumbnail',
+        }
+
+    def lookup_series(self, tutorial: Tutorial):
+        if not tutorial.series_id:
+            return None
+
+        lookup = self.context.get('series_lookup')
+
+        # serializing a single tutorial
+        if lookup is None:
+            return {'name': tutorial.series.name, 'thumbnail': tutorial.series.thumbnail}
+
+        return lookup.get(tutorial.series_id)
+
+    def get_series(self, tutorial: Tutorial):
+        series = self.lookup_series(tutorial)
+        return series['name'] if series else None
+
+    def get_thumbnail(self, tutorial: Tutorial):
+        series = self.lookup_series(tutorial)
+        return series['thumbnail'] if series else None
 
 
 class TutorialDetailSerializer(ModelSerializer):
@@ -32,4 +85,6 @@ class TutorialDetailSerializer(ModelSerializer):
     class Meta:
 
         model = Tutorial
-        fields = '__all__'
+        # updated only versions the payload for conditional requests
+        exclude = ('updated',)
+        select_related = ('author__user', 'series')
@@ -1,2 +1,4 @@
-from .series import SeriesListTest, SeriesDetailTest
-from .tutorials import TutorialListAndDetailTest, TutorialCreateTest
+from .series import SeriesListTest, SeriesTypeListTest, SeriesDetailTest, SeriesCacheInvalidationTest, \
+    SeriesAutocompleteTest, SeriesImportTest
+from .tutorials import TutorialListAndDetailTest, TutorialListQueryCountTest, TutorialLikeUnlikeTest, \
+    TutorialBatchLikeTest, TutorialCreateTest
@@ -2,12 +2,19 @@ import json
 import random
 import typing
 
-from django.test import TestCase
+from django.db import connection
+from django.conf import settings
+from django.core.cache import cache
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, TransactionTestCase
 
-from rest_framework.test import APIRequestFactory
+from rest_framework.test import APIRequestFactory, force_authenticate
 
-from author.models import Author
+from search.models import Document
+from author.models import Author, TimelineEntry
+from core.cache import bump_tags
 from tutorial.models import Series, Tutorial
+from tutorial.autocomplete import series_names
 from tutorial.serializers.tutorials import TutorialListSerializer
 from author.management.commands._create_author import create_author
 from tutorial.management.commands._create_series import create_one_series
@@ -15,7 +22,12 @@ from tutorial.management.commands._create_tutorial import create_tutorial
 from tutorial.views.series import (
     SeriesListAPIView,
     SeriesDetailAPIView,
+    SeriesTypeListAPIView,
+    SeriesAvailabilityAPIView,
+    SeriesAutocompleteAPIView,
+    SeriesImportAPIView,
     SeriesTutorialsListAPIView,
+    SeriesNameAndIdListAPIView,
 )
 from tutorial.serializers.series import (
     SeriesListSerializer,
@@ -23,6 +35,7 @@ from tutorial.serializers.series import (
 )
 
 BASE_URL = '/api/series'
+PAGE_SIZE = settings.REST_FRAMEWORK['PAGE_SIZE']
 
 
 class SeriesListTest(TestCase):
@@ -50,8 +63,8 @@ class SeriesListTest(TestCase):
 
             # decode content and check serialized data
             data = json.loads(response.content.decode())
-            series = self.series[-(page*10):50-(10*(page-1))]
-            serialized_data = reversed(SeriesListSerializer(series, many=True).data)
+            series = list(reversed(self.series))[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+            serialized_data = SeriesListSerializer(series, many=True).data
 
             self.assertEqual(data['results'], list(serialized_data), msg=f'\n{[i.id for i in series]}\n{[i["id"] for i in data["results"]]}')
 
@@ -82,6 +95,123 @@ class SeriesListTest(TestCase):
             self.assertEqual(data['results'], serialized_data)
 
 
+class SeriesTypeListTest(TestCase):
+
+    def setUp(self):
+        self.url = f'{BASE_URL}/type'
+        self.factory = APIRequestFactory()
+        self.authors: typing.List[Author] = [create_author() for _ in range(5)]
+        self.series: typing.List[Series] = [create_one_series(random.choice(self.authors).id) for _ in range(12)]
+
+        # spread published and drafted tutorials over the series
+        for _ in range(40):
+            tutorial = create_tutorial(random.choice(self.authors).id, draft=random.random() < 0.25)
+            tutorial.series = random.choice(self.series)
+            tutorial.save()
+
+        Series.objects.update(type_of='language')
+
+    def test_series_type_list_tutorial_count(self):
+        """
+        Tutorial counts are annotated on the pks of the
+        page in one query instead of per series.
+        """
+
+        request = self.factory.get(f'{self.url}/language/')
+
+        with self.assertNumQueries(3):
+            response = SeriesTypeListAPIView.as_view()(request, slug='language')
+            response.render()
+
+        self.assertEqual(response.status_code, 200)
+
+        data = json.loads(response.content.decode())
+        for result in data['results']:
+            series = Series.objects.get(id=result['id'])
+            self.assertEqual(result['tutorial_count'], series.tutorials.filter(draft=False).count())
+
+
+    def test_series_type_list_count_without_join(self):
+        """
+        The paginator's count doesn't aggregate over
+        the tutorials of every matching series.
+        """
+
+        request = self.factory.get(f'{self.url}/language/')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = SeriesTypeListAPIView.as_view()(request, slug='language')
+            response.render()
+
+        self.assertEqual(response.status_code, 200)
+
+        count = next(query['sql'] for query in queries if 'COUNT(*)' in query['sql'])
+        self.assertNotIn('JOIN', count)
+        self.assertNotIn('GROUP BY', count)
+
+
+class SeriesConditionalGetTest(TransactionTestCase):
+    """
+    Series views answer revalidations with a 304 until
+    a series or its tutorials change, cached or not.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.author = create_author()
+        self.series = create_one_series(self.author.id)
+        Series.objects.update(type_of='language')
+
+    def get_type_list(self, **headers):
+        request = self.factory.get(f'{BASE_URL}/type/language/', **headers)
+        return SeriesTypeListAPIView.as_view()(request, slug='language')
+
+    def test_series_type_list_conditional_get(self):
+
+        response = self.get_type_list()
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        self.assertEqual(self.get_type_list(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.get_type_list(HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+        # the tutorial count of the series changes
+        tutorial = create_tutorial(self.author.id, draft=False)
+        tutorial.series = self.series
+        tutorial.save()
+
+        response = self.get_type_list(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_cached_series_views_conditional_get(self):
+        slug = self.series.slug
+
+        views = (
+            (SeriesListAPIView, f'{BASE_URL}/', {}),
+            (SeriesDetailAPIView, f'{BASE_URL}/detail/{slug}/', {'slug': slug}),
+            (SeriesTutorialsListAPIView, f'{BASE_URL}/detail/{slug}/tutorials/', {'slug': slug}),
+            (SeriesNameAndIdListAPIView, f'{BASE_URL}/names/', {}),
+        )
+
+        def get(view, url, kwargs, **headers):
+            return view.as_view()(self.factory.get(url, **headers), **kwargs)
+
+        etags = [get(*view)['ETag'] for view in views]
+
+        for view, etag in zip(views, etags):
+            with self.assertNumQueries(0):
+                self.assertEqual(get(*view, HTTP_IF_NONE_MATCH=etag).status_code, 304, msg=view[1])
+
+        self.series.name = 'A Renamed Series'
+        self.series.save()
+
+        for view, etag in zip(views, etags):
+            response = get(*view, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200, msg=view[1])
+            self.assertNotEqual(response['ETag'], etag, msg=view[1])
+
+
 class SeriesDetailTest(TestCase):
 
     def setUp(self):
@@ -121,3 +251,200 @@ class SeriesDetailTest(TestCase):
         data = json.loads(response.content.decode())
         serialized_data = SeriesDetailSerializer(series).data
         self.assertEqual(data, serialized_data)
+
+
+class SeriesCacheInvalidationTest(TransactionTestCase):
+    """
+    Cached series responses are purged as soon as the
+    series, its tutorials or its creator change. Runs
+    outside of a test transaction since invalidation
+    waits for the changes to be committed.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.author = create_author()
+        self.series = create_one_series(self.author.id)
+
+    def get_detail(self) -> dict:
+        request = self.factory.get(f'{BASE_URL}/detail/{self.series.slug}/')
+        response = SeriesDetailAPIView.as_view()(request, slug=self.series.slug)
+        response.render()
+        return json.loads(response.content.decode())
+
+    def test_series_detail_invalidation(self):
+
+        self.assertEqual(self.get_detail()['tutorial_count'], 0)
+
+        # served from the cache
+        with self.assertNumQueries(0):
+            self.get_detail()
+
+        tutorial = create_tutorial(self.author.id, draft=False)
+        tutorial.series = self.series
+        tutorial.save()
+        self.assertEqual(self.get_detail()['tutorial_count'], 1)
+
+        self.series.description = 'An updated description.'
+        self.series.save()
+        self.assertEqual(self.get_detail()['description'], 'An updated description.')
+
+        self.author.user.first_name = 'Renamed'
+        self.author.user.save()
+        self.assertEqual(self.get_detail()['creator']['user']['first_name'], 'Renamed')
+
+    def test_series_detail_not_cached_by_clients(self):
+
+        for _ in range(2):
+            request = self.factory.get(f'{BASE_URL}/detail/{self.series.slug}/')
+            response = SeriesDetailAPIView.as_view()(request, slug=self.series.slug)
+
+            self.assertEqual(response['Cache-Control'], 'no-cache')
+            self.assertFalse(response.has_header('Expires'))
+
+
+class SeriesAutocompleteTest(TransactionTestCase):
+    """
+    Completions and availability checks are served
+    off the series name index, which follows series
+    saves and deletes without reloading itself.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.author = create_author()
+        self.series = [self.create_series(f'Python Recipes {index:02}') for index in range(15)]
+        self.other = self.create_series('Rust For Pythonistas')
+
+    def create_series(self, name: str) -> Series:
+        series = create_one_series(self.author.id)
+        series.name = name
+        series.save()
+        return series
+
+    def complete(self, prefix: str, page: int = 1) -> dict:
+        request = self.factory.get(f'{BASE_URL}/autocomplete/', {'q': prefix, 'page': page})
+        response = SeriesAutocompleteAPIView.as_view()(request)
+        response.render()
+        return json.loads(response.content.decode())
+
+    def is_available(self, name: str) -> bool:
+        request = self.factory.post(f'{BASE_URL}/is_available/', {'name': name})
+        response = SeriesAvailabilityAPIView.as_view()(request)
+        response.render()
+        return json.loads(response.content.decode())['available']
+
+    def test_autocomplete_pages(self):
+
+        first, second = self.complete('python rec'), self.complete('python rec', page=2)
+
+        self.assertEqual(first['count'], 15)
+        self.assertEqual([result['name'] for result in first['results'] + second['results']],
+                         [series.name for series in self.series])
+        self.assertEqual(second['results'][-1]['slug'], self.series[-1].slug)
+
+        self.assertEqual(self.complete('rust')['count'], 1)
+        self.assertEqual(self.complete('go')['count'], 0)
+        self.assertIn('error', self.complete(' '))
+
+    def test_incremental_updates(self):
+
+        self.complete('python')
+
+        self.series[0].name = 'Go Recipes'
+        self.series[0].save()
+        self.series[1].delete()
+
+        # the index caught up without reloading
+        with self.assertNumQueries(0):
+            self.assertEqual(self.complete('python')['count'], 13)
+            self.assertEqual(self.complete('go')['results'][0]['slug'], self.series[0].slug)
+            self.assertFalse(self.is_available('Go Recipes'))
+            self.assertTrue(self.is_available('Python Recipes 01'))
+
+    def test_reload_on_foreign_changes(self):
+
+        self.complete('python')
+
+        # a series saved by another process
+        Series.objects.filter(pk=self.other.pk).update(name='Haskell', slug='haskell')
+        bump_tags('series')
+
+        self.assertEqual(self.complete('haskell')['count'], 1)
+        self.assertTrue(series_names.current().is_taken('haskell'))
+
+
+class SeriesImportTest(TransactionTestCase):
+    """
+    Imports create series and tutorials in bulk with the
+    same slugs, index entries, timelines and cache bumps
+    that creating them one by one would.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.author = create_author()
+        self.existing = create_one_series(self.author.id)
+
+    def import_series(self, records: list) -> typing.Tuple[int, dict]:
+        body = '\n'.join(json.dumps(record) for record in records)
+        request = APIRequestFactory().post(f'{BASE_URL}/import/', body, content_type='application/x-ndjson')
+        force_authenticate(request, user=self.author.user)
+        response = SeriesImportAPIView.as_view()(request)
+        response.render()
+        return response.status_code, json.loads(response.content.decode())
+
+    @staticmethod
+    def record(name: str, titles: typing.List[str], drafts: bool = False) -> dict:
+        return {
+            'name': name,
+            'type_of': 'algorithms',
+            'description': f'All about {name}.',
+            'tutorials': [
+                {'title': title, 'content': f'{title} content', 'description': title, 'draft': drafts}
+                for title in titles
+            ],
+        }
+
+    def test_import(self):
+
+        self.assertTrue(series_names.current().is_taken(self.existing.slug))
+        self.assertFalse(series_names.current().is_taken('graph-theory'))
+
+        status, response = self.import_series([
+            self.record(self.existing.name, ['Intro', 'Intro']),
+            self.record('Graph Theory', ['Trees', 'Paths', 'Cycles']),
+            self.record('Unfinished', ['Draft'], drafts=True),
+        ])
+
+        self.assertEqual(status, 201)
+        self.assertEqual((response['series'], response['tutorials']), (3, 6))
+
+        imported = response['results'][0]
+        self.assertEqual(imported['slug'], f'{self.existing.slug}-2')
+        self.assertEqual([tutorial['slug'] for tutorial in imported['tutorials']], ['intro', 'intro-2'])
+
+        series = Series.objects.get(slug='graph-theory')
+        self.assertEqual(list(series.tutorials.order_by('number').values_list('title', 'number')),
+                         [('Trees', 1), ('Paths', 2), ('Cycles', 3)])
+
+        self.assertEqual(TimelineEntry.objects.filter(author=self.author).count(), 10)
+        # drafts aren't indexed for search
+        self.assertEqual(Document.objects.filter(kind='tutorial').count(), 5)
+        self.assertTrue(Document.objects.filter(kind='series', object_id=series.id).exists())
+
+        # the bump reloads the name index
+        self.assertTrue(series_names.current().is_taken('graph-theory'))
+
+    def test_invalid_records_import_nothing(self):
+
+        status, response = self.import_series([
+            self.record('Graph Theory', ['Trees']),
+            {**self.record('Sorting', ['Quicksort']), 'type_of': 'cooking'},
+        ])
+
+        self.assertEqual(status, 400)
+        self.assertEqual([error['record'] for error in response['records']], [2])
+        self.assertFalse(Series.objects.filter(slug='graph-theory').exists())
@@ -1,15 +1,18 @@
 import json
 import random
+from unittest import mock
 
 import faker
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils.text import slugify
 
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIRequestFactory, APIClient
 
-from tutorial.models import Tutorial
+from tutorial.models import Tutorial, Series
 from author.management.commands._create_author import create_author
 from tutorial.management.commands._create_series import create_one_series
 from tutorial.management.commands._create_tutorial import create_tutorial
@@ -17,6 +20,8 @@ from tutorial.views.tutorials import (
     RecentTutorialAPIView,
     TutorialDetailAPIView,
     TutorialCreateAPIView,
+    TutorialLikeUnlikeAPIView,
+    TutorialBatchLikeAPIView,
 )
 from tutorial.serializers.tutorials import (
     TutorialListSerializer,
@@ -81,6 +86,196 @@ class TutorialListAndDetailTest(TestCase):
         self.assertEqual(data, serialized_data)
 
 
+class TutorialListQueryCountTest(TestCase):
+
+    def setUp(self):
+
+        self.url = BASE_URL
+        self.factory = APIRequestFactory()
+
+        self.authors = [create_author() for _ in range(5)]
+        self.series = [create_one_series(random.choice(self.authors).id) for _ in range(5)]
+        self.tutorials = [create_tutorial(random.choice(self.authors).id, draft=False) for _ in range(20)]
+
+        for tutorial in self.tutorials:
+            tutorial.series = random.choice(self.series)
+            tutorial.save()
+
+    def test_recent_tutorial_list_query_count(self):
+        """
+        Authors and series of every tutorial on the page
+        are joined into the page's values() query, so only
+        the count and the page query should be made.
+        """
+
+        request = self.factory.get(f'{self.url}/recent/')
+
+        with self.assertNumQueries(2):
+            response = RecentTutorialAPIView.as_view()(request)
+            response.render()
+
+        self.assertEqual(response.status_code, 200)
+
+
+class TutorialLikeUnlikeTest(TestCase):
+
+    def setUp(self):
+        self.url = f'{BASE_URL}/like/'
+        self.factory = APIRequestFactory()
+        self.authors = [create_author() for _ in range(3)]
+        self.series = create_one_series(self.authors[0].id)
+        self.tutorials = [create_tutorial(self.authors[0].id, draft=False) for _ in range(2)]
+
+        for tutorial in self.tutorials:
+            tutorial.series = self.series
+            tutorial.save()
+
+    def toggle_like(self, author, tutorial):
+        request = self.factory.post(self.url, {
+            'tutorial_id': tutorial.id,
+            'token': Token.objects.get(user_id=author.user_id).key,
+        })
+        response = TutorialLikeUnlikeAPIView.as_view()(request)
+        response.render()
+        return json.loads(response.content.decode())
+
+    def test_series_vote_score(self):
+        """
+        Likes and unlikes on tutorials are added
+        to (and removed from) the series' score.
+        """
+
+        for author in self.authors:
+            self.assertEqual(self.toggle_like(author, self.tutorials[0])['action'], 1)
+        self.assertEqual(self.toggle_like(self.authors[0], self.tutorials[1])['action'], 1)
+
+        self.series.refresh_from_db()
+        self.assertEqual(self.series.vote_score, 4)
+
+        self.assertEqual(self.toggle_like(self.authors[0], self.tutorials[0])['action'], -1)
+
+        self.series.refresh_from_db()
+        self.assertEqual(self.series.vote_score, 3)
+
+        # deleting a tutorial takes its score out of the series'
+        Tutorial.objects.get(pk=self.tutorials[0].pk).delete()
+
+        self.series.refresh_from_db()
+        self.assertEqual(self.series.vote_score, 1)
+        self.assertEqual(self.series.vote_score, sum(t.vote_score for t in Series.objects.get(
+            pk=self.series.pk
+        ).tutorials.all()))
+
+    def test_series_vote_score_moved_tutorial(self):
+        """
+        Moving a tutorial to another series (or out of
+        any) moves its score along with it.
+        """
+
+        for author in self.authors[:2]:
+            self.toggle_like(author, self.tutorials[0])
+
+        other = create_one_series(self.authors[1].id)
+
+        tutorial = Tutorial.objects.get(pk=self.tutorials[0].pk)
+        tutorial.series = other
+        tutorial.save()
+
+        self.series.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.series.vote_score, other.vote_score), (0, 2))
+
+        tutorial.series = None
+        tutorial.save()
+
+        other.refresh_from_db()
+        self.assertEqual(other.vote_score, 0)
+
+        # loaded without its series, the stored one is read
+        tutorial = Tutorial.objects.only('pk', 'title').get(pk=self.tutorials[0].pk)
+        tutorial.series_id = other.id
+        tutorial.save()
+
+        other.refresh_from_db()
+        self.assertEqual(other.vote_score, 2)
+
+    def test_like_without_stored_series_lookup(self):
+
+        with CaptureQueriesContext(connection) as context:
+            self.toggle_like(self.authors[0], self.tutorials[0])
+
+        lookups = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT "tutorial_tutorial"."series_id", "tutorial_tutorial"."vote_score" ')
+        ]
+        self.assertEqual(lookups, [])
+
+
+class TutorialBatchLikeTest(TestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.author = create_author()
+        self.series = create_one_series(self.author.id)
+        self.tutorials = [create_tutorial(self.author.id, draft=False) for _ in range(4)]
+
+        for tutorial in self.tutorials[:3]:
+            tutorial.series = self.series
+            tutorial.save()
+
+    def apply(self, actions: list) -> dict:
+        request = self.factory.post(f'{BASE_URL}/like/batch/', {
+            'token': Token.objects.get(user_id=self.author.user_id).key,
+            'actions': actions,
+        }, format='json')
+        response = TutorialBatchLikeAPIView.as_view()(request)
+        response.render()
+        return json.loads(response.content.decode())
+
+    def test_batch_likes(self):
+        """
+        Batches end up with the same votes and scores as
+        replaying their toggles one by one would.
+        """
+        ids = [tutorial.id for tutorial in self.tutorials]
+
+        response = self.apply([{'id': pk, 'state': True} for pk in ids] + [{'id': 0x7fffffff, 'state': False}])
+        self.assertEqual(response['missing'], [0x7fffffff])
+        self.assertTrue(all(result['state'] for result in response['results']))
+
+        # liking again changes nothing
+        self.apply([{'id': ids[0], 'state': True}, {'id': ids[1], 'state': False}, {'id': ids[1], 'state': True}])
+        self.series.refresh_from_db()
+        self.assertEqual(self.series.vote_score, 3)
+
+        self.apply([{'id': ids[0], 'state': False}, {'id': ids[3], 'state': False}])
+
+        tutorials = Tutorial.objects.in_bulk(ids)
+        self.assertEqual([tutorials[pk].vote_score for pk in ids], [0, 1, 1, 0])
+        self.assertEqual([tutorials[pk].num_vote_up for pk in ids], [0, 1, 1, 0])
+
+        self.series.refresh_from_db()
+        self.assertEqual(self.series.vote_score, 2)
+        self.assertFalse(tutorials[ids[0]].votes.exists(self.author.user_id))
+        self.assertTrue(tutorials[ids[1]].votes.exists(self.author.user_id))
+
+    def test_invalid_actions(self):
+
+        response = self.apply([{'id': self.tutorials[0].id}])
+        self.assertIn('error', response)
+        self.assertEqual(Tutorial.objects.get(pk=self.tutorials[0].pk).vote_score, 0)
+
+        # turned down before any toggle is validated
+        max_toggles = TutorialBatchLikeAPIView.max_toggles
+        with mock.patch('core.serializers.ToggleSerializer') as serializer:
+            response = self.apply([{'id': self.tutorials[0].id}] * (max_toggles + 1))
+        self.assertEqual(response['error'], f'Cannot apply more than {max_toggles} actions at once.')
+        serializer.assert_not_called()
+
+        request = self.factory.post(f'{BASE_URL}/like/batch/', [{'id': self.tutorials[0].id}], format='json')
+        self.assertEqual(TutorialBatchLikeAPIView.as_view()(request).status_code, 400)
+
+
 class TutorialCreateTest(TestCase):
 
     def setUp(self):
@@ -146,6 +341,20 @@ class TutorialCreateTest(TestCase):
         )).data
         self.assertEqual(content['details'], serialized_data)
 
+    def test_create_tutorial_without_series(self):
+
+        data = self.data.copy()
+        data['token'] = Token.objects.get(user_id=self.authors[0].user_id).key
+
+        response = TutorialCreateAPIView.as_view()(self.factory.post(self.url, data))
+        response.render()
+
+        self.assertEqual(response.status_code, 201, msg=response.content.decode())
+
+        content = json.loads(response.content.decode())
+        self.assertIsNone(content['details']['series'])
+        self.assertNotIn('updated', content['details'])
+
     def test_create_tutorial_without_authentication(self):
 
         request = self.factory.post(self.url, self.data)
@@ -2,12 +2,16 @@ from django.urls import path
 
 from tutorial.views.series import (
     SeriesListAPIView,
+    SeriesTopListAPIView,
     SeriesDeleteAPIView,
     SeriesDetailAPIView,
     SeriesCreateAPIView,
+    SeriesImportAPIView,
     SeriesBookmarkAPIView,
+    SeriesBatchBookmarkAPIView,
     SeriesTypeListAPIView,
     SeriesAvailabilityAPIView,
+    SeriesAutocompleteAPIView,
     SeriesNameAndIdListAPIView,
     SeriesTutorialsListAPIView,
 )
@@ -15,14 +19,18 @@ from tutorial.views.series import (
 urlpatterns = (
 
     path('', SeriesListAPIView.as_view()),
+    path('top/', SeriesTopListAPIView.as_view()),
     path('names/', SeriesNameAndIdListAPIView.as_view()),
+    path('autocomplete/', SeriesAutocompleteAPIView.as_view()),
     path('type/<slug:slug>/', SeriesTypeListAPIView.as_view()),
     path('detail/<slug:slug>/', SeriesDetailAPIView.as_view()),
     path('detail/<slug:slug>/tutorials/', SeriesTutorialsListAPIView.as_view()),
 
     # CRUD operations on series
     path('new/', SeriesCreateAPIView.as_view()),
+    path('import/', SeriesImportAPIView.as_view()),
     path('bookmark/', SeriesBookmarkAPIView.as_view()),
+    path('bookmark/batch/', SeriesBatchBookmarkAPIView.as_view()),
     path('is_available/', SeriesAvailabilityAPIView.as_view()),
     path('delete/<slug:slug>/', SeriesDeleteAPIView.as_view()),
 
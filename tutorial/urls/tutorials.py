@@ -6,6 +6,7 @@ from tutorial.views.tutorials import (
     TutorialCreateAPIView,
     TutorialDeleteAPIView,
     TutorialLikeUnlikeAPIView,
+    TutorialBatchLikeAPIView,
 )
 
 urlpatterns = (
@@ -15,6 +16,7 @@ urlpatterns = (
     # CRUD operations on tutorials
     path('new/', TutorialCreateAPIView.as_view()),
     path('like/', TutorialLikeUnlikeAPIView.as_view()),
+    path('like/batch/', TutorialBatchLikeAPIView.as_view()),
     path('delete/<slug:slug>/', TutorialDeleteAPIView.as_view()),
 
 )
@@ -1,23 +1,30 @@
 from django.utils.text import slugify
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 from django.core.exceptions import ObjectDoesNotExist
 from django.shortcuts import get_object_or_404, get_list_or_404
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.renderers import JSONRenderer
-from rest_framework.authtoken.models import Token
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.parsers import FormParser, MultiPartParser, JSONParser
 from rest_framework.generics import (
     ListAPIView,
+    GenericAPIView,
     DestroyAPIView,
     RetrieveAPIView,
 )
 
-from tutorial.views.utils import bookmark_exists
+from core.mixins import EagerLoadingMixin, ValuesListMixin, ConditionalGetMixin
+from core.cache import cache_page_tagged
+from core.parsers import NDJSONParser
+from core.utils import create_with_unique_slug
+from core.serializers import get_values_serializer, parse_toggles
+from tutorial.autocomplete import series_names
+from tutorial.importer import import_records, InvalidImport
 from author.models import Bookmark
+from author.utils import resolve_token, set_bookmarked
 from tutorial.models import Tutorial, Series
 from tutorial.serializers import (
     SeriesListSerializer,
@@ -26,10 +33,15 @@ from tutorial.serializers import (
     SeriesNameAndIdSerializer,
 )
 
+# cached series responses are invalidated whenever series,
+# tutorials or authors change so they can be kept for long
+# (server side, clients are made to revalidate every time)
+CACHE_TIMEOUT = 60 * 60 * 24 * 7
 
-class SeriesDetailAPIView(RetrieveAPIView):
 
-    @method_decorator(cache_page(60 * 60 * 12, key_prefix='SeriesDetailAPIView'))
+class SeriesDetailAPIView(EagerLoadingMixin, RetrieveAPIView):
+
+    @method_decorator(cache_page_tagged(CACHE_TIMEOUT, 'SeriesDetailAPIView', ('series', 'tutorials', 'authors')))
     def dispatch(self, *args, **kwargs):
         return super(SeriesDetailAPIView, self).dispatch(*args, **kwargs)
 
@@ -39,9 +51,9 @@ class SeriesDetailAPIView(RetrieveAPIView):
     serializer_class = SeriesDetailSerializer
 
 
-class SeriesListAPIView(ListAPIView):
+class SeriesListAPIView(ValuesListMixin, EagerLoadingMixin, ListAPIView):
 
-    @method_decorator(cache_page(60 * 5, key_prefix='SeriesListAPIView'))
+    @method_decorator(cache_page_tagged(CACHE_TIMEOUT, 'SeriesListAPIView', ('series', 'tutorials', 'authors')))
     def dispatch(self, *args, **kwargs):
         return super(SeriesListAPIView, self).dispatch(*args, **kwargs)
 
@@ -49,13 +61,27 @@ class SeriesListAPIView(ListAPIView):
     queryset = Series.objects.all()
 
 
-class SeriesTutorialsListAPIView(ListAPIView):
+class SeriesTopListAPIView(ConditionalGetMixin, EagerLoadingMixin, ListAPIView):
+    """
+    Lists series by the sum of the vote scores of
+    their tutorials - read straight off the indexed
+    Series.vote_score column.
+    """
+
+    validator_tags = ('tutorials', 'authors')
+    serializer_class = SeriesListSerializer
+    pagination_class = PageNumberPagination
+    queryset = Series.objects.order_by('-vote_score', '-timestamp', '-pk')
+
+
+class SeriesTutorialsListAPIView(EagerLoadingMixin, ListAPIView):
     """
     This view gets all the tutorials belonging
     to a particular series according to its slug.
     """
 
-    @method_decorator(cache_page(60 * 5, key_prefix='SeriesTutorialsListAPIView'))
+    @method_decorator(cache_page_tagged(CACHE_TIMEOUT, 'SeriesTutorialsListAPIView',
+                                        ('series', 'tutorials', 'authors')))
     def dispatch(self, *args, **kwargs):
         return super(SeriesTutorialsListAPIView, self).dispatch(*args, **kwargs)
 
@@ -122,11 +148,12 @@ class SeriesCreateAPIView(APIView):
         try:
 
             if token:
-                creator_id = Token.objects.get(key=token).user.author.id
+                creator_id = resolve_token(token).author_id
             else:
                 creator_id = request.user.author.id
 
-            series = Series.objects.create(
+            series = create_with_unique_slug(
+                Series,
                 name=name,
                 type_of=type_of,
                 thumbnail=thumbnail,
@@ -177,22 +204,24 @@ class SeriesBookmarkAPIView(APIView):
 
         try:
 
-            series = Series.objects.get(id=series_id)
-            author_id = Token.objects.get(key=token).user.author.id
+            series_id = Series.objects.values_list('id', flat=True).get(id=series_id)
+            author_id = resolve_token(token).author_id
 
-            if bookmark_exists(author_id, series.id):
-                Bookmark.objects.get(model_pk=series_id,
-                                     author_id=author_id,
-                                     model_type='series').delete()
+            # toggled off the table, not the cached bookmarked ids
+            # (which are for reads), and idempotent either way
+            deleted, _ = Bookmark.objects.filter(model_pk=series_id,
+                                                 author_id=author_id,
+                                                 model_type='series').delete()
+            if deleted:
                 return Response({
                     'action': -1
                 })
             else:
-                Bookmark.objects.create(
+                Bookmark.objects.get_or_create(
                     author_id=author_id,
                     model_type='series',
                     model_pk=series_id
-                ).save()
+                )
                 return Response({
                     'action': 1
                 })
@@ -213,6 +242,7 @@ class SeriesAvailabilityAPIView(APIView):
     and checks if a Series with the slug
     for that name exists - returns True
     if it does not and False for otherwise.
+    Answered off the series name index.
     """
 
     @staticmethod
@@ -224,22 +254,38 @@ class SeriesAvailabilityAPIView(APIView):
                 'error': 'Please provide a name for series to check if it\'s taken.'
             })
 
-        if name:
+        return Response({
+            'available': not series_names.current().is_taken(slugify(name))
+        })
+
 
-            available = False
+class SeriesAutocompleteAPIView(GenericAPIView):
+    """
+    Pages through the series whose names start
+    with the `q` query parameter in alphabetical
+    order, served off the series name index.
+    """
 
-            try:
-                series = Series.objects.get(slug=slugify(name))
-            except ObjectDoesNotExist:
-                available = True
-            finally:
-                return Response({
-                    'available': available
-                })
+    pagination_class = PageNumberPagination
+
+    def get(self, request):
+        prefix = request.query_params.get('q', '')
+
+        if not slugify(prefix):
+            return Response({
+                'error': 'Please provide the start of a series name to complete.'
+            }, status=400)
 
+        page = self.paginate_queryset(series_names.current().complete(prefix))
 
-class SeriesTypeListAPIView(ListAPIView):
+        return self.get_paginated_response([
+            {'id': entry.id, 'name': entry.name, 'slug': entry.slug} for entry in page
+        ])
 
+
+class SeriesTypeListAPIView(ConditionalGetMixin, EagerLoadingMixin, ListAPIView):
+
+    validator_tags = ('tutorials', 'authors')
     serializer_class = SeriesListSerializer
 
     def get_queryset(self):
@@ -252,15 +298,15 @@ class SeriesNameAndIdListAPIView(APIView):
 
     renderer_classes = (JSONRenderer,)
 
-    @method_decorator(cache_page(60 * 5, key_prefix='SeriesNameList'))
+    @method_decorator(cache_page_tagged(CACHE_TIMEOUT, 'SeriesNameList', ('series',)))
     def dispatch(self, *args, **kwargs):
         return super(SeriesNameAndIdListAPIView, self).dispatch(*args, **kwargs)
 
     @staticmethod
     def get(request):
-        series = Series.objects.all()
-        data = SeriesNameAndIdSerializer(series, many=True).data
-        return Response(data)
+        serializer = get_values_serializer(SeriesNameAndIdSerializer)
+        series = Series.objects.values(*serializer.lookups)
+        return Response(serializer.serialize(series))
 
 
 class SeriesDeleteAPIView(DestroyAPIView):
@@ -276,3 +322,94 @@ class SeriesDeleteAPIView(DestroyAPIView):
         instance = self.get_object()
         self.perform_destroy(instance)
         return Response({'deleted': True}, status=204)
+
+
+class SeriesBatchBookmarkAPIView(APIView):
+    """
+    Bookmarks and unbookmarks a batch of series for an
+    authenticated user in one go. Takes JSON of a token
+    and a list of actions ({"id": <series id>, "state":
+    <bookmarked>}) and answers with the final state of
+    every series.
+    """
+
+    max_toggles = 500
+    parser_classes = (JSONParser,)
+
+    def post(self, request):
+
+        if not isinstance(request.data, dict):
+            return Response({
+                'error': 'Provide a token and a list of actions as a JSON object.'
+            }, status=400)
+
+        token = request.data.get('token')
+
+        if not token:
+            return Response({
+                'error': 'Unauthorized to view response.'
+            }, status=401)
+
+        try:
+            states = parse_toggles(request.data.get('actions'), self.max_toggles)
+        except ValueError as e:
+            return Response({
+                'error': str(e)
+            }, status=400)
+
+        try:
+            author_id = resolve_token(token).author_id
+        except ObjectDoesNotExist:
+            return Response({
+                'error': 'Invalid auth token provided.'
+            }, status=401)
+
+        existing = set(Series.objects.filter(pk__in=list(states)).order_by().values_list('id', flat=True))
+        bookmarked = set_bookmarked(author_id, 'series', {pk: states[pk] for pk in states if pk in existing})
+
+        return Response({
+            'results': [{'id': pk, 'state': bookmarked[pk]} for pk in states if pk in bookmarked],
+            'missing': [pk for pk in states if pk not in bookmarked],
+        })
+
+
+class SeriesImportAPIView(APIView):
+    """
+    Imports series with their tutorials in bulk for the
+    authenticated author, all or nothing. Takes NDJSON
+    (application/x-ndjson) with one series per line =>
+        name!: short string
+        type_of!: short string
+        thumbnail: string (url)
+        description!: long string
+        tutorials: [{title!, content!, description!, draft, number}]
+    and returns the ids and slugs of what was created.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    parser_classes = (NDJSONParser,)
+
+    def post(self, request):
+
+        if not isinstance(request.data, list) or not request.data:
+            return Response({
+                'error': 'Provide series to import as NDJSON, one per line.'
+            }, status=400)
+
+        try:
+            series = import_records(request.user.author.id, request.data)
+        except InvalidImport as e:
+            return Response({
+                'error': str(e),
+                'records': e.errors,
+            }, status=400)
+
+        return Response({
+            'series': len(series),
+            'tutorials': sum(len(instance.imported) for instance in series),
+            'results': [{
+                'id': instance.id,
+                'slug': instance.slug,
+                'tutorials': [{'id': tutorial.id, 'slug': tutorial.slug} for tutorial in instance.imported],
+            } for instance in series],
+        }, status=201)
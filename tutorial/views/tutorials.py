@@ -1,17 +1,27 @@
+from django.db import transaction
 from django.core.exceptions import ObjectDoesNotExist
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.authtoken.models import Token
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.parsers import FormParser, MultiPartParser, JSONParser
 from rest_framework.generics import (
     ListAPIView,
     DestroyAPIView,
     RetrieveAPIView,
 )
 
-from tutorial.models import Tutorial
+from author.utils import resolve_token
+from core.serializers import parse_toggles
+from tutorial.views.utils import set_liked
+from tutorial.models import Tutorial, Series
+from core.utils import create_with_unique_slug
+from core.mixins import (
+    ValuesListMixin,
+    EagerLoadingMixin,
+    CachedRetrieveMixin,
+    ConditionalGetMixin,
+)
 from tutorial.paginators import RecentTutorialPaginator
 from tutorial.serializers import (
     TutorialListSerializer,
@@ -19,15 +29,18 @@ from tutorial.serializers import (
 )
 
 
-class RecentTutorialAPIView(ListAPIView):
+class RecentTutorialAPIView(ConditionalGetMixin, ValuesListMixin, EagerLoadingMixin, ListAPIView):
+    validator_tags = ('series', 'authors')
     serializer_class = TutorialListSerializer
     pagination_class = RecentTutorialPaginator
     queryset = Tutorial.objects.order_by('-timestamp')[:12]
 
 
-class TutorialDetailAPIView(RetrieveAPIView):
+class TutorialDetailAPIView(ConditionalGetMixin, CachedRetrieveMixin, EagerLoadingMixin, RetrieveAPIView):
     lookup_field = 'slug'
     lookup_url_kwarg = 'slug'
+    payload_cache_prefix = 'tutorial'
+    validator_tags = ('series', 'authors')
     serializer_class = TutorialDetailSerializer
     queryset = Tutorial.objects.filter(draft=False)
 
@@ -58,17 +71,23 @@ class TutorialLikeUnlikeAPIView(APIView):
 
         try:
 
-            user_id = Token.objects.get(key=token).user_id
+            user_id = resolve_token(token).user_id
             tutorial = Tutorial.objects.get(id=tutorial_id)
 
+            # keep the series' aggregate vote score in step
+            # with the tutorial's in the same transaction
             if not tutorial.votes.exists(user_id):
-                tutorial.votes.up(user_id)
+                with transaction.atomic():
+                    if tutorial.votes.up(user_id):
+                        Series.change_vote_score(tutorial.series_id, 1)
                 return Response({
                     'action': 1,
                     'voted': 'Liked by user.'
                 })
             else:
-                tutorial.votes.delete(user_id)
+                with transaction.atomic():
+                    if tutorial.votes.delete(user_id):
+                        Series.change_vote_score(tutorial.series_id, -1)
                 return Response({
                     'action': -1,
                     'voted': 'Unliked by uer.'
@@ -84,6 +103,54 @@ class TutorialLikeUnlikeAPIView(APIView):
             }, status=500)
 
 
+class TutorialBatchLikeAPIView(APIView):
+    """
+    Likes and unlikes a batch of tutorials by an authenticated
+    user in one go, e.g. to replay toggles queued while the
+    client was offline. Takes JSON of a token and a list of
+    actions ({"id": <tutorial id>, "state": <liked>}) and
+    answers with the final state of every tutorial.
+    """
+
+    max_toggles = 500
+    parser_classes = (JSONParser,)
+
+    def post(self, request):
+
+        if not isinstance(request.data, dict):
+            return Response({
+                'error': 'Provide a token and a list of actions as a JSON object.'
+            }, status=400)
+
+        token = request.data.get('token')
+
+        if not token:
+            return Response({
+                'error': 'Unauthorized to view response.'
+            }, status=401)
+
+        try:
+            states = parse_toggles(request.data.get('actions'), self.max_toggles)
+        except ValueError as e:
+            return Response({
+                'error': str(e)
+            }, status=400)
+
+        try:
+            user_id = resolve_token(token).user_id
+        except ObjectDoesNotExist:
+            return Response({
+                'error': 'Invalid auth token provided.'
+            }, status=401)
+
+        liked = set_liked(user_id, states)
+
+        return Response({
+            'results': [{'id': pk, 'state': liked[pk]} for pk in states if pk in liked],
+            'missing': [pk for pk in states if pk not in liked],
+        })
+
+
 class TutorialDeleteAPIView(DestroyAPIView):
     lookup_field = 'slug'
     lookup_url_kwarg = 'slug'
@@ -140,16 +207,17 @@ class TutorialCreateAPIView(APIView):
         try:
 
             if token:
-                author_id = Token.objects.get(key=token).user.author.id
+                author_id = resolve_token(token).author_id
             else:
                 author_id = request.user.author.id
 
             try:
                 int(series_id)
-            except ValueError:
+            except (TypeError, ValueError):
                 series_id = None
 
-            tutorial = Tutorial.objects.create(
+            tutorial = create_with_unique_slug(
+                Tutorial,
                 title=title,
                 draft=draft,
                 content=content,